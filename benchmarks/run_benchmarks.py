@@ -0,0 +1,320 @@
+"""Time the driver hot paths, and optionally compare with a saved baseline.
+
+    python benchmarks/run_benchmarks.py --output baseline.json
+    python benchmarks/run_benchmarks.py --compare baseline.json
+
+Each benchmark is timed for several repeats, and the best time per call is
+reported, which is the least sensitive to other load on the machine. Driver
+reads run against simulated devices with instant conversions, so they only
+measure Python overhead.
+"""
+import argparse
+import atexit
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import timeit
+from collections import OrderedDict
+
+import barometerdrivers.helpers.util as util
+import barometerdrivers.smooth.smoothalgorithms as smooth
+from barometerdrivers import HP206C, MS5803_01BA
+from barometerdrivers.absi2cbarometer import OSRValue
+from barometerdrivers.batchconversion import convert_ms5803_01ba
+from barometerdrivers.samplestore import convert_tsv
+from barometerdrivers.simulation import (NoiseSource, SimulatedBus,
+                                         SimulatedHP206C,
+                                         SimulatedMS5803_01BA)
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+sys.path.insert(0, os.path.join(ROOT, 'sample_data'))
+import sample_data_utils  # noqa: E402
+
+BENCHMARKS = OrderedDict()
+
+
+def benchmark(name):
+    """Register a function returning the callable to time."""
+    def register(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+
+def _instant(driver_class):
+    """
+    :return type: Subclass of :attr:`driver_class` with 0 ms conversions.
+    """
+    osr_conversion = {osr: OSRValue(value.command, 0.0)
+                      for osr, value in driver_class.osr_conversion.items()}
+    return type('Instant' + driver_class.__name__, (driver_class,),
+                {'osr_conversion': osr_conversion})
+
+
+def _ms5803_01ba():
+    bus = SimulatedBus()
+    bus.attach(SimulatedMS5803_01BA(NoiseSource(seed=0), time_scale=0), 0x77)
+    return _instant(MS5803_01BA)(bus=bus)
+
+
+def _hp206c():
+    bus = SimulatedBus()
+    bus.attach(SimulatedHP206C(NoiseSource(seed=0), time_scale=0), 0x76)
+    return _instant(HP206C)(bus=bus)
+
+
+@benchmark('util.array_block_to_unsigned_int')
+def bench_unsigned():
+    data = [0x8a, 0xa2, 0x1a]
+    return lambda: util.array_block_to_unsigned_int(data)
+
+
+@benchmark('util.array_block_to_signed_int')
+def bench_signed():
+    data = [0xff, 0xf7, 0x2e]
+    return lambda: util.array_block_to_signed_int(data)
+
+
+@benchmark('util.decode_frames[1000x3]')
+def bench_decode_frames():
+    data = bytes(bytearray([0xff, 0xf7, 0x2e] * 1000))
+    return lambda: util.decode_frames(data, 3, signed=True)
+
+
+@benchmark('MS5803_01BA.convert')
+def bench_ms5803_01ba_convert():
+    barometer = _ms5803_01ba()
+
+    def convert():
+        barometer._convert_raw_temperature(8569150)
+        barometer._convert_raw_pressure(9085466)
+    return convert
+
+
+@benchmark('batchconversion.convert_ms5803_01ba[1000]')
+def bench_batch_convert():
+    coefficients = _ms5803_01ba().coefficients
+    raw_temperatures = [8569150] * 1000
+    raw_pressures = [9085466] * 1000
+    return lambda: convert_ms5803_01ba(raw_temperatures, raw_pressures,
+                                       coefficients)
+
+
+def _smoother_step(smoother):
+    measurements = NoiseSource(seed=0)
+    values = [measurements.sample()[1] for _ in range(1024)]
+    state = {'i': 0}
+
+    def step():
+        smoother.update(values[state['i'] & 1023])
+        state['i'] += 1
+        return smoother.value
+    return step
+
+
+@benchmark('RollingMean[16].update+value')
+def bench_rolling_mean():
+    return _smoother_step(smooth.RollingMean(1000.0, 16, 2))
+
+
+@benchmark('RollingRootMeanSquared[16].update+value')
+def bench_rolling_rms():
+    return _smoother_step(smooth.RollingRootMeanSquared(1000.0, 16, 2))
+
+
+@benchmark('OneDKalman.update+value')
+def bench_kalman():
+    return _smoother_step(smooth.OneDKalman(1000.0, 4, 0.0625, 4, 2))
+
+
+@benchmark('ExponentialMovingAverage.update+value')
+def bench_ema():
+    return _smoother_step(smooth.ExponentialMovingAverage(1000.0, 1, 50, 2))
+
+
+@benchmark('LowPassBiquad[2].update+value')
+def bench_low_pass():
+    return _smoother_step(smooth.LowPassBiquad(1000.0, 1, 50, 2, 2))
+
+
+@benchmark('RollingMedian[16].update+value')
+def bench_rolling_median():
+    return _smoother_step(smooth.RollingMedian(1000.0, 16, 2))
+
+
+@benchmark('RollingMedian[4096].update+value')
+def bench_rolling_median_large():
+    return _smoother_step(smooth.RollingMedian(1000.0, 4096, 2))
+
+
+@benchmark('HampelFilter[16].update+value')
+def bench_hampel():
+    return _smoother_step(smooth.HampelFilter(1000.0, 16, 3, 2))
+
+
+@benchmark('HampelFilter[4096].update+value')
+def bench_hampel_large():
+    return _smoother_step(smooth.HampelFilter(1000.0, 4096, 3, 2))
+
+
+def _smooth_series(smoother):
+    measurements = NoiseSource(seed=0)
+    values = [round(measurements.sample()[1], 2) for _ in range(4096)]
+    return lambda: smoother.smooth(values)
+
+
+@benchmark('RollingMean[16].smooth[4096]')
+def bench_rolling_mean_smooth():
+    return _smooth_series(smooth.RollingMean(1000.0, 16, 2))
+
+
+@benchmark('RollingRootMeanSquared[16].smooth[4096]')
+def bench_rolling_rms_smooth():
+    return _smooth_series(smooth.RollingRootMeanSquared(1000.0, 16, 2))
+
+
+@benchmark('OneDKalman.smooth[4096]')
+def bench_kalman_smooth():
+    return _smooth_series(smooth.OneDKalman(1000.0, 4, 0.0625, 4, 2))
+
+
+@benchmark('ExponentialMovingAverage.smooth[4096]')
+def bench_ema_smooth():
+    return _smooth_series(smooth.ExponentialMovingAverage(1000.0, 1, 50, 2))
+
+
+@benchmark('LowPassBiquad[2].smooth[4096]')
+def bench_low_pass_smooth():
+    return _smooth_series(smooth.LowPassBiquad(1000.0, 1, 50, 2, 2))
+
+
+def _sample_pressures():
+    return sample_data_utils.load_sample_data()[4096]['MS5803_01BA']['mbar']
+
+
+@benchmark('samplestore.convert_tsv')
+def bench_convert_tsv():
+    # Parse the TSV files every time, into a store outside sample_data.
+    directory = tempfile.mkdtemp()
+    atexit.register(shutil.rmtree, directory, True)
+    path = os.path.join(directory, 'samples.bcol')
+    return lambda: convert_tsv(sample_data_utils.tsv_paths(), path)
+
+
+@benchmark('sample_data_utils.load_sample_data[cached]')
+def bench_load_sample_data():
+    sample_data_utils.open_sample_store().close()
+    return sample_data_utils.load_sample_data
+
+
+@benchmark('sample_data_utils.smooth_with_kalman')
+def bench_sample_kalman():
+    data = _sample_pressures()
+    return lambda: sample_data_utils.smooth_with_kalman(data, 4, 0.0625, 4)
+
+
+@benchmark('sample_data_utils.smooth_with_rms')
+def bench_sample_rms():
+    data = _sample_pressures()
+    return lambda: sample_data_utils.smooth_with_rms(data, 16)
+
+
+@benchmark('sample_data_utils.smooth_with_mean')
+def bench_sample_mean():
+    data = _sample_pressures()
+    return lambda: sample_data_utils.smooth_with_mean(data, 16)
+
+
+@benchmark('MS5803_01BA.read_temperature_and_pressure')
+def bench_ms5803_01ba_read():
+    return _ms5803_01ba().read_temperature_and_pressure
+
+
+@benchmark('HP206C.read_temperature_and_pressure')
+def bench_hp206c_read():
+    return _hp206c().read_temperature_and_pressure
+
+
+def time_benchmark(func, repeat, min_time):
+    """
+    :param func: Callable to time.
+    :param int repeat: Number of timing runs.
+    :param float min_time: Minimum sec for each run.
+    :return dict: Best and median sec per call, and calls per run.
+    """
+    timer = timeit.Timer(func)
+    number = 1
+    while timer.timeit(number) < min_time:
+        number *= 2
+    times = sorted(t / number for t in timer.repeat(repeat, number))
+    return {'best': times[0], 'median': times[len(times) // 2],
+            'number': number, 'repeat': repeat}
+
+
+def run(names, repeat, min_time):
+    results = OrderedDict()
+    for name in names:
+        results[name] = time_benchmark(BENCHMARKS[name](), repeat, min_time)
+        print('{:<48} {:>12.3f} usec'.format(name,
+                                             results[name]['best'] * 1e6))
+    return {'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'machine': platform.machine(),
+            'results': results}
+
+
+def compare(results, baseline, threshold):
+    """Print the change from :attr:`baseline` of each benchmark.
+
+    :return list: Names of benchmarks slower by more than :attr:`threshold`.
+    """
+    regressions = []
+    print('\n{:<48} {:>12} {:>12} {:>8}'.format('benchmark', 'baseline',
+                                                'current', 'change'))
+    for name, result in results['results'].items():
+        if name not in baseline['results']:
+            continue
+        before = baseline['results'][name]['best']
+        change = result['best'] / before - 1
+        flag = ''
+        if change > threshold:
+            regressions.append(name)
+            flag = ' SLOWER'
+        print('{:<48} {:>12.3f} {:>12.3f} {:>+7.1%}{}'.format(
+            name, before * 1e6, result['best'] * 1e6, change, flag))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('-k', '--filter', default='',
+                        help='Only run benchmarks whose names start with '
+                             'this text.')
+    parser.add_argument('-r', '--repeat', type=int, default=5)
+    parser.add_argument('-t', '--min-time', type=float, default=0.1,
+                        help='Minimum sec for each repeat.')
+    parser.add_argument('-o', '--output', help='Write results to JSON file.')
+    parser.add_argument('-c', '--compare',
+                        help='Baseline JSON file to compare results with.')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help='Fractional slowdown counted as a regression.')
+    args = parser.parse_args(argv)
+
+    names = [name for name in BENCHMARKS if name.startswith(args.filter)]
+    results = run(names, args.repeat, args.min_time)
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            json.dump(results, output_file, indent=2)
+    if args.compare:
+        with open(args.compare, 'r') as baseline_file:
+            baseline = json.load(baseline_file)
+        if compare(results, baseline, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,230 @@
+"""Search OneDKalman parameters for each sensor, OSR and quantity.
+
+    python sample_data/kalman_sweep.py --output kalman_parameters.json
+    python sample_data/kalman_sweep.py --random 20000 --capture run.braw
+
+Each candidate p, q, r is scored on every trace by the RMS error between
+the filtered trace and a centered (zero lag) moving average of it, plus
+`--lag-weight` times the steady state lag of the filter in sec. The best
+candidate for each sensor, OSR and quantity is written to a JSON table that
+:class:`SmoothedMS5803_01BA` accepts as `kalman_table`.
+"""
+import argparse
+import json
+import multiprocessing
+import random
+import sys
+from collections import defaultdict
+
+import numpy
+
+from barometerdrivers.rawcapture import RawCaptureReader
+from barometerdrivers.smooth.smoothalgorithms import OneDKalman
+from sample_data_utils import load_sample_data
+
+QUANTITIES = {'C': 'temperature', 'mbar': 'pressure'}
+
+_traces = None  # set in each worker process by _init_worker
+
+
+def load_traces(capture_paths=(), include_sample_data=True):
+    """
+    :param list capture_paths: Raw capture files to include.
+    :param bool include_sample_data: Include the bundled TSV traces.
+    :return dict: Lists of (sec per sample, values) keyed by sensor, OSR \
+     and quantity.
+    """
+    traces = defaultdict(list)
+
+    def add(sensor, osr, quantity, seconds, values):
+        if len(values) > 2:
+            interval = float(numpy.median(numpy.diff(seconds)))
+            traces[sensor, osr, quantity].append(
+                (interval, numpy.asarray(values, dtype=float)))
+
+    if include_sample_data:
+        for osr, sensors in load_sample_data().items():
+            for sensor, columns in sensors.items():
+                for unit, quantity in QUANTITIES.items():
+                    add(sensor, osr, quantity, columns['s'], columns[unit])
+    for path in capture_paths:
+        reader = RawCaptureReader(path)
+        for sensor_id, sensor in enumerate(reader.sensors):
+            seconds, temperature, pressure = reader.convert(sensor_id)
+            osr = sensor.oversampling_rate
+            add(sensor.model, osr, 'temperature', seconds, temperature)
+            add(sensor.model, osr, 'pressure', seconds, pressure)
+    return dict(traces)
+
+
+def steady_state_gain(q_process_noise, r_measure_noise):
+    """
+    :return float: Kalman gain the filter converges to.
+    """
+    q, r = q_process_noise, r_measure_noise
+    predicted = (q + (q * q + 4 * q * r) ** 0.5) / 2
+    return predicted / (predicted + r)
+
+
+def score_trace(candidate, interval, values, reference_window, lag_weight):
+    """
+    :param tuple candidate: p, q and r.
+    :param float interval: Sec between samples.
+    :param numpy.ndarray values: Trace, oldest first.
+    :param int reference_window: Samples in the centered moving average.
+    :param float lag_weight: Score per sec of lag.
+    :return tuple: RMS error, lag in sec, score.
+    """
+    p, q, r = candidate
+    smoothed = OneDKalman(values[0], p, q, r, 6).smooth(values[1:])
+    kernel = numpy.ones(reference_window) / reference_window
+    reference = numpy.convolve(values, kernel, mode='valid')
+    edge = reference_window // 2
+    # smoothed[i] follows values[i + 1]; reference[j] is centered on
+    # values[j + edge].
+    errors = smoothed[edge - 1:edge - 1 + len(reference)] - reference
+    rms_error = float(numpy.sqrt(numpy.mean(errors ** 2)))
+    gain = steady_state_gain(q, r)
+    lag_sec = (1 - gain) / gain * interval
+    return rms_error, lag_sec, rms_error + lag_weight * lag_sec
+
+
+def _init_worker(traces):
+    global _traces
+    _traces = traces
+
+
+def evaluate(job):
+    """
+    :param tuple job: Candidate p, q, r, the reference window and the \
+     lag weight.
+    :return tuple: Candidate, and mean RMS error, lag and score keyed by \
+     sensor, OSR and quantity.
+    """
+    candidate, reference_window, lag_weight = job
+    scores = {}
+    for key, traces in _traces.items():
+        results = [score_trace(candidate, interval, values, reference_window,
+                               lag_weight)
+                   for interval, values in traces
+                   if len(values) > reference_window]
+        if results:
+            scores[key] = tuple(numpy.mean(results, axis=0).tolist())
+    return candidate, scores
+
+
+def parse_range(text):
+    """
+    :param str text: 'min:max:count' for log spaced values, or one value.
+    :return list: Values.
+    """
+    parts = [float(part) for part in text.split(':')]
+    if len(parts) == 1:
+        return parts
+    low, high, count = parts
+    return numpy.geomspace(low, high, int(count)).tolist()
+
+
+def candidates(p_range, q_range, r_range, random_count=0, seed=None):
+    """
+    :return list: Grid of every combination of the ranges, or \
+     :attr:`random_count` log uniform samples within their bounds.
+    """
+    if not random_count:
+        return [(p, q, r) for p in p_range for q in q_range for r in r_range]
+    rng = random.Random(seed)
+
+    def sample(values):
+        low, high = numpy.log(min(values)), numpy.log(max(values))
+        return float(numpy.exp(rng.uniform(low, high)))
+    return [(sample(p_range), sample(q_range), sample(r_range))
+            for _ in range(random_count)]
+
+
+def sweep(traces, jobs, reference_window=15, lag_weight=0.1, processes=None):
+    """
+    :param dict traces: From :func:`load_traces`.
+    :param list jobs: Candidates from :func:`candidates`.
+    :return dict: Best candidate and its scores, keyed by sensor, OSR and \
+     quantity.
+    """
+    best = {}
+    pool = multiprocessing.Pool(processes, _init_worker, (traces,))
+    try:
+        work = ((candidate, reference_window, lag_weight)
+                for candidate in jobs)
+        workers = processes or multiprocessing.cpu_count()
+        chunksize = max(1, len(jobs) // (4 * workers))
+        for candidate, scores in pool.imap_unordered(evaluate, work,
+                                                     chunksize):
+            for key, score in scores.items():
+                if key not in best or score[2] < best[key][1][2]:
+                    best[key] = candidate, score
+    finally:
+        pool.close()
+        pool.join()
+    return best
+
+
+def parameter_table(best, reference_window, lag_weight):
+    """
+    :return dict: JSON serializable table for `load_kalman_parameters`.
+    """
+    parameters = {}
+    for (sensor, osr, quantity), (candidate, score) in sorted(best.items()):
+        osrs = parameters.setdefault(sensor, {})
+        osrs.setdefault(str(osr), {})[quantity] = {
+            'p_estimation_error': candidate[0],
+            'q_process_noise': candidate[1],
+            'r_measure_noise': candidate[2],
+            'rms_error': score[0],
+            'lag_sec': score[1],
+            'score': score[2]
+        }
+    return {'reference_window': reference_window, 'lag_weight': lag_weight,
+            'parameters': parameters}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--p', default='0.25:64:9',
+                        help='p estimation error, min:max:count.')
+    parser.add_argument('--q', default='0.001:4:25',
+                        help='q process noise, min:max:count.')
+    parser.add_argument('--r', default='0.01:64:25',
+                        help='r measure noise, min:max:count.')
+    parser.add_argument('--random', type=int, default=0,
+                        help='Sample this many candidates instead of a grid.')
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--capture', action='append', default=[],
+                        help='Raw capture file to tune on.')
+    parser.add_argument('--no-sample-data', action='store_true',
+                        help="Don't tune on the bundled TSV traces.")
+    parser.add_argument('--reference-window', type=int, default=15)
+    parser.add_argument('--lag-weight', type=float, default=0.1,
+                        help='Score per sec of lag, in the trace units.')
+    parser.add_argument('--processes', type=int)
+    parser.add_argument('--output', default='kalman_parameters.json')
+    args = parser.parse_args(argv)
+    if args.reference_window < 3 or not args.reference_window % 2:
+        parser.error('--reference-window must be odd and at least 3.')
+
+    traces = load_traces(args.capture, not args.no_sample_data)
+    jobs = candidates(parse_range(args.p), parse_range(args.q),
+                      parse_range(args.r), args.random, args.seed)
+    best = sweep(traces, jobs, args.reference_window, args.lag_weight,
+                 args.processes)
+    table = parameter_table(best, args.reference_window, args.lag_weight)
+    with open(args.output, 'w') as output_file:
+        json.dump(table, output_file, indent=2, sort_keys=True)
+    for (sensor, osr, quantity), (candidate, score) in sorted(best.items()):
+        print('{:<12} {:>5} {:<12} p={:<8.4g} q={:<8.4g} r={:<8.4g} '
+              'rms={:.4f} lag={:.3f}s'.format(sensor, osr, quantity,
+                                              candidate[0], candidate[1],
+                                              candidate[2], score[0],
+                                              score[1]))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
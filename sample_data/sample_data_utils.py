@@ -1,25 +1,43 @@
-import csv
 import os
 
 import barometerdrivers.smooth.smoothalgorithms as smooth
+from barometerdrivers.samplestore import SampleStore, convert_tsv
 
 
-def load_sample_data():
-    osr_list = [256, 512, 1024, 2048, 4096]
-    sensors = ['HP206C', 'MS5803_01BA']
-    filename_template = os.path.join(os.path.dirname(__file__),
-                                     'osr_{}_5_second_samples.tsv')
+SAMPLE_DIR = os.path.dirname(os.path.abspath(__file__))
+OSR_LIST = [256, 512, 1024, 2048, 4096]
+STORE_PATH = os.path.join(SAMPLE_DIR, 'samples.bcol')
+
+
+def tsv_paths():
+    return [os.path.join(SAMPLE_DIR, 'osr_{}_5_second_samples.tsv'.format(osr))
+            for osr in OSR_LIST]
+
+
+def open_sample_store(path=STORE_PATH):
+    """Open the sample store, converting the TSV files to it first if it's
+    missing or older than any of them.
+
+    :return SampleStore: Store of every OSR and sensor.
+    """
+    if not os.path.exists(path) or os.path.getmtime(path) < max(
+            os.path.getmtime(tsv_path) for tsv_path in tsv_paths()):
+        convert_tsv(tsv_paths(), path)
+    return SampleStore(path)
+
+
+def load_sample_data(path=STORE_PATH):
+    """
+    :return dict: Read only arrays of 's', 'C' and 'mbar' mapped from the \
+     sample store, keyed by OSR and sensor.
+    """
+    store = open_sample_store(path)
     data = {}
-    for osr in osr_list:
-        with open(filename_template.format(osr), 'r') as tsv_file:
-            tsv_reader = csv.reader(tsv_file, delimiter='\t', quotechar='|')
-            next(tsv_reader)  # skip tsv header row
-            data[osr] = {sensor: {'s': [], 'mbar': [], 'C': []}
-                         for sensor in sensors}
-            for sensor, _, time, temperature, pressure in tsv_reader:
-                data[osr][sensor]['s'].append(float(time))
-                data[osr][sensor]['C'].append(float(temperature))
-                data[osr][sensor]['mbar'].append(float(pressure))
+    for osr, sensor in store.keys():
+        table = store.table(osr, sensor)
+        data.setdefault(osr, {})[sensor] = {'s': table.sec,
+                                            'C': table.temperature,
+                                            'mbar': table.pressure}
     return data
 
 
@@ -43,8 +61,4 @@ def smooth_with_mean(data, buffersize):
 
 
 def _smooth_data(data, smoother):
-    smoothed_data = [smoother.value]
-    for datum in data:
-        smoother.update(datum)
-        smoothed_data.append(smoother.value)
-    return smoothed_data
+    return [smoother.value] + smoother.smooth(data).tolist()
@@ -1,2 +1,10 @@
-from .hp206c import HP206C       # noqa: F401
-from .ms5803_01ba import MS5803_01BA  # noqa: F401
+from .helpers.lazyimport import lazy_attributes
+
+# Drivers are imported on first use, so using a subpackage, e.g. smooth,
+# doesn't import them.
+_LAZY_NAMES = {
+    'HP206C': '.hp206c',
+    'MS5803_01BA': '.ms5803_01ba'
+}
+__all__ = sorted(_LAZY_NAMES)
+__getattr__, __dir__ = lazy_attributes(__name__, _LAZY_NAMES)
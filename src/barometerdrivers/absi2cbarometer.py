@@ -1,9 +1,12 @@
+import time
 from abc import ABCMeta, abstractmethod
 from collections import namedtuple
 
+from .buses import environment_bus, load_bus
 from .i2creadwrite import I2CReadWrite
 
 OSRValue = namedtuple('OSRvalue', ['command', 'msec'])
+MeasurementStep = namedtuple('MeasurementStep', ['ready_at', 'result'])
 
 
 class AbsI2CBarometer(object):
@@ -11,9 +14,28 @@ class AbsI2CBarometer(object):
     __metaclass__ = ABCMeta
 
     osr_conversion = {}
+    # Set per instance by Instrumentation.attach(); None costs nothing.
+    instrumentation = None
+    _sleep = staticmethod(time.sleep)
 
-    def __init__(self, address, oversampling_rate, port):
-        self.i2c = I2CReadWrite(address, port)
+    def __init__(self, address, oversampling_rate, port, bus=None):
+        """
+        :param int address: I2C device address.
+        :param int oversampling_rate: Key of :attr:`osr_conversion`.
+        :param int port: I2C port of device.
+        :param bus: Callable taking `address` and `port`, returning the \
+         object used to communicate with the device, or the name of one \
+         for :func:`load_bus`. Defaults to the bus named by the \
+         `BAROMETERDRIVERS_BUS` environment variable, or else \
+         :class:`I2CReadWrite`.
+        """
+        if bus is None:
+            bus = environment_bus() or I2CReadWrite
+        elif not callable(bus):
+            bus = load_bus(bus)
+        self.i2c = bus(address, port)
+        self.address = address
+        self.port = port
         self.oversampling_rate = oversampling_rate
 
     @property
@@ -27,6 +49,34 @@ class AbsI2CBarometer(object):
         if osr not in valid_osrs:
             raise ValueError(msg.format(osr, ', '.join(map(str, valid_osrs))))
         self.__osr = osr
+        self.plan = self._compile_plan(osr)
+
+    @classmethod
+    def sample_rate_hz(cls, oversampling_rate):
+        """Datasheet rate of temperature and pressure readings, taking two
+        conversion times each, so smoother cutoffs can be given in Hz.
+
+        :param int oversampling_rate: Key of :attr:`osr_conversion`.
+        :return float: Readings per sec.
+        """
+        try:
+            msec = cls.osr_conversion[oversampling_rate].msec
+        except KeyError:
+            valid_osrs = sorted(cls.osr_conversion.keys())
+            msg = "'{}' is not a valid OSR value. Choose {}."
+            raise ValueError(msg.format(oversampling_rate,
+                                        ', '.join(map(str, valid_osrs))))
+        return 1000.0 / (2 * msec)
+
+    def _compile_plan(self, osr):
+        """Precompute the command bytes and delays of a reading, which only \
+        change with the OSR, so reads don't look them up every sample. \
+        Called whenever :attr:`oversampling_rate` is set.
+
+        :param int osr: Valid oversampling rate.
+        :return: Driver specific plan, stored as :attr:`plan`.
+        """
+        return None
 
     @abstractmethod
     def send_reset(self):
@@ -43,3 +93,26 @@ class AbsI2CBarometer(object):
     @abstractmethod
     def read_temperature_and_pressure(self):
         pass  # pragma: no cover
+
+    @abstractmethod
+    def read_raw_temperature_and_pressure(self):
+        pass  # pragma: no cover
+
+    @abstractmethod
+    def start_measurement(self):
+        """Begin a temperature and pressure measurement without blocking.
+
+        :return float: :func:`time.time` at which to call \
+         :meth:`step_measurement`.
+        """
+        pass  # pragma: no cover
+
+    @abstractmethod
+    def step_measurement(self):
+        """Advance the measurement begun by :meth:`start_measurement`.
+
+        :return MeasurementStep: `ready_at` is the next time to call this \
+         method, or `result` is a tuple of temperature in degrees C and \
+         pressure in mbar once the measurement is complete.
+        """
+        pass  # pragma: no cover
@@ -1,9 +1,23 @@
 import time
 from abc import ABCMeta, abstractmethod
+from collections import namedtuple
 from functools import partial
 
-from .absi2cbarometer import AbsI2CBarometer, OSRValue
+from .absi2cbarometer import (AbsI2CBarometer, MeasurementStep,
+                              OSRValue)
 from .helpers.util import array_block_to_unsigned_int
+from .promcache import is_valid_prom
+
+PendingConversion = namedtuple('PendingConversion',
+                               ['is_pressure', 'ready_at'])
+MS5803Plan = namedtuple('MS5803Plan', ['temperature_command',
+                                       'pressure_command',
+                                       'conversion_sec'])
+TemperatureReuse = namedtuple('TemperatureReuse',
+                              ['max_samples', 'max_sec', 'max_drift'])
+MS5803Sample = namedtuple('MS5803Sample', ['temperature', 'pressure',
+                                           'temperature_age_sec',
+                                           'temperature_reused'])
 
 
 def _adc_cmd(pressure_cmd, is_pressure):
@@ -32,6 +46,14 @@ class AbsMS5803(AbsI2CBarometer):
         't_ref'   : 0xaa,  # reference temp.
         'tempsens': 0xac   # temp. coefficient of the temp.
     }
+    # factory data, coefficients, then CRC-4 in the low bits of the last word
+    prom_words = (0xa0, 0xa2, 0xa4, 0xa6, 0xa8, 0xaa, 0xac, 0xae)
+    prom_cache = None
+    temperature_reuse = None
+    # last temperature reading, for set_temperature_reuse()
+    _temperature = _temperature_time = None
+    _temperature_rate = 0.0
+    _temperature_samples = 0
     osr_conversion = {
         256 : OSRValue(partial(_adc_cmd, 0x40), 0.6),
         512 : OSRValue(partial(_adc_cmd, 0x42), 1.17),
@@ -40,29 +62,230 @@ class AbsMS5803(AbsI2CBarometer):
         4096: OSRValue(partial(_adc_cmd, 0x48), 9.04)
     }
 
-    def __init__(self, oversampling_rate, is_high_address, port):
+    def __init__(self, oversampling_rate, is_high_address, port,
+                 prom_cache=None, force_prom_read=False, bus=None):
+        """
+        :param PromCache prom_cache: When given, PROM words are validated \
+         with their CRC-4 and cached. A valid cache entry whose word 7, \
+         which holds the CRC, matches the sensor's skips the reset and \
+         the other PROM reads on startup.
+        :param bool force_prom_read: Ignore any cache entry, and reset and \
+         read PROM from device.
+        :param bus: I2C communication factory, see :class:`AbsI2CBarometer`.
+        """
         address = 0x77 if is_high_address else 0x76
-        super(AbsMS5803, self).__init__(address, oversampling_rate, port)
-        self.send_reset()
+        super(AbsMS5803, self).__init__(address, oversampling_rate, port, bus)
+        self._pending_conversion = None
+        self.prom_cache = prom_cache
+        if not self._load_cached_prom(force_prom_read):
+            self.send_reset()
+
+    def _load_cached_prom(self, force_prom_read=False):
+        """Store coefficients from the :attr:`prom_cache` entry of the \
+        device, if it is still valid.
+
+        :param bool force_prom_read: Ignore any cache entry.
+        :return bool: Whether coefficients were loaded from the cache.
+        """
+        if self.prom_cache is None or force_prom_read:
+            return False
+        cached_words = self.prom_cache.get(self.port, self.address)
+        # Word 7 holds the CRC of the coefficients, so one short read tells
+        # whether the entry belongs to the sensor now at the address.
+        if cached_words is None or \
+                self._read_prom_word(self.prom_words[7]) != cached_words[7]:
+            return False
+        self._store_prom(dict(zip(self.prom_words, cached_words)))
+        return True
 
     def send_reset(self):
         """Send reset command, then read and store coefficients \
         from device permanent read-only memory (PROM).
         """
         self.i2c.write_byte(self.reset)
-        time.sleep(0.1)
+        self._pending_conversion = None
+        self._sleep(0.1)
         self._read_prom()
 
     def _read_prom(self):
         """Read all the coefficients stored in device PROM, \
-        and store them as attributes.
+        and store them as attributes. With a PROM cache, read all words, \
+        check the CRC, and update the cache.
+        """
+        if self.prom_cache is None:
+            commands = self.prom_coefficients.values()
+        else:
+            commands = self.prom_words
+        prom = {command: self._read_prom_word(command) for command in commands}
+        if self.prom_cache is not None:
+            words = [prom[command] for command in self.prom_words]
+            if not is_valid_prom(words):
+                raise ValueError('PROM CRC check failed.')
+            self.prom_cache.put(self.port, self.address, words)
+        self._store_prom(prom)
+
+    def _read_prom_word(self, command):
+        """
+        :param int command: PROM read command, from :attr:`prom_words`.
+        :return int: 16-bit unsigned PROM word.
+        """
+        return array_block_to_unsigned_int(self.i2c.read_block_data(command,
+                                                                    2))
+
+    def _store_prom(self, prom):
+        """
+        :param dict prom: PROM words keyed by read command.
         """
         for coefficient, command in self.prom_coefficients.items():
-            array = self.i2c.read_block_data(command, 2)
-            value = array_block_to_unsigned_int(array)
+            value = prom[command]
             assert value > 0, "Error reading '{}' value.".format(coefficient)
             self.__setattr__(coefficient, value)
 
+    def _compile_plan(self, osr):
+        """
+        :param int osr: Valid oversampling rate.
+        :return MS5803Plan: ADC command bytes and conversion time in sec.
+        """
+        osr_value = self.osr_conversion[osr]
+        return MS5803Plan(osr_value.command(is_pressure=False),
+                          osr_value.command(is_pressure=True),
+                          osr_value.msec / 1000.0)
+
+    def start_conversion(self, is_pressure):
+        """Send ADC command to device without waiting for the measurement. \
+        Only one conversion can be in progress at a time.
+
+        :param bool is_pressure: True for pressure, False for temperature.
+        :return PendingConversion: Handle for :meth:`collect_conversion`, \
+         with `ready_at` set to the :func:`time.time` the data is ready.
+        """
+        plan = self.plan
+        if is_pressure:
+            self.i2c.write_byte(plan.pressure_command)
+        else:
+            self.i2c.write_byte(plan.temperature_command)
+        ready_at = time.time() + plan.conversion_sec
+        self._pending_conversion = PendingConversion(is_pressure, ready_at)
+        return self._pending_conversion
+
+    def collect_conversion(self, pending):
+        """Wait until the conversion is ready, if necessary, \
+        and read raw measurement.
+
+        :param PendingConversion pending: Handle from \
+         :meth:`start_conversion`.
+        :return int: 24-bit unsigned integer raw data reading from device.
+        """
+        if pending is None or pending is not self._pending_conversion:
+            raise ValueError('Conversion is not in progress on device.')
+        delay = pending.ready_at - time.time()
+        if delay > 0:
+            self._sleep(delay)
+        if self.instrumentation is not None:
+            start = pending.ready_at - self.plan.conversion_sec
+            self.instrumentation.record('conversion', time.time() - start)
+        self._pending_conversion = None
+        array = self.i2c.read_block_data(self.read_adc, 3)
+        return array_block_to_unsigned_int(array)
+
+    @property
+    def coefficients(self):
+        """
+        :return dict: PROM coefficient values keyed by name.
+        """
+        return {coefficient: getattr(self, coefficient)
+                for coefficient in self.prom_coefficients}
+
+    def set_temperature_reuse(self, max_samples=None, max_sec=None,
+                              max_drift=None):
+        """Reuse the last temperature conversion, and the compensation \
+        state derived from it, for pressure readings, so most samples need \
+        only a pressure conversion. Temperature is refreshed when any \
+        given limit is reached. Drift is estimated from the rate of change \
+        between the last two refreshes, so combine :attr:`max_drift` with \
+        another limit. With no limits, every sample refreshes temperature.
+
+        :param int max_samples: Samples per temperature conversion.
+        :param float max_sec: Max age of the temperature in sec.
+        :param float max_drift: Max estimated temperature drift in degrees C.
+        """
+        assert max_samples is None or max_samples >= 1
+        reuse = TemperatureReuse(max_samples, max_sec, max_drift)
+        if all(limit is None for limit in reuse):
+            reuse = None
+        self.temperature_reuse = reuse
+
+    @property
+    def temperature_age_sec(self):
+        """
+        :return float: Sec since the temperature used for compensation \
+         was read, or None before the first temperature reading.
+        """
+        if self._temperature_time is None:
+            return None
+        return time.time() - self._temperature_time
+
+    def _needs_temperature(self):
+        """
+        :return bool: The next sample must refresh temperature.
+        """
+        reuse = self.temperature_reuse
+        if reuse is None or self._temperature_time is None:
+            return True
+        if reuse.max_samples is not None and \
+                self._temperature_samples >= reuse.max_samples:
+            return True
+        age = time.time() - self._temperature_time
+        if reuse.max_sec is not None and age >= reuse.max_sec:
+            return True
+        return reuse.max_drift is not None and \
+            abs(self._temperature_rate) * age > reuse.max_drift
+
+    def _refresh_temperature(self, raw_temperature):
+        """Convert a new temperature reading, which also updates the \
+        compensation state for pressure, and note when it was read.
+
+        :param int raw_temperature: Raw temperature reading.
+        :return float: Temperature in degrees C.
+        """
+        temperature = self._convert_raw_temperature(raw_temperature)
+        now = time.time()
+        if self._temperature_time is not None and \
+                now > self._temperature_time:
+            self._temperature_rate = (temperature - self._temperature) / (
+                now - self._temperature_time)
+        self._temperature = temperature
+        self._temperature_time = now
+        self._temperature_samples = 0
+        return temperature
+
+    def _sample(self, raw_pressure, reused):
+        """
+        :param int raw_pressure: Raw pressure reading, compensated with \
+         the last temperature reading.
+        :param bool reused: Temperature wasn't refreshed for this sample.
+        :return MS5803Sample: The sample.
+        """
+        self._temperature_samples += 1
+        pressure = self._convert_raw_pressure(raw_pressure)
+        return MS5803Sample(self._temperature, pressure,
+                            time.time() - self._temperature_time, reused)
+
+    def read_sample(self):
+        """Read pressure, refreshing temperature only as needed by \
+        :meth:`set_temperature_reuse`.
+
+        :return MS5803Sample: Temperature in degrees C, pressure in mbar, \
+         sec since the temperature was read, and whether it was reused.
+        """
+        reused = not self._needs_temperature()
+        if not reused:
+            raw_temperature = self._read_raw_data(is_pressure=False)
+        raw_pressure = self._read_raw_data(is_pressure=True)
+        if not reused:
+            self._refresh_temperature(raw_temperature)
+        return self._sample(raw_pressure, reused)
+
     def _read_raw_data(self, is_pressure):
         """Send ADC command to device, wait for measurement, \
         and read raw measurement.
@@ -70,30 +293,31 @@ class AbsMS5803(AbsI2CBarometer):
         :param bool is_pressure: True for pressure, False for temperature.
         :return int: 24-bit unsigned integer raw data reading from device.
         """
-        osr_value = self.osr_conversion[self.oversampling_rate]
-        delay = osr_value.msec / 1000.0
-        command = osr_value.command(is_pressure)
-        self.i2c.write_byte(command)
-        time.sleep(delay)
-        array = self.i2c.read_block_data(self.read_adc, 3)
-        return array_block_to_unsigned_int(array)
+        return self.collect_conversion(self.start_conversion(is_pressure))
 
     def read_temperature(self):
         """
         return float: Temperature in degrees C.
         """
         raw_temperature = self._read_raw_data(is_pressure=False)
-        return self._convert_raw_temperature(raw_temperature)
+        return self._refresh_temperature(raw_temperature)
 
     def read_temperature_and_pressure(self):
         """
-        return tuple: Temperature in degrees C, pressure in mbar.
+        return tuple: Temperature in degrees C, pressure in mbar. With \
+         :meth:`set_temperature_reuse`, temperature may be reused.
+        """
+        sample = self.read_sample()
+        return sample.temperature, sample.pressure
+
+    def read_raw_temperature_and_pressure(self):
+        """
+        :return tuple: 24-bit unsigned raw temperature (D2) and \
+         pressure (D1) readings.
         """
         raw_temperature = self._read_raw_data(is_pressure=False)
         raw_pressure = self._read_raw_data(is_pressure=True)
-        temperature = self._convert_raw_temperature(raw_temperature)
-        pressure = self._convert_raw_pressure(raw_pressure)
-        return temperature, pressure
+        return raw_temperature, raw_pressure
 
     def read_pressure(self):
         """
@@ -102,6 +326,33 @@ class AbsMS5803(AbsI2CBarometer):
         _, pressure = self.read_temperature_and_pressure()
         return pressure
 
+    def start_measurement(self):
+        """Begin a temperature and pressure measurement without blocking.
+
+        :return float: :func:`time.time` at which to call \
+         :meth:`step_measurement`.
+        """
+        self._temperature_reused = not self._needs_temperature()
+        pending = self.start_conversion(self._temperature_reused)
+        return pending.ready_at
+
+    def step_measurement(self):
+        """Collect the conversion in progress. The temperature conversion, \
+        if temperature isn't reused, is followed by a pressure conversion, \
+        which completes the measurement.
+
+        :return MeasurementStep: Next ready time, or result tuple of \
+         temperature in degrees C and pressure in mbar.
+        """
+        pending = self._pending_conversion
+        raw_data = self.collect_conversion(pending)
+        if not pending.is_pressure:
+            self._refresh_temperature(raw_data)
+            ready_at = self.start_conversion(is_pressure=True).ready_at
+            return MeasurementStep(ready_at, None)
+        sample = self._sample(raw_data, self._temperature_reused)
+        return MeasurementStep(None, (sample.temperature, sample.pressure))
+
     @abstractmethod
     def _convert_raw_temperature(self, raw_temp_uint):
         pass  # pragma: no cover
@@ -0,0 +1,268 @@
+import asyncio
+import time
+
+from .absi2cbarometer import AbsI2CBarometer
+from .helpers.latency import ConversionLatencyModel
+from .hp206c import HP206C
+from .ms5803_01ba import MS5803_01BA
+
+
+async def _sleep_until(deadline):
+    """Yield to the event loop until :func:`time.time` reaches \
+    :attr:`deadline`.
+
+    :param float deadline: Wall clock time in sec.
+    """
+    delay = deadline - time.time()
+    while delay > 0:
+        await asyncio.sleep(delay)
+        delay = deadline - time.time()
+
+
+class _AsyncBarometerMixin(object):
+    """Serializes coroutines that talk to the same device, so concurrent
+    readers can't interleave commands and conversions.
+    """
+
+    _needs_reset = True
+
+    @property
+    def _device_lock(self):
+        # Created lazily, so it belongs to the loop that first uses it.
+        try:
+            return self.__lock
+        except AttributeError:
+            self.__lock = asyncio.Lock()
+            return self.__lock
+
+    @classmethod
+    async def create(cls, *args, **kwargs):
+        """Construct driver, then send reset and wait for it to complete, \
+        unless construction already made it ready.
+
+        :return: Driver ready for reading.
+        """
+        barometer = cls(*args, **kwargs)
+        if barometer._needs_reset:
+            await barometer.send_reset()
+        return barometer
+
+
+class AsyncMS5803_01BA(_AsyncBarometerMixin, MS5803_01BA):
+    """asyncio driver for MS5803-01BA barometer. Unlike
+    :class:`MS5803_01BA`, construction does not reset the device, so await
+    :meth:`send_reset` before reading, or use :meth:`create`. Only a valid
+    :class:`PromCache` entry makes the device ready on construction.
+    """
+
+    def __init__(self, oversampling_rate=1024, is_high_address=True, port=1,
+                 prom_cache=None, force_prom_read=False, bus=None):
+        """
+        :param PromCache prom_cache: See :class:`AbsMS5803`.
+        :param bool force_prom_read: See :class:`AbsMS5803`.
+        :param bus: I2C communication factory, see :class:`AbsI2CBarometer`.
+        """
+        # Skip AbsMS5803.__init__, which resets the device synchronously.
+        address = 0x77 if is_high_address else 0x76
+        AbsI2CBarometer.__init__(self, address, oversampling_rate, port, bus)
+        self._pending_conversion = None
+        self.prom_cache = prom_cache
+        # A cache hit only costs the single short read of PROM word 7.
+        self._needs_reset = not self._load_cached_prom(force_prom_read)
+
+    async def send_reset(self):
+        """Send reset command, then read and store coefficients \
+        from device permanent read-only memory (PROM).
+        """
+        async with self._device_lock:
+            self.i2c.write_byte(self.reset)
+            self._pending_conversion = None
+            await asyncio.sleep(0.1)
+            self._read_prom()
+            self._needs_reset = False
+
+    async def _read_raw_data(self, is_pressure):
+        pending = self.start_conversion(is_pressure)
+        await _sleep_until(pending.ready_at)
+        return self.collect_conversion(pending)
+
+    async def read_temperature(self):
+        """
+        return float: Temperature in degrees C.
+        """
+        async with self._device_lock:
+            raw_temperature = await self._read_raw_data(is_pressure=False)
+        return self._refresh_temperature(raw_temperature)
+
+    async def read_sample(self):
+        """Read pressure, refreshing temperature only as needed by \
+        :meth:`set_temperature_reuse`.
+
+        :return MS5803Sample: Temperature in degrees C, pressure in mbar, \
+         sec since the temperature was read, and whether it was reused.
+        """
+        async with self._device_lock:
+            reused = not self._needs_temperature()
+            if not reused:
+                raw_temperature = await self._read_raw_data(is_pressure=False)
+            raw_pressure = await self._read_raw_data(is_pressure=True)
+            if not reused:
+                self._refresh_temperature(raw_temperature)
+            return self._sample(raw_pressure, reused)
+
+    async def read_temperature_and_pressure(self):
+        """
+        return tuple: Temperature in degrees C, pressure in mbar. With \
+         :meth:`set_temperature_reuse`, temperature may be reused.
+        """
+        sample = await self.read_sample()
+        return sample.temperature, sample.pressure
+
+    async def read_pressure(self):
+        """
+        return float: Pressure in mbar.
+        """
+        _, pressure = await self.read_temperature_and_pressure()
+        return pressure
+
+    async def read_raw_temperature_and_pressure(self):
+        """
+        :return tuple: 24-bit unsigned raw temperature (D2) and \
+         pressure (D1) readings.
+        """
+        async with self._device_lock:
+            raw_temperature = await self._read_raw_data(is_pressure=False)
+            raw_pressure = await self._read_raw_data(is_pressure=True)
+        return raw_temperature, raw_pressure
+
+
+class _ThresholdMonitor(object):
+    """Asynchronous iterator returned by :meth:`AsyncHP206C.monitor`. A \
+    class rather than an async generator, which needs Python 3.6.
+    """
+
+    def __init__(self, barometer, temperature_only, interval, duration):
+        self.barometer = barometer
+        self.temperature_only = temperature_only
+        self.interval = interval
+        self.duration = duration
+        self._start = self._next_start = None
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        barometer = self.barometer
+        while True:
+            if self._start is None:
+                self._start = self._next_start = time.time()
+            elif self.interval:
+                self._next_start += self.interval
+                await _sleep_until(self._next_start)
+            else:
+                self._next_start = time.time()
+            if self.duration is not None and \
+                    self._next_start - self._start >= self.duration:
+                raise StopAsyncIteration
+            async with barometer._device_lock:
+                await barometer._convert(self.temperature_only)
+                events = barometer.interrupt_status & \
+                    barometer.interrupts.threshold_events
+                if events:
+                    return barometer._threshold_event(events,
+                                                      self.temperature_only)
+
+
+class AsyncHP206C(_AsyncBarometerMixin, HP206C):
+    """asyncio driver for HP206C barometer. Unlike :class:`HP206C`,
+    construction does not reset the device, so await :meth:`send_reset`
+    before reading, or use :meth:`create`.
+    """
+
+    def __init__(self, oversampling_rate=4096, port=1, bus=None):
+        # Skip HP206C.__init__, which resets the device synchronously.
+        AbsI2CBarometer.__init__(self, 0x76, oversampling_rate, port, bus)
+        self.latency_model = ConversionLatencyModel()
+
+    async def send_reset(self):
+        """Send soft reset command, and wait for the power-up sequence \
+        to complete.
+        """
+        async with self._device_lock:
+            self.i2c.write_byte(self.commands.soft_reset)
+            await self.wait_until_ready(delay=0.1)
+
+    async def wait_until_ready(self, delay=0.0, poll_rate=0.01):
+        """
+        :param float delay: Initial waiting period in sec.
+        :param float poll_rate: Subsequent device polling rate in sec.
+        """
+        await asyncio.sleep(delay)
+        while not self.is_ready():
+            await asyncio.sleep(poll_rate)
+
+    async def _convert(self, temperature_only=False):
+        """Send ADC command, and wait until the conversion is complete.
+
+        :param bool temperature_only: Only measure temperature.
+        """
+        await _sleep_until(self._start_conversion(temperature_only))
+        while not self._poll_conversion():
+            await asyncio.sleep(self.ready_poll_sec)
+
+    async def read_temperature(self):
+        """
+        :return float: Temperature in degrees C.
+        """
+        async with self._device_lock:
+            await self._convert(temperature_only=True)
+            return self._read_temperature_data()
+
+    async def read_pressure(self):
+        """
+        :return float: Pressure in mBar
+        """
+        async with self._device_lock:
+            await self._convert()
+            return self._read_pressure_data()
+
+    async def read_temperature_and_pressure(self):
+        """
+        :return tuple: Temperature in degrees C, pressure in mBar.
+        """
+        async with self._device_lock:
+            await self._convert()
+            return self._read_temperature_and_pressure_data()
+
+    def monitor(self, temperature_only=False, interval=0.0, duration=None):
+        """Convert continuously, reading data only when a threshold event \
+        is flagged, like :meth:`HP206C.monitor`. Use with `async for`.
+
+        :param bool temperature_only: Only convert and compare temperature.
+        :param float interval: Sec between the start of each conversion. \
+         0 to convert as fast as the device allows.
+        :param float duration: Stop after this many sec. Forever when None.
+        :return: Asynchronous iterator of :class:`ThresholdEvent`.
+        """
+        return _ThresholdMonitor(self, temperature_only, interval, duration)
+
+    async def read_raw_temperature_and_pressure(self):
+        """
+        :return tuple: Signed temperature in 0.01 degrees C, \
+         signed pressure in 0.01 mBar.
+        """
+        async with self._device_lock:
+            await self._convert()
+            return self._read_raw_temperature_and_pressure_data()
+
+
+async def capture_raw(writer):
+    """Read raw data from every barometer of a capture writer once, \
+    and append records. The asyncio counterpart of \
+    :meth:`RawCaptureWriter.capture`.
+
+    :param RawCaptureWriter writer: Writer of async drivers.
+    """
+    for sensor_id, barometer in enumerate(writer.barometers):
+        raw_data = await barometer.read_raw_temperature_and_pressure()
+        writer.write(sensor_id, time.time(), *raw_data)
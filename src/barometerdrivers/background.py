@@ -0,0 +1,162 @@
+import threading
+import time
+from array import array
+from collections import namedtuple
+
+Reading = namedtuple('Reading', ['timestamp', 'temperature', 'pressure'])
+
+
+class BackgroundSampler(object):
+    """Reads any :class:`AbsI2CBarometer` continuously on a dedicated thread,
+    into a preallocated ring buffer of timestamped readings. Consumers get
+    the buffered readings without blocking on the sensor. Bus errors are
+    counted as dropped readings; any other exception stops sampling, and
+    is raised again by :meth:`stop` and the reading methods.
+    """
+
+    def __init__(self, barometer, capacity=1024, interval=0.0,
+                 clock=time.time, sleep=None):
+        """
+        :param AbsI2CBarometer barometer: Driver to sample.
+        :param int capacity: Number of readings kept; oldest are overwritten.
+        :param float interval: Sec between the start of each reading. 0 to
+         sample as fast as the sensor allows.
+        :param clock: Function returning the current time in sec.
+        :param sleep: Function to wait a number of sec between readings.
+         Defaults to waiting until the sec pass or :meth:`stop` is called.
+        """
+        assert isinstance(capacity, int) and capacity > 0
+        self.barometer = barometer
+        self.capacity = capacity
+        self.interval = interval
+        self._timestamps = array('d', [0.0]) * capacity
+        self._temperatures = array('d', [0.0]) * capacity
+        self._pressures = array('d', [0.0]) * capacity
+        self.count = 0  # readings written since start
+        self.overruns = 0  # readings that took longer than interval
+        self.dropped = 0  # readings lost to bus errors
+        self.error = None  # exception that stopped sampling
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self.sleep = sleep or self._stop.wait
+        self._thread = None
+
+    @property
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Start the sampling thread.
+
+        :return BackgroundSampler: self
+        """
+        if self.is_running:
+            raise RuntimeError('Sampler is already running.')
+        self.error = None
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        """Stop the sampling thread, after any reading in progress.
+
+        :param float timeout: Max sec to wait for the thread to finish.
+        :raises Exception: The exception that stopped sampling, if any.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._raise_error()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            self.stop()
+        except Exception:
+            # Don't hide an exception already being raised.
+            if exc_type is None:
+                raise
+
+    def _raise_error(self):
+        if self.error is not None:
+            raise self.error
+
+    def _run(self):
+        try:
+            self._sample()
+        except Exception as e:
+            self.error = e
+
+    def _sample(self):
+        clock = self.clock
+        next_start = clock()
+        while not self._stop.is_set():
+            try:
+                reading = self.barometer.read_temperature_and_pressure()
+            except IOError:
+                self.dropped += 1
+            else:
+                self._append(clock(), *reading)
+            if self.interval:
+                next_start += self.interval
+                delay = next_start - clock()
+                if delay > 0:
+                    self.sleep(delay)
+                else:
+                    self.overruns += 1
+                    next_start = clock()
+
+    def _append(self, timestamp, temperature, pressure):
+        with self._lock:
+            index = self.count % self.capacity
+            self._timestamps[index] = timestamp
+            self._temperatures[index] = temperature
+            self._pressures[index] = pressure
+            self.count += 1
+
+    def _reading(self, number):
+        index = number % self.capacity
+        return Reading(self._timestamps[index],
+                       self._temperatures[index],
+                       self._pressures[index])
+
+    def latest(self):
+        """
+        :return Reading: Most recent reading, or None before the first one.
+        """
+        self._raise_error()
+        with self._lock:
+            if not self.count:
+                return None
+            return self._reading(self.count - 1)
+
+    def window(self, n):
+        """
+        :param int n: Number of readings.
+        :return list: Up to :attr:`n` most recent readings, oldest first.
+        """
+        self._raise_error()
+        with self._lock:
+            first = max(self.count - min(n, self.capacity), 0)
+            return [self._reading(i) for i in range(first, self.count)]
+
+    def since(self, timestamp):
+        """
+        :param float timestamp: Time from :func:`time.time`.
+        :return list: Buffered readings taken after :attr:`timestamp`,
+         oldest first.
+        """
+        self._raise_error()
+        with self._lock:
+            oldest = max(self.count - self.capacity, 0)
+            first = self.count
+            while first > oldest:
+                if self._timestamps[(first - 1) % self.capacity] <= timestamp:
+                    break
+                first -= 1
+            return [self._reading(i) for i in range(first, self.count)]
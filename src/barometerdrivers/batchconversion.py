@@ -0,0 +1,54 @@
+import numpy
+
+from .ms5803_01ba import MS5803_01BA
+
+
+def _square(values):
+    # float_power calls the same libm pow() as Python's `x ** 2`, so the
+    # results match the scalar driver bit for bit; numpy's `x * x` and
+    # `numpy.power` do not.
+    return numpy.float_power(values, 2)
+
+
+def convert_ms5803_01ba(raw_temperatures, raw_pressures, coefficients):
+    """Convert arrays of raw MS5803-01BA ADC readings, with the same
+    first and second order compensation as :class:`MS5803_01BA`.
+
+    :param raw_temperatures: Sequence of 24-bit unsigned D2 readings.
+    :param raw_pressures: Sequence of 24-bit unsigned D1 readings, same
+     length as :attr:`raw_temperatures`.
+    :param dict coefficients: PROM coefficients keyed by the names in
+     :attr:`MS5803_01BA.prom_coefficients`.
+    :return tuple: numpy arrays of temperature in degrees C, pressure in mbar.
+    """
+    raw_t = numpy.asarray(raw_temperatures, dtype=numpy.int64)
+    raw_p = numpy.asarray(raw_pressures, dtype=numpy.int64)
+    if raw_t.shape != raw_p.shape:
+        raise ValueError('Temperature and pressure arrays differ in shape.')
+    reference_temp = MS5803_01BA.reference_temp
+    very_low = -1500  # -15.00 C
+    very_high = 4500  # 45.00 C
+
+    d_t = raw_t - (coefficients['t_ref'] * 2**8)
+    temp = reference_temp + (1.0 * d_t * coefficients['tempsens'] / 2**23)
+
+    low = temp < reference_temp
+    t2 = numpy.where(low, 1.0 * d_t**2 / 2**31, 0.0)
+    off2 = numpy.where(low, 3.0 * _square(temp - reference_temp), 0.0)
+    sens2 = numpy.where(low, 7.0 * _square(temp - reference_temp) / 2**3, 0.0)
+    sens2 = numpy.where(temp < very_low,
+                        sens2 + 2.0 * _square(temp + 1500),
+                        sens2)
+    sens2 = numpy.where(temp > very_high,
+                        -(1.0 * _square(temp - very_high) / 2**3),
+                        sens2)
+    temperature = numpy.trunc(temp - t2) / 100.0
+
+    off = (coefficients['off_t1'] * 2**16) + (
+        1.0 * coefficients['tco'] * d_t / 2**7)
+    off -= off2
+    sens = (coefficients['sens_t1'] * 2**15) + (
+        1.0 * coefficients['tcs'] * d_t / 2**8)
+    sens -= sens2
+    pressure = ((raw_p * sens / 2**21) - off) / 2**15
+    return temperature, numpy.trunc(pressure) / 100.0
@@ -0,0 +1,40 @@
+import importlib
+import os
+
+BUS_ENVIRONMENT_VARIABLE = 'BAROMETERDRIVERS_BUS'
+BUSES = {
+    'smbus': 'barometerdrivers.i2creadwrite:I2CReadWrite',
+    'i2cdev': 'barometerdrivers.i2cdev:I2CDevReadWrite'
+}
+
+
+def load_bus(name):
+    """Import a bus backend by name, so the modules of backends that aren't
+    used, and their dependencies, are never imported.
+
+    :param str name: Key of :data:`BUSES`, or 'module:attribute' of a
+     callable taking `address` and `port`.
+    :return: The backend.
+    """
+    path = BUSES.get(name, name)
+    module_name, _, attribute = path.partition(':')
+    if not module_name or not attribute:
+        msg = "Unknown bus '{}'. Choose {}, or 'module:attribute'."
+        raise ValueError(msg.format(name, ', '.join(sorted(BUSES))))
+    module = importlib.import_module(module_name)
+    try:
+        return getattr(module, attribute)
+    except AttributeError:
+        raise ValueError("Module '{}' has no bus '{}'.".format(module_name,
+                                                               attribute))
+
+
+def environment_bus():
+    """
+    :return: Backend named by the environment variable in
+     :data:`BUS_ENVIRONMENT_VARIABLE`, or None if it isn't set.
+    """
+    name = os.environ.get(BUS_ENVIRONMENT_VARIABLE)
+    if name:
+        return load_bus(name)
+    return None
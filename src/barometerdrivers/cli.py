@@ -0,0 +1,384 @@
+"""Stream barometer readings as fast as the sensors allow.
+
+    barometer-sample -s MS5803_01BA -s HP206C --osr 1024 -o field.tsv
+    barometer-sample --bus simulated -s HP206C --duration 10 --smooth kalman
+    barometer-sample --hampel 3 --smooth kalman
+    barometer-sample --smooth lowpass --cutoff 0.5 --osr 1024
+
+Readings from every sensor are interleaved on the bus by
+:class:`I2CBusScheduler`. TSV output has the same columns as the bundled
+sample data, with sec counted from the start. Binary output is a sequence of
+:data:`SAMPLE_RECORD` records. Every `--stats` sec, the achieved samples per
+sec of each sensor, the fraction of time spent waiting for conversions and
+the count of dropped samples are written to stderr.
+"""
+import argparse
+import struct
+import sys
+import time
+
+from .hp206c import HP206C
+from .ms5803_01ba import MS5803_01BA
+from .scheduler import I2CBusScheduler
+from .smooth.kalmantable import (DEFAULT_KALMAN_PARAMETERS,
+                                 load_kalman_parameters)
+from .smooth.smoothalgorithms import (ExponentialMovingAverage, HampelFilter,
+                                      LowPassBiquad, OneDKalman, RollingMean,
+                                      RollingMedian, RollingRootMeanSquared)
+
+MODELS = {'MS5803_01BA': MS5803_01BA, 'HP206C': HP206C}
+DEFAULT_ADDRESSES = {'MS5803_01BA': 0x77, 'HP206C': 0x76}
+SAMPLE_RECORD = struct.Struct('<dBdd')  # timestamp, sensor id, temp., press.
+DECIMAL_PLACES = 2
+
+
+def parse_sensor(text):
+    """
+    :param str text: 'MODEL' or 'MODEL@ADDRESS', e.g. 'MS5803_01BA@0x76'.
+    :return tuple: Model name and I2C address.
+    """
+    model, _, address = text.partition('@')
+    if model not in MODELS:
+        msg = "Unknown sensor '{}'. Choose {}."
+        raise argparse.ArgumentTypeError(msg.format(
+            model, ', '.join(sorted(MODELS))))
+    if not address:
+        return model, DEFAULT_ADDRESSES[model]
+    try:
+        return model, int(address, 0)
+    except ValueError:
+        msg = "'{}' is not an I2C address."
+        raise argparse.ArgumentTypeError(msg.format(address))
+
+
+def sensor_names(sensors):
+    """
+    :param list sensors: Model name and address of each sensor.
+    :return list: Model name of each sensor, with the address appended if \
+     there is more than one of the model.
+    """
+    models = [model for model, _ in sensors]
+    return [model if models.count(model) == 1
+            else '{}@0x{:02x}'.format(model, address)
+            for model, address in sensors]
+
+
+def simulated_bus(sensors, port, trace=None):
+    """
+    :param list sensors: Model name and address of each sensor.
+    :param int port: I2C port.
+    :param str trace: TSV file to replay, instead of noise.
+    :return SimulatedBus: Bus with a simulated device for each sensor.
+    """
+    from .simulation import (NoiseSource, SimulatedBus, SimulatedHP206C,
+                             SimulatedMS5803_01BA, TraceSource)
+    devices = {'MS5803_01BA': SimulatedMS5803_01BA,
+               'HP206C': SimulatedHP206C}
+    bus = SimulatedBus()
+    for model, address in sensors:
+        source = TraceSource(trace, model) if trace else NoiseSource()
+        bus.attach(devices[model](source), address, port)
+    return bus
+
+
+def open_sensors(sensors, oversampling_rate, port, bus,
+                 temperature_samples=None, temperature_sec=None):
+    """
+    :param int temperature_samples: MS5803_01BA temperature reuse, see \
+     :meth:`AbsMS5803.set_temperature_reuse`.
+    :param float temperature_sec: Max age of a reused temperature.
+    :return list: Driver for each model name and address in \
+     :attr:`sensors`.
+    """
+    barometers = []
+    for model, address in sensors:
+        if model == 'HP206C':
+            if address != DEFAULT_ADDRESSES[model]:
+                raise ValueError('HP206C is only at address 0x76.')
+            barometers.append(HP206C(oversampling_rate, port, bus=bus))
+        elif address in (0x76, 0x77):
+            barometer = MS5803_01BA(oversampling_rate, address == 0x77, port,
+                                    bus=bus)
+            barometer.set_temperature_reuse(temperature_samples,
+                                            temperature_sec)
+            barometers.append(barometer)
+        else:
+            raise ValueError('MS5803_01BA is only at address 0x76 or 0x77.')
+    return barometers
+
+
+def smoother_factory(args, model):
+    """
+    :return: Function taking an initial value and quantity, returning a \
+     smoother, or None if readings aren't smoothed.
+    """
+    if args.smooth == 'mean':
+        return lambda value, quantity: RollingMean(value, args.window,
+                                                   DECIMAL_PLACES)
+    if args.smooth == 'rms':
+        return lambda value, quantity: RollingRootMeanSquared(
+            value, args.window, DECIMAL_PLACES)
+    if args.smooth == 'median':
+        return lambda value, quantity: RollingMedian(value, args.window,
+                                                     DECIMAL_PLACES)
+    # Cutoffs are relative to the target rate, or else the datasheet rate.
+    sample_rate = args.rate or MODELS[model].sample_rate_hz(args.osr)
+    if args.smooth == 'ema':
+        return lambda value, quantity: ExponentialMovingAverage(
+            value, args.cutoff, sample_rate, DECIMAL_PLACES)
+    if args.smooth == 'lowpass':
+        return lambda value, quantity: LowPassBiquad(
+            value, args.cutoff, sample_rate, DECIMAL_PLACES, args.sections)
+    if args.smooth == 'kalman':
+        def kalman(value, quantity):
+            parameters = DEFAULT_KALMAN_PARAMETERS
+            if args.kalman_table:
+                parameters = load_kalman_parameters(
+                    args.kalman_table, model, args.osr, quantity)
+            return OneDKalman(value, *parameters + (DECIMAL_PLACES,))
+        return kalman
+    return None
+
+
+def outlier_filter_factory(args):
+    """
+    :return: Function taking an initial value and quantity, returning a \
+     :class:`HampelFilter`, or None if outliers aren't rejected.
+    """
+    if args.hampel is None:
+        return None
+    return lambda value, quantity: HampelFilter(value, args.window,
+                                                args.hampel, DECIMAL_PLACES)
+
+
+class Smoother(object):
+    """Smooths temperature and pressure of one sensor, passing each reading
+    through a stage made by each factory in turn.
+    """
+
+    def __init__(self, *factories):
+        self.factories = factories
+        self.stages = None
+
+    def __call__(self, temperature, pressure):
+        if self.stages is None:
+            self.stages = []
+            for factory in self.factories:
+                stage = (factory(temperature, 'temperature'),
+                         factory(pressure, 'pressure'))
+                self.stages.append(stage)
+                temperature, pressure = stage[0].value, stage[1].value
+            return temperature, pressure
+        for temperature_stage, pressure_stage in self.stages:
+            temperature_stage.update(temperature)
+            pressure_stage.update(pressure)
+            temperature, pressure = temperature_stage.value, \
+                pressure_stage.value
+        return temperature, pressure
+
+
+class TSVWriter(object):
+
+    def __init__(self, output, names, oversampling_rate):
+        self.output = output
+        self.names = names
+        self.oversampling_rate = oversampling_rate
+        self.start_time = None
+        output.write('sensor\toversampling\tsec\ttemperature\tpressure\n')
+
+    def write(self, sensor_id, timestamp, temperature, pressure):
+        if self.start_time is None:
+            self.start_time = timestamp
+        self.output.write('{}\t{}\t{:.4f}\t{}\t{}\n'.format(
+            self.names[sensor_id], self.oversampling_rate,
+            timestamp - self.start_time, temperature, pressure))
+
+
+class BinaryWriter(object):
+
+    def __init__(self, output):
+        self.output = output
+
+    def write(self, sensor_id, timestamp, temperature, pressure):
+        self.output.write(SAMPLE_RECORD.pack(timestamp, sensor_id,
+                                             temperature, pressure))
+
+
+class Statistics(object):
+    """Reports scheduler throughput since the last report."""
+
+    def __init__(self, scheduler, names, stream):
+        self.scheduler = scheduler
+        self.names = names
+        self.stream = stream
+        self.last_time = None
+        self.last_counts = {}
+        self.last_sleep_sec = 0.0
+
+    def report(self):
+        scheduler = self.scheduler
+        now = time.time()
+        elapsed = max(now - (self.last_time or scheduler.start_time), 1e-9)
+        fields = ['{:8.1f}s'.format(now - scheduler.start_time)]
+        for barometer, name in self.names.items():
+            count = scheduler.counts[barometer]
+            rate = (count - self.last_counts.get(barometer, 0)) / elapsed
+            self.last_counts[barometer] = count
+            fields.append('{} {:.1f}/s'.format(name, rate))
+        wait = (scheduler.sleep_sec - self.last_sleep_sec) / elapsed
+        self._write(fields, wait)
+        self.last_time = now
+        self.last_sleep_sec = scheduler.sleep_sec
+
+    def summary(self):
+        """Report throughput over the whole run."""
+        scheduler = self.scheduler
+        fields = ['{:8.1f}s'.format(scheduler.elapsed_sec()), 'total']
+        rates = scheduler.achieved_rates()
+        for barometer, name in self.names.items():
+            fields.append('{} {:.1f}/s'.format(name, rates[barometer]))
+        self._write(fields, scheduler.wait_fraction())
+
+    def _write(self, fields, wait):
+        fields.append('wait {:.0%}'.format(wait))
+        dropped = sum(self.scheduler.dropped.values())
+        fields.append('dropped {}'.format(dropped))
+        self.stream.write('  '.join(fields) + '\n')
+        self.stream.flush()
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('-s', '--sensor', action='append', type=parse_sensor,
+                        help='MODEL[@ADDRESS] of a sensor to read. Repeat '
+                             'for more sensors. Default MS5803_01BA.')
+    parser.add_argument('--osr', type=int, default=4096,
+                        help='Oversampling rate of every sensor.')
+    parser.add_argument('--port', type=int, default=1, help='I2C port.')
+    parser.add_argument('--bus', default=None,
+                        help="'smbus', 'i2cdev', 'simulated', or "
+                             "'module:attribute' of a bus backend.")
+    parser.add_argument('--trace',
+                        help='TSV file replayed by the simulated bus.')
+    parser.add_argument('--rate', type=float, default=0,
+                        help='Target samples per sec of each sensor. '
+                             '0 for as fast as possible.')
+    parser.add_argument('--duration', type=float,
+                        help='Sec to sample for. Default forever.')
+    parser.add_argument('-o', '--output', default='-',
+                        help="Output file, or '-' for stdout.")
+    parser.add_argument('-f', '--format', choices=['tsv', 'binary'],
+                        default='tsv')
+    parser.add_argument('--smooth',
+                        choices=['none', 'kalman', 'mean', 'median', 'rms',
+                                 'ema', 'lowpass'],
+                        default='none')
+    parser.add_argument('--window', type=int, default=16,
+                        help='Readings in rolling mean, median, RMS and '
+                             'Hampel windows.')
+    parser.add_argument('--cutoff', type=float, default=1.0,
+                        help='Cutoff in Hz of ema and lowpass smoothing.')
+    parser.add_argument('--sections', type=int, default=2,
+                        help='Biquads in lowpass smoothing, each adding 2 '
+                             'to the filter order.')
+    parser.add_argument('--hampel', type=float, metavar='N_SIGMAS',
+                        help='Replace readings more than N_SIGMAS from the '
+                             'rolling median with it, before smoothing.')
+    parser.add_argument('--kalman-table',
+                        help='Tuned parameters from kalman_sweep.py.')
+    parser.add_argument('--temperature-samples', type=int,
+                        help='MS5803_01BA: reuse each temperature reading '
+                             'for this many samples.')
+    parser.add_argument('--temperature-sec', type=float,
+                        help='MS5803_01BA: max age of a reused temperature.')
+    parser.add_argument('--stats', type=float, default=1.0,
+                        help='Sec between statistics on stderr. 0 for none.')
+    return parser
+
+
+def _open_output(path, is_binary):
+    if path == '-':
+        if is_binary:
+            return getattr(sys.stdout, 'buffer', sys.stdout), False
+        return sys.stdout, False
+    return open(path, 'wb' if is_binary else 'w'), True
+
+
+def sample(args, stderr=None):
+    """Sample until :attr:`args.duration` passes, or interrupted.
+
+    :param argparse.Namespace args: Parsed arguments.
+    :param stderr: Stream for statistics. Defaults to `sys.stderr`.
+    :return I2CBusScheduler: The finished scheduler.
+    """
+    sensors = args.sensor or [parse_sensor('MS5803_01BA')]
+    bus = args.bus
+    if bus == 'simulated':
+        bus = simulated_bus(sensors, args.port, args.trace)
+    barometers = open_sensors(sensors, args.osr, args.port, bus,
+                              args.temperature_samples, args.temperature_sec)
+    names = sensor_names(sensors)
+    ids = {barometer: i for i, barometer in enumerate(barometers)}
+    outlier_filter = outlier_filter_factory(args)
+    smoothers = []
+    for model, _ in sensors:
+        factories = [factory for factory in (outlier_filter,
+                                             smoother_factory(args, model))
+                     if factory is not None]
+        smoothers.append(Smoother(*factories) if factories else None)
+    scheduler = I2CBusScheduler({b: args.rate for b in barometers})
+    output, should_close = _open_output(args.output, args.format == 'binary')
+    if args.format == 'binary':
+        writer = BinaryWriter(output)
+    else:
+        writer = TSVWriter(output, names, args.osr)
+    statistics = Statistics(scheduler, dict(zip(barometers, names)),
+                            stderr or sys.stderr)
+    next_report = time.time() + args.stats
+    try:
+        for barometer, timestamp, temperature, pressure in \
+                scheduler.samples(args.duration):
+            sensor_id = ids[barometer]
+            if smoothers[sensor_id] is not None:
+                temperature, pressure = smoothers[sensor_id](temperature,
+                                                             pressure)
+            writer.write(sensor_id, timestamp, temperature, pressure)
+            if args.stats and timestamp >= next_report:
+                output.flush()
+                statistics.report()
+                next_report = timestamp + args.stats
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if should_close:
+            output.close()
+        else:
+            output.flush()
+    if args.stats and scheduler.start_time is not None:
+        statistics.summary()
+    return scheduler
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.window < 1:
+        parser.error('--window must be at least 1.')
+    if args.sections < 1:
+        parser.error('--sections must be at least 1.')
+    if args.hampel is not None and args.hampel < 0:
+        parser.error('--hampel must not be negative.')
+    if args.temperature_samples is not None and args.temperature_samples < 1:
+        parser.error('--temperature-samples must be at least 1.')
+    if args.trace and args.bus != 'simulated':
+        parser.error('--trace needs --bus simulated.')
+    try:
+        sample(args)
+    except (IOError, ValueError) as error:
+        sys.stderr.write('{}\n'.format(error))
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -6,9 +6,11 @@ from .util import is_unsigned_byte
 def validate_unsigned_byte_command(func):
     """`self` is arg0 and command byte is arg1."""
     @wraps(func)
-    def wrapper(*args, **kwargs):
-        if not is_unsigned_byte(args[1]):
-            raise ValueError("'{}' is not an unsigned byte.".format(args[1]))
-        else:
-            return func(*args, **kwargs)
+    def wrapper(self, command, *args, **kwargs):
+        # Plain ints from a driver's plan pass the first, cheap check.
+        if type(command) is not int or not 0x00 <= command <= 0xff:
+            if not is_unsigned_byte(command):
+                msg = "'{}' is not an unsigned byte."
+                raise ValueError(msg.format(command))
+        return func(self, command, *args, **kwargs)
     return wrapper
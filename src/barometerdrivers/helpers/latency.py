@@ -0,0 +1,53 @@
+class ConversionLatencyModel(object):
+    """Learns how long conversions take, separately for each key (e.g. OSR
+    and command), from when the device was first seen to be ready.
+
+    A conversion that was already complete at the first poll only gives an
+    upper bound on its duration, so the estimate is decayed slightly and
+    probes for a shorter time. A conversion that was still running at the
+    first poll was measured to within the poll interval, and the estimate
+    is raised to it. The estimate therefore settles just above the true
+    conversion time, with an occasional extra poll.
+    """
+
+    def __init__(self, decay=0.03):
+        """
+        :param float decay: Fraction the estimate shrinks by after each
+         conversion that was complete at the first poll.
+        """
+        assert 0 < decay < 1
+        self.decay = decay
+        self._estimates = {}
+        self._minimums = {}
+
+    def expected(self, key, default):
+        """
+        :param key: Hashable conversion type.
+        :param float default: Returned until :attr:`key` is observed.
+        :return float: Expected conversion time in sec.
+        """
+        return self._estimates.get(key, default)
+
+    def observe(self, key, seconds, first_poll_ready, default):
+        """
+        :param key: Hashable conversion type.
+        :param float seconds: Time from command until device was seen ready.
+        :param bool first_poll_ready: Device was ready at the first poll.
+        :param float default: Expected conversion time before any
+         observations.
+        """
+        estimate = self._estimates.get(key, default)
+        if first_poll_ready:
+            estimate *= 1 - self.decay
+        else:
+            estimate = max(estimate, seconds)
+        self._estimates[key] = estimate
+        self._minimums[key] = min(self._minimums.get(key, seconds), seconds)
+
+    def minimum(self, key, default):
+        """
+        :param key: Hashable conversion type.
+        :param float default: Returned until :attr:`key` is observed.
+        :return float: Fastest conversion ever observed in sec.
+        """
+        return self._minimums.get(key, default)
@@ -0,0 +1,31 @@
+import importlib
+import sys
+
+
+def lazy_attributes(package, names):
+    """Module `__getattr__` and `__dir__` (PEP 562) that import attributes
+    of :attr:`package` from its submodules on first access. Before Python
+    3.7 they're imported now instead.
+
+    :param str package: `__name__` of the package.
+    :param dict names: Relative submodule name, keyed by attribute name.
+    :return tuple: `__getattr__` and `__dir__` for the package.
+    """
+    module = sys.modules[package]
+
+    def __getattr__(name):
+        if name not in names:
+            raise AttributeError("module '{}' has no attribute '{}'".format(
+                package, name))
+        submodule = importlib.import_module(names[name], package)
+        value = getattr(submodule, name)
+        setattr(module, name, value)
+        return value
+
+    def __dir__():
+        return sorted(set(vars(module)) | set(names))
+
+    if sys.version_info < (3, 7):  # pragma: no cover
+        for name in names:
+            __getattr__(name)
+    return __getattr__, __dir__
@@ -1,7 +1,17 @@
+import binascii
 import functools
 import itertools
+import sys
+from array import array
 
 BITS_IN_BYTE = 8
+# Sign extension byte for each possible most significant byte.
+_SIGN_TABLE = bytes(bytearray([0x00] * 0x80 + [0xff] * 0x80))
+# array typecodes of at least 2 and 4 bytes; exact sizes are checked below.
+_TYPECODES = {(2, False): 'H', (2, True): 'h',
+              (4, False): 'I', (4, True): 'i'}
+if array('I').itemsize != 4:  # pragma: no cover
+    _TYPECODES.update({(4, False): 'L', (4, True): 'l'})
 
 
 def do_bitwise_or(val1, val2, *args):
@@ -37,19 +47,47 @@ def is_bit_set(value, index):
     return bit == 1
 
 
+def _to_bytearray(data_array):
+    """Validate all values at once, by letting :class:`bytearray` check them.
+
+    :param data_array: List of byte values, or a bytes-like object.
+    :return bytearray: Copy of :attr:`data_array`.
+    """
+    try:
+        return bytearray(data_array)
+    except (TypeError, ValueError):
+        are_bytes = [is_unsigned_byte(i) for i in data_array]
+        _raise_not_bytes_value_error(data_array, are_bytes)
+
+
+if hasattr(int, 'from_bytes'):
+    def bytes_to_int(data, signed=False):
+        """
+        :param data: Big-endian bytes-like object.
+        :param bool signed: :attr:`data` is in 2's complement format.
+        :return int: Integer value of :attr:`data`.
+        """
+        return int.from_bytes(data, 'big', signed=signed)
+else:  # pragma: no cover
+    def bytes_to_int(data, signed=False):
+        """
+        :param data: Big-endian bytes-like object.
+        :param bool signed: :attr:`data` is in 2's complement format.
+        :return int: Integer value of :attr:`data`.
+        """
+        data = bytes(bytearray(data))
+        value = int(binascii.hexlify(data) or b'0', 16)
+        if signed and data and ord(data[0:1]) & 0x80:
+            value -= 1 << (len(data) * BITS_IN_BYTE)
+        return value
+
+
 def array_block_to_unsigned_int(data_array):
     """
     :param list data_array: List of byte values.
     :return int: Unsigned integer value of :attr:`data_array`.
     """
-    are_bytes = [is_unsigned_byte(i) for i in data_array]
-    if not all(are_bytes):
-        _raise_not_bytes_value_error(data_array, are_bytes)
-    value = 0
-    for byte in data_array:
-        value <<= BITS_IN_BYTE
-        value |= byte
-    return value
+    return bytes_to_int(_to_bytearray(data_array))
 
 
 def _raise_not_bytes_value_error(data, are_bytes):
@@ -83,6 +121,36 @@ def array_block_to_signed_int(data_array):
     :param list data_array: List of byte values in 2's complement format.
     :return int: Signed integer value of :attr:`data_array`.
     """
-    value = array_block_to_unsigned_int(data_array)
-    bits = len(data_array) * BITS_IN_BYTE
-    return twos_compliment_to_signed_int(value, bits)
+    return bytes_to_int(_to_bytearray(data_array), signed=True)
+
+
+def decode_frames(data, width, signed=False):
+    """Decode a buffer of packed big-endian integers, such as a burst of \
+    ADC readings or the records of a raw log, in one pass. For 6 byte \
+    HP206C temperature and pressure frames, use a :attr:`width` of 3; \
+    temperatures are then the even and pressures the odd elements.
+
+    :param data: bytes, bytearray, memoryview or list of byte values.
+    :param int width: Bytes per integer: 1, 2, 3 or 4.
+    :param bool signed: Integers are in 2's complement format.
+    :return array: Decoded integers. Use :func:`numpy.frombuffer` on the \
+     result for a NumPy array without copying.
+    """
+    data = _to_bytearray(data)
+    if width not in (1, 2, 3, 4):
+        raise ValueError("Invalid width '{}'. Use 1, 2, 3 or 4.".format(width))
+    if len(data) % width:
+        msg = "Buffer length '{}' is not a multiple of width '{}'."
+        raise ValueError(msg.format(len(data), width))
+    size = 2 if width <= 2 else 4
+    padded = bytearray(len(data) // width * size)
+    for i in range(width):
+        padded[size - width + i::size] = data[i::width]
+    if signed:
+        sign = data[0::width].translate(_SIGN_TABLE)
+        for i in range(size - width):
+            padded[i::size] = sign
+    values = array(_TYPECODES[size, signed], bytes(padded))
+    if sys.byteorder == 'little':
+        values.byteswap()
+    return values
@@ -1,8 +1,19 @@
+from collections import namedtuple
 from functools import partial
 import time
 
-from .absi2cbarometer import AbsI2CBarometer, OSRValue
-from .helpers.util import array_block_to_signed_int, do_bitwise_or, is_bit_set
+from .absi2cbarometer import AbsI2CBarometer, MeasurementStep, OSRValue
+from .helpers.latency import ConversionLatencyModel
+from .helpers.util import array_block_to_signed_int, do_bitwise_or
+
+HP206CPlan = namedtuple('HP206CPlan', ['temperature', 'pressure',
+                                       'ready_command'])
+# A conversion of temperature only, or of temperature and pressure.
+ConversionPlan = namedtuple('ConversionPlan', ['command', 'datasheet_sec',
+                                               'key'])
+ThresholdEvent = namedtuple('ThresholdEvent', ['timestamp', 'events',
+                                               'directions', 'temperature',
+                                               'pressure'])
 
 
 class _HP206Ccommands(object):
@@ -36,11 +47,38 @@ class _HP206Cregisters(object):
     compensation = 0x0f
 
 
+class _HP206Cinterrupts(object):
+    """Interrupt bits for HP206C barometer. Events share their bit in the \
+    enable (INT_EN), status (INT_SRC) and direction (INT_DIR) registers.
+    """
+    device_ready = 0x40
+    pressure_ready = 0x20
+    temperature_ready = 0x10
+    pressure_traverse = 0x08  # crossed mid threshold; direction 1 if rising
+    temperature_traverse = 0x04
+    pressure_window = 0x02  # outside low to high; direction 1 if above high
+    temperature_window = 0x01
+    threshold_events = 0x0f
+    pressure_mode = 0x40  # INT_CFG PA_MODE: thresholds are pressure
+
+
 class HP206C(AbsI2CBarometer):
-    """Driver for getting temperature and pressure data from HP206C."""
+    """Driver for getting temperature and pressure data from HP206C.
+    Conversion times are learned as readings are taken: the driver sleeps
+    until just before a conversion is expected to finish, then polls the
+    DEV_RDY bit at a fine interval.
+    """
 
     commands = _HP206Ccommands()
     registers = _HP206Cregisters()
+    interrupts = _HP206Cinterrupts()
+    pressure_threshold_mbar = 0.02  # LSB of pressure thresholds
+    ready_margin_sec = 0.0005
+    ready_poll_sec = 0.0005
+    conversions = 0
+    ready_polls = 0
+    wasted_wait_sec = 0.0
+    interrupt_status = 0  # INT_SRC at the last ready poll
     osr_conversion = {
         128 : OSRValue(0x14, 2.1),
         256 : OSRValue(0x10, 4.1),
@@ -50,8 +88,9 @@ class HP206C(AbsI2CBarometer):
         4096: OSRValue(0x00, 65.6)
     }
 
-    def __init__(self, oversampling_rate=4096, port=1):
-        super(HP206C, self).__init__(0x76, oversampling_rate, port)
+    def __init__(self, oversampling_rate=4096, port=1, bus=None):
+        super(HP206C, self).__init__(0x76, oversampling_rate, port, bus)
+        self.latency_model = ConversionLatencyModel()
         self.send_reset()
         self.wait_until_ready(delay=0.1)
 
@@ -61,6 +100,24 @@ class HP206C(AbsI2CBarometer):
         """
         self.i2c.write_byte(self.commands.soft_reset)
 
+    def _compile_plan(self, osr):
+        """
+        :param int osr: Valid oversampling rate.
+        :return HP206CPlan: ADC commands, datasheet conversion times in \
+         sec, and latency model keys, for temperature only and for \
+         temperature and pressure; and the INT_SRC read command.
+        """
+        osr_value = self.osr_conversion[osr]
+        msec = osr_value.msec
+        temperature = ConversionPlan(self.commands.adc_temp(osr_value.command),
+                                     msec / 1000.0, (osr, True))
+        pressure = ConversionPlan(
+            self.commands.adc_pressure_temp(osr_value.command),
+            msec / 500.0, (osr, False))
+        ready_command = self.commands.read_register(
+            self.registers.interrupt_status)
+        return HP206CPlan(temperature, pressure, ready_command)
+
     def send_adc_command(self, temperature_only=False):
         """Send analog-to-digital converter command, which tells HP206C
         to make a new reading.
@@ -68,62 +125,280 @@ class HP206C(AbsI2CBarometer):
         :param bool temperature_only: When True, only measure temperature.
          When False, measure both temperature and pressure/altitude.
         """
-        osr = self.osr_conversion[self.oversampling_rate].command
         if temperature_only:
-            self.i2c.write_byte(self.commands.adc_temp(osr))
+            self.i2c.write_byte(self.plan.temperature.command)
         else:
-            self.i2c.write_byte(self.commands.adc_pressure_temp(osr))
+            self.i2c.write_byte(self.plan.pressure.command)
 
     def is_ready(self):
         """Check DEV_RDY bit (6) on the interrupt status (INT_SRC) register.
 
         :return bool: Device is available for data access.
         """
-        register = self.registers.interrupt_status
-        command = self.commands.read_register(register)
-        status = self.i2c.read_byte_data(command)
-        return is_bit_set(status, 6)
+        status = self.i2c.read_byte_data(self.plan.ready_command)
+        self.interrupt_status = status
+        return bool(status & 0x40)
+
+    def read_register(self, register):
+        """
+        :param int register: Register address, from :attr:`registers`.
+        :return int: Register value.
+        """
+        return self.i2c.read_byte_data(self.commands.read_register(register))
+
+    def write_register(self, register, value):
+        """
+        :param int register: Register address, from :attr:`registers`.
+        :param int value: Unsigned byte to write.
+        """
+        self.i2c.write_byte_data(self.commands.write_register(register),
+                                 value)
+
+    def set_pressure_thresholds(self, low=None, mid=None, high=None):
+        """Program pressure thresholds, and set INT_CFG to compare them \
+        with pressure rather than altitude. Thresholds left as None are \
+        unchanged.
+
+        :param float low: Low end of the pressure window in mbar.
+        :param float mid: Traverse threshold in mbar.
+        :param float high: High end of the pressure window in mbar.
+        """
+        thresholds = ((self.registers.low_pressure_threshold, low),
+                      (self.registers.mid_pressure_threshold, mid),
+                      (self.registers.high_pressure_threshold, high))
+        for (lsb_register, msb_register), mbar in thresholds:
+            if mbar is None:
+                continue
+            value = int(round(mbar / self.pressure_threshold_mbar))
+            if not 0 <= value <= 0xffff:
+                msg = "'{}' mbar is out of the pressure threshold range."
+                raise ValueError(msg.format(mbar))
+            self.write_register(lsb_register, value & 0xff)
+            self.write_register(msb_register, value >> 8)
+        configure = self.read_register(self.registers.interrupt_configure)
+        self.write_register(self.registers.interrupt_configure,
+                            configure | self.interrupts.pressure_mode)
+
+    def set_temperature_thresholds(self, low=None, mid=None, high=None):
+        """Program temperature thresholds, in whole degrees C. Thresholds \
+        left as None are unchanged.
+
+        :param float low: Low end of the temperature window.
+        :param float mid: Traverse threshold.
+        :param float high: High end of the temperature window.
+        """
+        thresholds = ((self.registers.low_temp_threshold, low),
+                      (self.registers.mid_temp_threshold, mid),
+                      (self.registers.high_temp_threshold, high))
+        for register, temperature in thresholds:
+            if temperature is None:
+                continue
+            value = int(round(temperature))
+            if not -0x80 <= value <= 0x7f:
+                msg = "'{}' C is out of the temperature threshold range."
+                raise ValueError(msg.format(temperature))
+            self.write_register(register, value & 0xff)
+
+    def enable_interrupts(self, events):
+        """
+        :param int events: Bitwise or of :attr:`interrupts` events to flag \
+         in INT_SRC, e.g. `interrupts.pressure_window`. 0 disables all.
+        """
+        self.write_register(self.registers.interrupt_enable, events)
+
+    def monitor(self, temperature_only=False, interval=0.0, duration=None):
+        """Convert continuously, but only read the single byte INT_SRC \
+        register, which also signals when the conversion is ready. \
+        Temperature and pressure data, and the event directions, are only \
+        read when a threshold event is flagged. Program thresholds and \
+        :meth:`enable_interrupts` first.
+
+        :param bool temperature_only: Only convert and compare temperature.
+        :param float interval: Sec between the start of each conversion. \
+         0 to convert as fast as the device allows.
+        :param float duration: Stop after this many sec. Forever when None.
+        :return generator: :class:`ThresholdEvent` for each conversion \
+         that flagged an event. `pressure` is None if \
+         :attr:`temperature_only`.
+        """
+        start = next_start = time.time()
+        while duration is None or next_start - start < duration:
+            self._wait_for_conversion(temperature_only)
+            events = self.interrupt_status & self.interrupts.threshold_events
+            if events:
+                yield self._threshold_event(events, temperature_only)
+            if interval:
+                next_start += interval
+                delay = next_start - time.time()
+                if delay > 0:
+                    self._sleep(delay)
+            else:
+                next_start = time.time()
+
+    def _threshold_event(self, events, temperature_only):
+        """
+        :param int events: Threshold events flagged in INT_SRC.
+        :param bool temperature_only: Only temperature was converted.
+        :return ThresholdEvent: Events, their directions and the data.
+        """
+        directions = self.read_register(self.registers.interrupt_events)
+        directions &= events
+        if temperature_only:
+            temperature, pressure = self._read_temperature_data(), None
+        else:
+            temperature, pressure = self._read_temperature_and_pressure_data()
+        return ThresholdEvent(time.time(), events, directions, temperature,
+                              pressure)
 
     def wait_until_ready(self, delay=0.0, poll_rate=0.01):
         """
         :param float delay: Initial blocking period in sec.
         :param float poll_rate: Subsequent device polling rate in sec.
         """
-        time.sleep(delay)
+        self._sleep(delay)
         while not self.is_ready():
-            time.sleep(poll_rate)
+            self._sleep(poll_rate)
+
+    @property
+    def polls_per_sample(self):
+        """
+        :return float: Mean INT_SRC reads per completed conversion.
+        """
+        return self.ready_polls / float(self.conversions or 1)
+
+    def _start_conversion(self, temperature_only=False):
+        """Send ADC command, and predict when the conversion will finish.
+
+        :param bool temperature_only: Only measure temperature.
+        :return float: :func:`time.time` at which to start polling.
+        """
+        if temperature_only:
+            conversion = self.plan.temperature
+        else:
+            conversion = self.plan.pressure
+        self.i2c.write_byte(conversion.command)
+        start = time.time()
+        self._conversion = conversion, start
+        self._conversion_polls = 0
+        expected = self.latency_model.expected(conversion.key,
+                                               conversion.datasheet_sec)
+        return start + max(expected - self.ready_margin_sec, 0.0)
+
+    def _poll_conversion(self):
+        """Poll DEV_RDY once. When ready, learn the conversion time, and \
+        count any time spent waiting beyond the fastest conversion seen.
+
+        :return bool: Conversion is complete.
+        """
+        self.ready_polls += 1
+        self._conversion_polls += 1
+        if not self.is_ready():
+            return False
+        conversion, start = self._conversion
+        elapsed = time.time() - start
+        self.latency_model.observe(conversion.key, elapsed,
+                                   self._conversion_polls == 1,
+                                   conversion.datasheet_sec)
+        self.conversions += 1
+        if self.instrumentation is not None:
+            self.instrumentation.record('conversion', elapsed)
+        fastest = self.latency_model.minimum(conversion.key, elapsed)
+        self.wasted_wait_sec += elapsed - fastest
+        return True
+
+    def _wait_for_conversion(self, temperature_only=False):
+        """Start a conversion, and block until it is complete.
+
+        :param bool temperature_only: Only measure temperature.
+        """
+        delay = self._start_conversion(temperature_only) - time.time()
+        if delay > 0:
+            self._sleep(delay)
+        while not self._poll_conversion():
+            self._sleep(self.ready_poll_sec)
 
     def read_temperature(self):
         """
         :return float: Temperature in degrees C.
         """
-        delay = self.osr_conversion[self.oversampling_rate].msec / 1000
-        self.send_adc_command(temperature_only=True)
-        self.wait_until_ready(delay=delay)
-        command = self.commands.read_temp
-        array = self.i2c.read_block_data(command, 3)
-        return array_block_to_signed_int(array) / 100.0
+        self._wait_for_conversion(temperature_only=True)
+        return self._read_temperature_data()
 
     def read_pressure(self):
         """
         :return float: Pressure in mBar
         """
-        delay = self.osr_conversion[self.oversampling_rate].msec / 500
-        self.send_adc_command()
-        self.wait_until_ready(delay=delay)
-        command = self.commands.read_pressure
+        self._wait_for_conversion()
+        return self._read_pressure_data()
+
+    def read_temperature_and_pressure(self):
+        """
+        :return tuple: Temperature in degrees C, pressure in mBar.
+        """
+        self._wait_for_conversion()
+        return self._read_temperature_and_pressure_data()
+
+    def read_raw_temperature_and_pressure(self):
+        """
+        :return tuple: Signed temperature in 0.01 degrees C, \
+         signed pressure in 0.01 mBar.
+        """
+        self._wait_for_conversion()
+        return self._read_raw_temperature_and_pressure_data()
+
+    def start_measurement(self):
+        """Begin a temperature and pressure measurement without blocking.
+
+        :return float: :func:`time.time` at which to call \
+         :meth:`step_measurement`.
+        """
+        return self._start_conversion()
+
+    def step_measurement(self):
+        """Poll the device once, and read the measurement if it is ready.
+
+        :return MeasurementStep: Next poll time, or result tuple of \
+         temperature in degrees C and pressure in mBar.
+        """
+        if not self._poll_conversion():
+            return MeasurementStep(time.time() + self.ready_poll_sec, None)
+        result = self._read_temperature_and_pressure_data()
+        return MeasurementStep(None, result)
+
+    def _read_temperature_data(self):
+        """Read result of the last conversion. Device must be ready.
+
+        :return float: Temperature in degrees C.
+        """
+        command = self.commands.read_temp
         array = self.i2c.read_block_data(command, 3)
         return array_block_to_signed_int(array) / 100.0
 
-    def read_temperature_and_pressure(self):
+    def _read_pressure_data(self):
+        """Read result of the last conversion. Device must be ready.
+
+        :return float: Pressure in mBar.
         """
+        command = self.commands.read_pressure
+        array = self.i2c.read_block_data(command, 3)
+        return array_block_to_signed_int(array) / 100.0
+
+    def _read_temperature_and_pressure_data(self):
+        """Read result of the last conversion. Device must be ready.
+
         :return tuple: Temperature in degrees C, pressure in mBar.
         """
-        delay = self.osr_conversion[self.oversampling_rate].msec / 500
-        self.send_adc_command()
-        self.wait_until_ready(delay=delay)
+        temperature, pressure = self._read_raw_temperature_and_pressure_data()
+        return temperature / 100.0, pressure / 100.0
+
+    def _read_raw_temperature_and_pressure_data(self):
+        """Read result of the last conversion. Device must be ready.
+
+        :return tuple: Signed temperature in 0.01 degrees C, \
+         signed pressure in 0.01 mBar.
+        """
         command = self.commands.read_temp_pressure
         array = self.i2c.read_block_data(command, 6)
-        temperature = array_block_to_signed_int(array[:3]) / 100.0
-        pressure = array_block_to_signed_int(array[3:]) / 100.0
+        temperature = array_block_to_signed_int(array[:3])
+        pressure = array_block_to_signed_int(array[3:])
         return temperature, pressure
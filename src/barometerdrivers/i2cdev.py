@@ -0,0 +1,138 @@
+import ctypes
+import fcntl
+import os
+import sys
+
+from .helpers.decorators import validate_unsigned_byte_command
+from .helpers.util import is_unsigned_byte
+
+I2C_RDWR = 0x0707  # combined read/write transfer, from linux/i2c-dev.h
+I2C_M_RD = 0x0001  # read message flag, from linux/i2c.h
+
+
+class _I2CMsg(ctypes.Structure):
+    """struct i2c_msg"""
+    _fields_ = [('addr', ctypes.c_uint16),
+                ('flags', ctypes.c_uint16),
+                ('len', ctypes.c_uint16),
+                ('buf', ctypes.POINTER(ctypes.c_uint8))]
+
+
+class _I2CRdwrIoctlData(ctypes.Structure):
+    """struct i2c_rdwr_ioctl_data"""
+    _fields_ = [('msgs', ctypes.POINTER(_I2CMsg)),
+                ('nmsgs', ctypes.c_uint32)]
+
+
+class _Transaction(object):
+    """Preallocated I2C_RDWR arguments for writing a command byte, and
+    optionally reading the response in the same transaction.
+    """
+
+    def __init__(self, address, write_length, read_length):
+        """
+        :param int address: I2C device address.
+        :param int write_length: Number of bytes to write.
+        :param int read_length: Number of bytes to read; 0 for write only.
+        """
+        self.write_buffer = (ctypes.c_uint8 * write_length)()
+        self.read_buffer = bytearray(read_length)
+        # Indexing a memoryview gives 1 byte strings before Python 3, so
+        # hand out the bytearray itself there.
+        if sys.version_info < (3,):
+            self.response = self.read_buffer
+        else:
+            self.response = memoryview(self.read_buffer)
+        count = 2 if read_length else 1
+        self.messages = (_I2CMsg * count)()
+        self.messages[0] = _I2CMsg(address, 0, write_length,
+                                   self.write_buffer)
+        if read_length:
+            read_array = (ctypes.c_uint8 * read_length).from_buffer(
+                self.read_buffer)
+            self.messages[1] = _I2CMsg(address, I2C_M_RD, read_length,
+                                       read_array)
+        self.ioctl_data = _I2CRdwrIoctlData(self.messages, count)
+
+
+class I2CDevReadWrite(object):
+    """Communicate with sensors through /dev/i2c-N with the I2C_RDWR ioctl.
+    Commands and the data read back are sent as one combined transaction,
+    and responses are read into reusable buffers. Drop-in alternative to
+    :class:`I2CReadWrite`; pass it as the `bus` of a driver.
+    """
+
+    def __init__(self, address, port, fd=None, ioctl=fcntl.ioctl):
+        """
+        :param int address: I2C device address.
+        :param int port: I2C adapter number N, of /dev/i2c-N.
+        :param int fd: Already open file descriptor to use instead.
+        :param ioctl: Function with the signature of :func:`fcntl.ioctl`.
+        """
+        if fd is None:
+            fd = os.open('/dev/i2c-{}'.format(port), os.O_RDWR)
+        self.fd = fd
+        self.address = address
+        self._ioctl = ioctl
+        self._transactions = {}
+
+    def _transaction(self, write_length, read_length):
+        key = write_length, read_length
+        transaction = self._transactions.get(key)
+        if transaction is None:
+            transaction = _Transaction(self.address, *key)
+            self._transactions[key] = transaction
+        return transaction
+
+    def _transfer(self, transaction):
+        self._ioctl(self.fd, I2C_RDWR, transaction.ioctl_data)
+
+    @validate_unsigned_byte_command
+    def read_byte_data(self, command):
+        """
+        :param int command: Byte to write to I2C device.
+        :return int: Unsigned byte response from :attr:`command`.
+        """
+        transaction = self._transaction(1, 1)
+        transaction.write_buffer[0] = command
+        self._transfer(transaction)
+        return transaction.read_buffer[0]
+
+    @validate_unsigned_byte_command
+    def read_block_data(self, command, length):
+        """
+        :param int command: Byte to write to I2C device.
+        :param length: Number of bytes to read from I2C device.
+        :return memoryview: :attr:`length` bytes from I2C device, as a
+         bytearray before Python 3. The buffer is reused by the next read
+         of the same length.
+        """
+        transaction = self._transaction(1, length)
+        transaction.write_buffer[0] = command
+        self._transfer(transaction)
+        return transaction.response
+
+    @validate_unsigned_byte_command
+    def write_byte(self, command):
+        """
+        :param int command: Byte to write to I2C device.
+        """
+        transaction = self._transaction(1, 0)
+        transaction.write_buffer[0] = command
+        self._transfer(transaction)
+
+    @validate_unsigned_byte_command
+    def write_byte_data(self, command, value):
+        """
+        :param int command: Byte to write to I2C device.
+        :param int value: Data byte written after :attr:`command`.
+        """
+        if not is_unsigned_byte(value):
+            raise ValueError("'{}' is not an unsigned byte.".format(value))
+        transaction = self._transaction(2, 0)
+        transaction.write_buffer[0] = command
+        transaction.write_buffer[1] = value
+        self._transfer(transaction)
+
+    def close(self):
+        os.close(self.fd)
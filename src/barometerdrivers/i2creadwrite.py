@@ -1,12 +1,14 @@
-import smbus
-
 from .helpers.decorators import validate_unsigned_byte_command
+from .helpers.util import is_unsigned_byte
 
 
 class I2CReadWrite(object):
-    """Communicate with sensors on I2C bus."""
+    """Communicate with sensors on I2C bus, using the smbus C extension,
+    which is only imported when a bus is opened.
+    """
 
     def __init__(self, address, port):
+        import smbus
         self.bus = smbus.SMBus(port)
         self.address = address
 
@@ -33,3 +35,13 @@ class I2CReadWrite(object):
         :param int command: Byte to write to I2C device.
         """
         self.bus.write_byte(self.address, command)
+
+    @validate_unsigned_byte_command
+    def write_byte_data(self, command, value):
+        """
+        :param int command: Byte to write to I2C device.
+        :param int value: Data byte written after :attr:`command`.
+        """
+        if not is_unsigned_byte(value):
+            raise ValueError("'{}' is not an unsigned byte.".format(value))
+        self.bus.write_byte_data(self.address, command, value)
@@ -0,0 +1,223 @@
+import math
+import time
+from functools import wraps
+
+clock = getattr(time, 'perf_counter', time.time)
+
+BUS_METHODS = ('read_byte_data', 'read_block_data', 'write_byte',
+               'write_byte_data')
+TIMED_METHODS = {
+    '_convert_raw_temperature': 'convert',
+    '_convert_raw_pressure': 'convert',
+    'is_ready': 'ready_poll'
+}
+
+
+class LatencyHistogram(object):
+    """Counts durations in power of 2 buckets from 1 usec, so recording
+    costs the same for any range of values.
+    """
+    bucket_count = 24  # last bucket holds everything from 2**22 usec
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.buckets = [0] * self.bucket_count
+        self.count = 0
+        self.total_sec = 0.0
+        self.min_sec = None
+        self.max_sec = None
+
+    def record(self, seconds):
+        """
+        :param float seconds: Duration. Negative durations count as 0.
+        """
+        seconds = max(seconds, 0.0)
+        bucket = math.frexp(seconds * 1e6)[1] if seconds >= 1e-6 else 0
+        self.buckets[min(bucket, self.bucket_count - 1)] += 1
+        self.count += 1
+        self.total_sec += seconds
+        if self.min_sec is None or seconds < self.min_sec:
+            self.min_sec = seconds
+        if self.max_sec is None or seconds > self.max_sec:
+            self.max_sec = seconds
+
+    def snapshot(self):
+        """
+        :return dict: Count, total, min, max and mean in sec, and \
+         `buckets`, a list of (upper bound in sec, count) for each \
+         non-empty bucket. The last bucket's upper bound is None.
+        """
+        buckets = []
+        for i, count in enumerate(self.buckets):
+            if count:
+                bound = 2 ** i * 1e-6 if i < self.bucket_count - 1 else None
+                buckets.append((bound, count))
+        mean_sec = self.total_sec / self.count if self.count else None
+        return {'count': self.count,
+                'total_sec': self.total_sec,
+                'min_sec': self.min_sec,
+                'max_sec': self.max_sec,
+                'mean_sec': mean_sec,
+                'buckets': buckets}
+
+
+class BusStatistics(object):
+    """Calls, bytes and latency of one bus method."""
+
+    def __init__(self):
+        self.latency = LatencyHistogram()
+        self.reset()
+
+    def reset(self):
+        self.calls = 0
+        self.bytes_written = 0
+        self.bytes_read = 0
+        self.latency.reset()
+
+    def snapshot(self):
+        return {'calls': self.calls,
+                'bytes_written': self.bytes_written,
+                'bytes_read': self.bytes_read,
+                'latency': self.latency.snapshot()}
+
+
+class InstrumentedBus(object):
+    """Wraps a bus object, such as :class:`I2CReadWrite`, counting calls and
+    bytes, and timing each transaction.
+    """
+
+    def __init__(self, bus, statistics):
+        """
+        :param bus: Bus object to wrap.
+        :param dict statistics: :class:`BusStatistics` keyed by method name.
+        """
+        self.bus = bus
+        self.statistics = statistics
+
+    def _call(self, name, written, read, *args):
+        statistics = self.statistics[name]
+        start = clock()
+        try:
+            return getattr(self.bus, name)(*args)
+        finally:
+            statistics.latency.record(clock() - start)
+            statistics.calls += 1
+            statistics.bytes_written += written
+            statistics.bytes_read += read
+
+    def read_byte_data(self, command):
+        return self._call('read_byte_data', 1, 1, command)
+
+    def read_block_data(self, command, length):
+        return self._call('read_block_data', 1, length, command, length)
+
+    def write_byte(self, command):
+        return self._call('write_byte', 1, 0, command)
+
+    def write_byte_data(self, command, value):
+        return self._call('write_byte_data', 2, 0, command, value)
+
+    def __getattr__(self, name):
+        return getattr(self.bus, name)
+
+
+class Instrumentation(object):
+    """Opt in statistics for one driver instance: calls, bytes and latency of
+    each bus method; latency of sleeps, conversions (from ADC command until
+    the data is read or seen ready), HP206C ready polls and raw data
+    conversion math; and oversleep, the actual minus the requested length of
+    each sleep. Drivers that aren't attached pay nothing for it.
+
+        instrumentation = Instrumentation().attach(barometer)
+        ...
+        export(instrumentation.snapshot(reset=True))
+    """
+    histogram_names = ('sleep', 'oversleep', 'conversion', 'ready_poll',
+                       'convert')
+
+    def __init__(self):
+        self.bus = {name: BusStatistics() for name in BUS_METHODS}
+        self.histograms = {name: LatencyHistogram()
+                           for name in self.histogram_names}
+        self.barometer = None
+
+    def attach(self, barometer):
+        """Instrument :attr:`barometer` until :meth:`detach`.
+
+        :param AbsI2CBarometer barometer: Driver to instrument.
+        :return Instrumentation: self
+        """
+        if barometer.instrumentation is not None:
+            raise ValueError('Barometer is already instrumented.')
+        self.barometer = barometer
+        barometer.instrumentation = self
+        barometer.i2c = InstrumentedBus(barometer.i2c, self.bus)
+        barometer._sleep = self.sleep
+        for method_name, histogram_name in TIMED_METHODS.items():
+            method = getattr(barometer, method_name, None)
+            if method is not None:
+                setattr(barometer, method_name,
+                        self._timed(method, self.histograms[histogram_name]))
+        return self
+
+    def detach(self):
+        """Restore the attached driver."""
+        barometer = self.barometer
+        if barometer is None:
+            return
+        barometer.i2c = barometer.i2c.bus
+        for name in ('instrumentation', '_sleep') + tuple(TIMED_METHODS):
+            barometer.__dict__.pop(name, None)
+        self.barometer = None
+
+    @staticmethod
+    def _timed(method, histogram):
+        @wraps(method)
+        def timed(*args):
+            start = clock()
+            try:
+                return method(*args)
+            finally:
+                histogram.record(clock() - start)
+        return timed
+
+    def sleep(self, seconds):
+        """:func:`time.sleep`, recording the length and oversleep."""
+        start = clock()
+        time.sleep(seconds)
+        actual = clock() - start
+        self.histograms['sleep'].record(actual)
+        self.histograms['oversleep'].record(actual - seconds)
+
+    def record(self, name, seconds):
+        """
+        :param str name: Key of :attr:`histograms`.
+        :param float seconds: Duration to record.
+        """
+        self.histograms[name].record(seconds)
+
+    def snapshot(self, reset=False):
+        """
+        :param bool reset: Clear all statistics after taking the snapshot.
+        :return dict: `bus`, a dict of calls, bytes and latency keyed by \
+         bus method, and a latency histogram snapshot for each of \
+         :attr:`histogram_names`. Only plain types, so it can be \
+         serialized as JSON.
+        """
+        snapshot = {name: histogram.snapshot()
+                    for name, histogram in self.histograms.items()}
+        snapshot['bus'] = {name: statistics.snapshot()
+                           for name, statistics in self.bus.items()
+                           if statistics.calls}
+        if reset:
+            self.reset()
+        return snapshot
+
+    def reset(self):
+        """Clear all statistics."""
+        for statistics in self.bus.values():
+            statistics.reset()
+        for histogram in self.histograms.values():
+            histogram.reset()
@@ -5,10 +5,14 @@ class MS5803_01BA(AbsMS5803):
     """Concrete driver class for MS5803-01BA barometer."""
     reference_temp = 2000  # 20.00 C
 
-    def __init__(self, oversampling_rate=1024, is_high_address=True, port=1):
+    def __init__(self, oversampling_rate=1024, is_high_address=True, port=1,
+                 prom_cache=None, force_prom_read=False, bus=None):
         super(MS5803_01BA, self).__init__(oversampling_rate,
                                           is_high_address,
-                                          port)
+                                          port,
+                                          prom_cache,
+                                          force_prom_read,
+                                          bus)
 
     def _convert_raw_temperature(self, raw_temp_uint):
         self.d_t = raw_temp_uint - (self.t_ref * 2**8)
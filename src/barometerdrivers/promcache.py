@@ -0,0 +1,84 @@
+import json
+import os
+
+
+def crc4(prom_words):
+    """CRC-4 of MS5803 PROM, as described in application note AN520.
+
+    :param list prom_words: All 8 16-bit PROM words. The CRC in the low
+     4 bits of word 7 is excluded from the calculation.
+    :return int: 4-bit CRC.
+    """
+    words = list(prom_words)
+    words[7] &= 0xff00
+    remainder = 0
+    for count in range(16):
+        word = words[count >> 1]
+        remainder ^= word & 0x00ff if count % 2 else word >> 8
+        for _ in range(8):
+            if remainder & 0x8000:
+                remainder = (remainder << 1) ^ 0x3000
+            else:
+                remainder <<= 1
+            remainder &= 0xffff
+    return remainder >> 12
+
+
+def is_valid_prom(prom_words):
+    """
+    :param list prom_words: All 8 16-bit PROM words.
+    :return bool: True if the CRC stored in word 7 matches the contents.
+    """
+    return len(prom_words) == 8 and crc4(prom_words) == prom_words[7] & 0xf
+
+
+class PromCache(object):
+    """Stores MS5803 PROM words in a JSON file, keyed by I2C port and
+    address, so drivers can skip the reset and PROM reads on startup.
+    Entries are validated with the PROM's CRC-4 when loaded. Drivers also
+    compare the entry's word 7 with the sensor's, and treat a mismatch as a
+    miss, so fitting a different sensor at the same address replaces its
+    entry. The CRC is only 4 bits, so construct the driver with
+    `force_prom_read=True` to be certain after swapping sensors.
+    """
+
+    def __init__(self, path):
+        """
+        :param str path: JSON file to keep the cache in.
+        """
+        self.path = os.path.expanduser(path)
+
+    @staticmethod
+    def _key(port, address):
+        return '{}:0x{:02x}'.format(port, address)
+
+    def _load(self):
+        try:
+            with open(self.path, 'r') as cache_file:
+                return json.load(cache_file)
+        except (IOError, ValueError):
+            return {}
+
+    def get(self, port, address):
+        """
+        :param int port: I2C port of sensor.
+        :param int address: I2C address of sensor.
+        :return list: Cached PROM words, or None if missing or invalid.
+        """
+        prom_words = self._load().get(self._key(port, address))
+        if not isinstance(prom_words, list) or not is_valid_prom(prom_words):
+            return None
+        return prom_words
+
+    def put(self, port, address, prom_words):
+        """
+        :param int port: I2C port of sensor.
+        :param int address: I2C address of sensor.
+        :param list prom_words: All 8 16-bit PROM words read from sensor.
+        """
+        cache = self._load()
+        cache[self._key(port, address)] = list(prom_words)
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'w') as cache_file:
+            json.dump(cache, cache_file, indent=2, sort_keys=True)
+        os.rename(temp_path, self.path)
@@ -0,0 +1,201 @@
+import inspect
+import struct
+import time
+from collections import namedtuple
+
+import numpy
+
+from .absms5803 import AbsMS5803
+from .batchconversion import convert_ms5803_01ba
+from .hp206c import HP206C
+from .ms5803_01ba import MS5803_01BA
+
+MAGIC = b'BRAW'
+VERSION = 1
+_FILE_HEADER = struct.Struct('<4sBB')  # magic, version, sensor count
+_SENSOR_HEADER = struct.Struct('<16sHBH6H')  # model, OSR, address, port, PROM
+RECORD = struct.Struct('<dBii')  # timestamp, sensor id, raw temp., pressure
+RECORD_DTYPE = numpy.dtype([('timestamp', '<f8'),
+                            ('sensor_id', 'u1'),
+                            ('raw_temperature', '<i4'),
+                            ('raw_pressure', '<i4')])
+_COEFFICIENTS = sorted(AbsMS5803.prom_coefficients,
+                       key=AbsMS5803.prom_coefficients.get)
+_MODELS = (MS5803_01BA, HP206C)
+
+SensorInfo = namedtuple('SensorInfo', ['model', 'oversampling_rate',
+                                       'address', 'port', 'coefficients'])
+RawRecord = namedtuple('RawRecord', ['timestamp', 'sensor_id',
+                                     'raw_temperature', 'raw_pressure'])
+
+
+def _is_coroutine_function(function):
+    """
+    :return bool: :attr:`function` is a coroutine function. Always False \
+     before Python 3.5.
+    """
+    is_coroutine_function = getattr(inspect, 'iscoroutinefunction', None)
+    return bool(is_coroutine_function and is_coroutine_function(function))
+
+
+def _sensor_info(barometer):
+    """
+    :param AbsI2CBarometer barometer: Driver to describe.
+    :return SensorInfo: Everything needed to convert raw data later.
+    """
+    for model in _MODELS:
+        if isinstance(barometer, model):
+            break
+    else:
+        msg = "Can't capture raw data from '{}'."
+        raise ValueError(msg.format(type(barometer).__name__))
+    coefficients = {}
+    if isinstance(barometer, AbsMS5803):
+        coefficients = barometer.coefficients
+    return SensorInfo(model.__name__, barometer.oversampling_rate,
+                      barometer.address, barometer.port, coefficients)
+
+
+def _pack_header(sensors):
+    header = [_FILE_HEADER.pack(MAGIC, VERSION, len(sensors))]
+    for sensor in sensors:
+        coefficients = [sensor.coefficients.get(name, 0)
+                        for name in _COEFFICIENTS]
+        header.append(_SENSOR_HEADER.pack(sensor.model.encode('ascii'),
+                                          sensor.oversampling_rate,
+                                          sensor.address,
+                                          sensor.port,
+                                          *coefficients))
+    return b''.join(header)
+
+
+def _read_header(capture_file):
+    """
+    :param file capture_file: Binary file positioned at the start.
+    :return list: :class:`SensorInfo` for each sensor id.
+    """
+    data = capture_file.read(_FILE_HEADER.size)
+    if len(data) < _FILE_HEADER.size:
+        raise ValueError('Not a raw capture file.')
+    magic, version, count = _FILE_HEADER.unpack(data)
+    if magic != MAGIC:
+        raise ValueError('Not a raw capture file.')
+    if version != VERSION:
+        raise ValueError("Unsupported raw capture version '{}'.".format(
+            version))
+    sensors = []
+    for _ in range(count):
+        fields = _SENSOR_HEADER.unpack(capture_file.read(_SENSOR_HEADER.size))
+        model = fields[0].rstrip(b'\0').decode('ascii')
+        coefficients = {}
+        if model != HP206C.__name__:
+            coefficients = dict(zip(_COEFFICIENTS, fields[4:]))
+        sensors.append(SensorInfo(model, fields[1], fields[2], fields[3],
+                                  coefficients))
+    return sensors
+
+
+class RawCaptureWriter(object):
+    """Appends fixed size records of raw sensor readings to a binary file,
+    deferring conversion to read time. The file header stores the model,
+    OSR and PROM coefficients of each sensor, so don't change the OSR of
+    a barometer while capturing.
+    """
+
+    def __init__(self, path, barometers):
+        """
+        :param str path: Capture file. Appended to if it exists, in which
+         case its header must match :attr:`barometers`.
+        :param list barometers: :class:`MS5803_01BA` and/or :class:`HP206C`
+         drivers. Index in this list is the sensor id in each record.
+        """
+        self.barometers = list(barometers)
+        self.sensors = [_sensor_info(b) for b in self.barometers]
+        header = _pack_header(self.sensors)
+        self.file = open(path, 'a+b')
+        self.file.seek(0)
+        existing_header = self.file.read(len(header))
+        if not existing_header:
+            self.file.write(header)
+        elif existing_header != header:
+            self.file.close()
+            raise ValueError("Header of '{}' doesn't match barometers.".format(
+                path))
+
+    def write(self, sensor_id, timestamp, raw_temperature, raw_pressure):
+        """
+        :param int sensor_id: Index of barometer in :attr:`barometers`.
+        :param float timestamp: Time of reading, from :func:`time.time`.
+        :param int raw_temperature: Raw temperature reading.
+        :param int raw_pressure: Raw pressure reading.
+        """
+        self.file.write(RECORD.pack(timestamp, sensor_id,
+                                    raw_temperature, raw_pressure))
+
+    def capture(self):
+        """Read raw data from every barometer once, and append records. \
+        Use :func:`aio.capture_raw` for asyncio drivers.
+        """
+        for sensor_id, barometer in enumerate(self.barometers):
+            if _is_coroutine_function(
+                    barometer.read_raw_temperature_and_pressure):
+                msg = "'{}' is asynchronous. Await aio.capture_raw() instead."
+                raise ValueError(msg.format(type(barometer).__name__))
+            raw_data = barometer.read_raw_temperature_and_pressure()
+            self.write(sensor_id, time.time(), *raw_data)
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class RawCaptureReader(object):
+    """Reads files written by :class:`RawCaptureWriter`."""
+
+    def __init__(self, path):
+        """
+        :param str path: Capture file.
+        """
+        with open(path, 'rb') as capture_file:
+            self.sensors = _read_header(capture_file)
+            data = capture_file.read()
+        # Ignore a partially written final record.
+        count = len(data) // RECORD_DTYPE.itemsize
+        self.records = numpy.frombuffer(data, RECORD_DTYPE, count)
+
+    def __iter__(self):
+        """
+        :return generator: :class:`RawRecord` for each record, in file order.
+        """
+        for record in self.records.tolist():
+            yield RawRecord(*record)
+
+    def raw(self, sensor_id):
+        """
+        :param int sensor_id: Sensor to select.
+        :return numpy.ndarray: Structured array of the sensor's records.
+        """
+        return self.records[self.records['sensor_id'] == sensor_id]
+
+    def convert(self, sensor_id):
+        """Convert raw readings with the model's compensation algorithm.
+
+        :param int sensor_id: Sensor to convert.
+        :return tuple: numpy arrays of timestamps, temperature in degrees C
+         and pressure in mbar.
+        """
+        sensor = self.sensors[sensor_id]
+        raw = self.raw(sensor_id)
+        if sensor.model == HP206C.__name__:
+            temperature = raw['raw_temperature'] / 100.0
+            pressure = raw['raw_pressure'] / 100.0
+        else:
+            temperature, pressure = convert_ms5803_01ba(
+                raw['raw_temperature'], raw['raw_pressure'],
+                sensor.coefficients)
+        return raw['timestamp'].copy(), temperature, pressure
@@ -0,0 +1,164 @@
+import csv
+import mmap
+import os
+import struct
+import sys
+from collections import OrderedDict, defaultdict, namedtuple
+
+import numpy
+
+MAGIC = b'BCOL'
+VERSION = 1
+_FILE_HEADER = struct.Struct('<4sBxxxI')  # magic, version, table count
+_TABLE_ENTRY = struct.Struct('<16sHxxxxxxQQ')  # sensor, OSR, offset, rows
+COLUMN_DTYPE = numpy.dtype('<f8')
+_ALIGNMENT = 8
+
+SampleTable = namedtuple('SampleTable', ['sec', 'temperature', 'pressure'])
+
+
+def _padding(size):
+    return -size % _ALIGNMENT
+
+
+def write_sample_store(path, tables):
+    """Write columns of samples for each OSR and sensor. The file starts
+    with an index of every table, followed by each table's sec, temperature
+    and pressure columns as contiguous little endian float64, so they can be
+    mapped into memory and used in place.
+
+    :param str path: Store file. Replaced if it exists.
+    :param dict tables: :class:`SampleTable` of sequences, keyed by OSR and
+     sensor name.
+    """
+    keys = sorted(tables)
+    offset = _FILE_HEADER.size + len(keys) * _TABLE_ENTRY.size
+    offset += _padding(offset)
+    header = [_FILE_HEADER.pack(MAGIC, VERSION, len(keys))]
+    columns = []
+    for osr, sensor in keys:
+        table = [numpy.ascontiguousarray(column, COLUMN_DTYPE)
+                 for column in tables[osr, sensor]]
+        rows = len(table[0])
+        if any(len(column) != rows for column in table):
+            msg = 'Columns for {} at OSR {} differ in length.'
+            raise ValueError(msg.format(sensor, osr))
+        header.append(_TABLE_ENTRY.pack(sensor.encode('ascii'), osr, offset,
+                                        rows))
+        columns.extend(table)
+        offset += len(table) * rows * COLUMN_DTYPE.itemsize
+    header = b''.join(header)
+    # Write a temporary file first, so readers never map a partial store.
+    temporary_path = path + '.tmp'
+    with open(temporary_path, 'wb') as store_file:
+        store_file.write(header + b'\0' * _padding(len(header)))
+        for column in columns:
+            store_file.write(column.tobytes())
+    getattr(os, 'replace', os.rename)(temporary_path, path)
+
+
+def convert_tsv(tsv_paths, path):
+    """Convert TSV files of samples, with a header row and then sensor, OSR,
+    sec, temperature and pressure columns, to a store file.
+
+    :param list tsv_paths: TSV files. Rows for the same OSR and sensor are
+     kept in file order.
+    :param str path: Store file to write.
+    """
+    tables = defaultdict(lambda: SampleTable([], [], []))
+    for tsv_path in tsv_paths:
+        with open(tsv_path, 'r') as tsv_file:
+            tsv_reader = csv.reader(tsv_file, delimiter='\t', quotechar='|')
+            next(tsv_reader)  # skip tsv header row
+            for sensor, osr, sec, temperature, pressure in tsv_reader:
+                table = tables[int(osr), sensor]
+                table.sec.append(float(sec))
+                table.temperature.append(float(temperature))
+                table.pressure.append(float(pressure))
+    write_sample_store(path, tables)
+
+
+class SampleStore(object):
+    """Memory mapped, read only view of a file written by
+    :func:`write_sample_store`. Opening only reads the index; columns are
+    returned as NumPy arrays backed by the mapping, so pages are read from
+    disk as they're used, and nothing is copied.
+    """
+
+    def __init__(self, path):
+        """
+        :param str path: Store file.
+        """
+        with open(path, 'rb') as store_file:
+            if os.fstat(store_file.fileno()).st_size < _FILE_HEADER.size:
+                raise ValueError('Not a sample store file.')
+            # The mapping stays valid after the file is closed.
+            self._mmap = mmap.mmap(store_file.fileno(), 0,
+                                   access=mmap.ACCESS_READ)
+        magic, version, count = _FILE_HEADER.unpack_from(self._mmap)
+        if magic != MAGIC:
+            raise ValueError('Not a sample store file.')
+        if version != VERSION:
+            raise ValueError("Unsupported sample store version '{}'.".format(
+                version))
+        self.index = OrderedDict()
+        for i in range(count):
+            sensor, osr, offset, rows = _TABLE_ENTRY.unpack_from(
+                self._mmap, _FILE_HEADER.size + i * _TABLE_ENTRY.size)
+            end = offset + len(SampleTable._fields) * rows * \
+                COLUMN_DTYPE.itemsize
+            if end > len(self._mmap):
+                raise ValueError("Sample store '{}' is truncated.".format(
+                    path))
+            sensor = sensor.rstrip(b'\0').decode('ascii')
+            self.index[osr, sensor] = offset, rows
+        self._tables = {}
+
+    def keys(self):
+        """
+        :return list: OSR and sensor name of each table.
+        """
+        return list(self.index)
+
+    def __contains__(self, key):
+        return key in self.index
+
+    def table(self, oversampling_rate, sensor):
+        """
+        :param int oversampling_rate: OSR the samples were read at.
+        :param str sensor: Driver class name, e.g. 'MS5803_01BA'.
+        :return SampleTable: Read only arrays of sec, temperature in degrees
+         C and pressure in mbar.
+        """
+        key = oversampling_rate, sensor
+        if key not in self._tables:
+            try:
+                offset, rows = self.index[key]
+            except KeyError:
+                msg = 'No samples for {} at OSR {}.'
+                raise ValueError(msg.format(sensor, oversampling_rate))
+            size = rows * COLUMN_DTYPE.itemsize
+            self._tables[key] = SampleTable(*[
+                numpy.frombuffer(self._mmap, COLUMN_DTYPE, rows,
+                                 offset + i * size)
+                for i in range(len(SampleTable._fields))])
+        return self._tables[key]
+
+    def close(self):
+        """Unmap the file. Arrays from :meth:`table` must be released
+        first, otherwise :class:`BufferError` is raised. Without closing,
+        the mapping is released when the store and every array are.
+        Python 2 mmaps don't track exported buffers, so there the store only
+        drops its references, and the mapping is released with the arrays.
+        """
+        self._tables.clear()
+        if sys.version_info < (3,):
+            self._mmap = None
+        else:
+            self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
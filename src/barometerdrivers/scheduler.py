@@ -0,0 +1,125 @@
+import heapq
+import time
+from collections import namedtuple
+
+from .absi2cbarometer import MeasurementStep
+
+Sample = namedtuple('Sample',
+                    ['barometer', 'timestamp', 'temperature', 'pressure'])
+
+
+class I2CBusScheduler(object):
+    """Interleaves measurements across several barometers, so conversions on
+    one device overlap with bus transactions on the others. Each barometer's
+    conversion is started as soon as it is due, and collected when its
+    ready time has passed; the bus is never held while waiting.
+    """
+
+    def __init__(self, rates, clock=time.time, sleep=time.sleep):
+        """
+        :param dict rates: Target sample rate in Hz, keyed by
+         :class:`AbsI2CBarometer` instance. Use None or 0 to sample as fast
+         as the device allows.
+        :param clock: Function returning the current time in sec.
+        :param sleep: Function to wait a number of sec.
+        """
+        self.rates = dict(rates)
+        self.clock = clock
+        self.sleep = sleep
+        self.counts = dict.fromkeys(self.rates, 0)
+        self.dropped = dict.fromkeys(self.rates, 0)
+        self.sleep_sec = 0.0
+        self.start_time = self.end_time = None
+
+    def _sleep_until(self, deadline):
+        now = self.clock()
+        if deadline > now:
+            self.sleep(deadline - now)
+            # Count the time actually slept, including any oversleep.
+            self.sleep_sec += self.clock() - now
+
+    def samples(self, duration=None):
+        """Sample all barometers, and yield results as they complete. A
+        measurement that fails with :class:`IOError` is counted in
+        :attr:`dropped`, and the barometer is restarted when next due.
+
+        :param float duration: Stop starting new measurements after this
+         many sec. Sample forever when None.
+        :return generator: :class:`Sample` tuples in order of completion.
+        """
+        now = self.start_time = self.clock()
+        self.end_time = None
+        stop_at = None if duration is None else now + duration
+        self.counts = dict.fromkeys(self.rates, 0)
+        self.dropped = dict.fromkeys(self.rates, 0)
+        self.sleep_sec = 0.0
+        due = {}
+        queue = []  # (when, order, barometer, is_start)
+        for order, barometer in enumerate(self.rates):
+            heapq.heappush(queue, (now, order, barometer, True))
+        while queue:
+            when, order, barometer, is_start = heapq.heappop(queue)
+            self._sleep_until(when)
+            if is_start:
+                rate = self.rates[barometer]
+                due[barometer] = when + (1.0 / rate if rate else 0.0)
+            try:
+                step = self._advance(barometer, is_start)
+            except IOError:
+                self.dropped[barometer] += 1
+                step = MeasurementStep(None, None)
+            if step.ready_at is not None:
+                heapq.heappush(queue, (step.ready_at, order, barometer, False))
+                continue
+            now = self.end_time = self.clock()
+            next_start = max(due[barometer], now)
+            if stop_at is None or next_start < stop_at:
+                heapq.heappush(queue, (next_start, order, barometer, True))
+            if step.result is not None:
+                self.counts[barometer] += 1
+                temperature, pressure = step.result
+                yield Sample(barometer, now, temperature, pressure)
+
+    @staticmethod
+    def _advance(barometer, is_start):
+        """
+        :param AbsI2CBarometer barometer: Barometer to start or step.
+        :param bool is_start: Start a new measurement.
+        :return MeasurementStep: Next time to step, or the result.
+        """
+        if is_start:
+            return MeasurementStep(barometer.start_measurement(), None)
+        return barometer.step_measurement()
+
+    def run(self, duration):
+        """
+        :param float duration: Sample all barometers for this many sec.
+        :return list: :class:`Sample` tuples in order of completion.
+        """
+        return list(self.samples(duration))
+
+    def elapsed_sec(self):
+        """
+        :return float: Sec from the start of sampling to the last sample.
+        """
+        if self.start_time is None:
+            return 0.0
+        return (self.end_time or self.clock()) - self.start_time
+
+    def achieved_rates(self):
+        """
+        :return dict: Achieved sample rate in Hz, keyed by barometer.
+        """
+        elapsed = self.elapsed_sec()
+        if elapsed <= 0:
+            return dict.fromkeys(self.rates, 0.0)
+        return {barometer: count / elapsed
+                for barometer, count in self.counts.items()}
+
+    def wait_fraction(self):
+        """
+        :return float: Fraction of elapsed time spent waiting for
+         conversions, as measured by the clock around each sleep.
+        """
+        elapsed = self.elapsed_sec()
+        return self.sleep_sec / elapsed if elapsed > 0 else 0.0
@@ -0,0 +1,400 @@
+import csv
+import random
+import time
+
+from .absms5803 import AbsMS5803
+from .helpers.decorators import validate_unsigned_byte_command
+from .hp206c import HP206C
+from .ms5803_01ba import MS5803_01BA
+from .promcache import crc4
+
+# MS5803-01BA datasheet example, in PROM word order
+DATASHEET_COEFFICIENTS = {
+    'sens_t1' : 40127,
+    'off_t1'  : 36924,
+    'tcs'     : 23317,
+    'tco'     : 23282,
+    't_ref'   : 33464,
+    'tempsens': 28312
+}
+
+
+class NoiseSource(object):
+    """Synthesizes readings as a fixed temperature and pressure plus
+    Gaussian noise.
+    """
+
+    def __init__(self, temperature=20.0, pressure=1000.0,
+                 temperature_noise=0.02, pressure_noise=0.1, seed=None):
+        """
+        :param float temperature: Mean temperature in degrees C.
+        :param float pressure: Mean pressure in mbar.
+        :param float temperature_noise: Standard deviation of temperature.
+        :param float pressure_noise: Standard deviation of pressure.
+        :param seed: Seed for a repeatable sequence.
+        """
+        self.temperature = temperature
+        self.pressure = pressure
+        self.temperature_noise = temperature_noise
+        self.pressure_noise = pressure_noise
+        self._random = random.Random(seed)
+
+    def sample(self):
+        """
+        :return tuple: Temperature in degrees C, pressure in mbar.
+        """
+        gauss = self._random.gauss
+        return (gauss(self.temperature, self.temperature_noise),
+                gauss(self.pressure, self.pressure_noise))
+
+
+class TraceSource(object):
+    """Replays readings recorded in a `sample_data` TSV file, one row per
+    conversion, starting over at the end.
+    """
+
+    def __init__(self, path, sensor='MS5803_01BA'):
+        """
+        :param str path: TSV file with sensor, oversampling, sec, \
+         temperature and pressure columns.
+        :param str sensor: Only replay rows recorded from this sensor.
+        """
+        with open(path, 'r') as tsv_file:
+            tsv_reader = csv.reader(tsv_file, delimiter='\t', quotechar='|')
+            next(tsv_reader)  # skip tsv header row
+            self.readings = [(float(temperature), float(pressure))
+                             for name, _, _, temperature, pressure
+                             in tsv_reader if name == sensor]
+        if not self.readings:
+            raise ValueError("No '{}' readings in '{}'.".format(sensor, path))
+        self._index = 0
+
+    def sample(self):
+        """
+        :return tuple: Temperature in degrees C, pressure in mbar.
+        """
+        reading = self.readings[self._index]
+        self._index = (self._index + 1) % len(self.readings)
+        return reading
+
+
+class _SimulatedDevice(object):
+    """Common timing for simulated devices. Conversions finish after the
+    datasheet time, multiplied by `time_scale`. With a `bit_rate`, every
+    transfer also blocks for as long as its bits would take on the bus.
+    """
+
+    def __init__(self, source, time_scale=1.0, bit_rate=None,
+                 clock=time.time):
+        """
+        :param source: Object with a `sample()` method returning \
+         temperature in degrees C and pressure in mbar.
+        :param float time_scale: Multiplier for conversion times.
+        :param int bit_rate: I2C clock in Hz, or None for instant transfers.
+        :param clock: Function returning the current time in sec.
+        """
+        self.source = source
+        self.time_scale = time_scale
+        self.bit_rate = bit_rate
+        self.clock = clock
+        self.transfers = 0
+
+    def _transfer(self, length):
+        """
+        :param int length: Bytes sent or received after the address byte.
+        """
+        self.transfers += 1
+        if self.bit_rate:
+            time.sleep(9.0 * (length + 1) / self.bit_rate)
+
+    def _finish_time(self, msec):
+        return self.clock() + self.time_scale * msec / 1000.0
+
+
+class SimulatedMS5803_01BA(_SimulatedDevice):
+    """Emulates the MS5803-01BA command set behind the
+    :class:`I2CReadWrite` interface: reset, PROM reads, and D1/D2
+    conversions encoding the source readings with the PROM coefficients.
+    Every conversion takes a new reading from the source. D1 encodes its
+    pressure at the temperature of the last D2, the one the driver
+    compensates it with. As on the device, reading the ADC before a
+    conversion is complete, or twice, gives 0.
+    """
+
+    def __init__(self, source, coefficients=None, **kwargs):
+        """
+        :param source: Object with a `sample()` method returning \
+         temperature in degrees C and pressure in mbar.
+        :param dict coefficients: PROM coefficients keyed by name. \
+         Defaults to the datasheet example.
+        """
+        super(SimulatedMS5803_01BA, self).__init__(source, **kwargs)
+        self.coefficients = dict(coefficients or DATASHEET_COEFFICIENTS)
+        words = [0] + [self.coefficients[name] for name in sorted(
+            AbsMS5803.prom_coefficients, key=AbsMS5803.prom_coefficients.get)]
+        words.append(0)
+        words[7] = crc4(words)
+        self.prom = dict(zip(AbsMS5803.prom_words, words))
+        self.conversions = {}
+        for osr_value in MS5803_01BA.osr_conversion.values():
+            for is_pressure in (False, True):
+                command = osr_value.command(is_pressure)
+                self.conversions[command] = is_pressure, osr_value.msec
+        self._temperature = None
+        self._adc = None
+
+    def raw_values(self, temperature, pressure):
+        """Invert the MS5803-01BA compensation algorithm.
+
+        :param float temperature: Temperature in degrees C.
+        :param float pressure: Pressure in mbar.
+        :return tuple: 24-bit unsigned raw temperature (D2) and \
+         pressure (D1) readings.
+        """
+        c = self.coefficients
+        reference_temp = MS5803_01BA.reference_temp
+        # Aim for the middle of the 0.01 step the driver truncates to.
+        target = temperature * 100 + (0.5 if temperature >= 0 else -0.5)
+        slope = 1.0 * c['tempsens'] / 2**23
+        d_t = (target - reference_temp) / slope
+        if d_t < 0:
+            # Below 20 C, solve target = ref. + slope * d_t - d_t**2 / 2**31
+            offset = target - reference_temp
+            d_t = (slope - (slope**2 - 4.0 * offset / 2**31)**0.5) * 2**30
+        d2 = int(round(d_t + c['t_ref'] * 2**8))
+        d_t = d2 - c['t_ref'] * 2**8
+        temp = reference_temp + 1.0 * d_t * c['tempsens'] / 2**23
+        off2 = sens2 = 0.0
+        if temp >= reference_temp:
+            if temp > 4500:
+                sens2 = -(temp - 4500)**2 / 2**3
+        else:
+            off2 = 3.0 * (temp - reference_temp)**2
+            sens2 = 7.0 * (temp - reference_temp)**2 / 2**3
+            if temp < -1500:
+                sens2 += 2.0 * (temp + 1500)**2
+        off = c['off_t1'] * 2**16 + 1.0 * c['tco'] * d_t / 2**7 - off2
+        sens = c['sens_t1'] * 2**15 + 1.0 * c['tcs'] * d_t / 2**8 - sens2
+        d1 = int(round(((pressure * 100 + 0.5) * 2**15 + off) * 2**21 / sens))
+        return d2, d1
+
+    @validate_unsigned_byte_command
+    def write_byte(self, command):
+        self._transfer(1)
+        if command == AbsMS5803.reset:
+            self._adc = None
+        elif command in self.conversions:
+            is_pressure, msec = self.conversions[command]
+            temperature, pressure = self.source.sample()
+            if not is_pressure or self._temperature is None:
+                self._temperature = temperature
+            d2, d1 = self.raw_values(self._temperature, pressure)
+            self._adc = d1 if is_pressure else d2, self._finish_time(msec)
+        else:
+            raise IOError('Unsupported MS5803 command 0x{:02x}.'.format(
+                command))
+
+    @validate_unsigned_byte_command
+    def read_block_data(self, command, length):
+        self._transfer(length + 1)
+        if command in self.prom and length == 2:
+            word = self.prom[command]
+            return [word >> 8, word & 0xff]
+        if command == AbsMS5803.read_adc and length == 3:
+            value = 0
+            if self._adc is not None and self.clock() >= self._adc[1]:
+                value = self._adc[0]
+            self._adc = None
+            return [value >> 16, (value >> 8) & 0xff, value & 0xff]
+        raise IOError('Unsupported MS5803 read 0x{:02x}.'.format(command))
+
+    @validate_unsigned_byte_command
+    def read_byte_data(self, command):
+        return self.read_block_data(command, 1)[0]
+
+
+class SimulatedHP206C(_SimulatedDevice):
+    """Emulates the HP206C command and register set behind the
+    :class:`I2CReadWrite` interface. DEV_RDY in INT_SRC is clear while a
+    conversion is in progress, and temperature and pressure conversions
+    take twice as long as temperature only. Each conversion is compared
+    with the thresholds: a traverse event when the mid threshold was
+    crossed since the last conversion, and a window event while outside
+    the low to high window. Enabled events are flagged in INT_SRC, and
+    their directions in INT_DIR, until the next conversion.
+    """
+
+    int_src_ready = 0x40  # DEV_RDY
+    int_src_pressure_ready = 0x20  # PA_RDY
+    int_src_temperature_ready = 0x10  # T_RDY
+
+    def __init__(self, source, **kwargs):
+        """
+        :param source: Object with a `sample()` method returning \
+         temperature in degrees C and pressure in mbar.
+        """
+        super(SimulatedHP206C, self).__init__(source, **kwargs)
+        self.registers = [0] * 0x10
+        self.conversions = {}
+        for osr_value in HP206C.osr_conversion.values():
+            command = HP206C.commands.adc_temp(osr_value.command)
+            self.conversions[command] = True, osr_value.msec
+            command = HP206C.commands.adc_pressure_temp(osr_value.command)
+            self.conversions[command] = False, 2 * osr_value.msec
+        self.temperature = self.pressure = 0
+        self._previous = {}
+        self._ready_at = 0.0
+        self._status = self.int_src_ready
+
+    @staticmethod
+    def _compare(value, previous, thresholds, traverse, window):
+        """
+        :param float value: Converted value.
+        :param float previous: Value of the last conversion, or None.
+        :param tuple thresholds: Low, mid and high threshold.
+        :param int traverse: Traverse event bit.
+        :param int window: Window event bit.
+        :return tuple: Event bits, and direction bits.
+        """
+        low, mid, high = thresholds
+        events = directions = 0
+        if previous is not None and (previous < mid) != (value < mid):
+            events |= traverse
+            directions |= traverse if value >= mid else 0
+        if value < low or value > high:
+            events |= window
+            directions |= window if value > high else 0
+        return events, directions
+
+    def _thresholds(self, temperature_only):
+        """Compare the conversion with the thresholds, and flag events.
+
+        :param bool temperature_only: Pressure wasn't converted.
+        """
+        registers = self.registers
+        names = HP206C.registers
+        interrupts = HP206C.interrupts
+
+        def temperature_threshold(register):
+            byte = registers[register]
+            return byte - 0x100 if byte & 0x80 else byte
+
+        def pressure_threshold(lsb_msb):
+            lsb, msb = lsb_msb
+            return (registers[lsb] | registers[msb] << 8) * \
+                HP206C.pressure_threshold_mbar
+
+        temperature = self.temperature / 100.0
+        events, directions = self._compare(
+            temperature, self._previous.get('temperature'),
+            [temperature_threshold(r) for r in (names.low_temp_threshold,
+                                                names.mid_temp_threshold,
+                                                names.high_temp_threshold)],
+            interrupts.temperature_traverse, interrupts.temperature_window)
+        self._previous['temperature'] = temperature
+        pressure_mode = registers[names.interrupt_configure] & \
+            interrupts.pressure_mode
+        if not temperature_only and pressure_mode:
+            pressure = self.pressure / 100.0
+            pressure_events, pressure_directions = self._compare(
+                pressure, self._previous.get('pressure'),
+                [pressure_threshold(r)
+                 for r in (names.low_pressure_threshold,
+                           names.mid_pressure_threshold,
+                           names.high_pressure_threshold)],
+                interrupts.pressure_traverse, interrupts.pressure_window)
+            self._previous['pressure'] = pressure
+            events |= pressure_events
+            directions |= pressure_directions
+        events &= registers[names.interrupt_enable]
+        registers[names.interrupt_events] = directions & events
+        self._status |= events
+
+    def _int_src(self):
+        if self.clock() < self._ready_at:
+            return 0
+        return self._status
+
+    @validate_unsigned_byte_command
+    def write_byte(self, command):
+        self._transfer(1)
+        if command == HP206C.commands.soft_reset:
+            self.registers = [0] * 0x10
+            self._previous = {}
+            self._status = self.int_src_ready
+        elif command in self.conversions:
+            temperature_only, msec = self.conversions[command]
+            temperature, pressure = self.source.sample()
+            self.temperature = int(round(temperature * 100))
+            self._status = self.int_src_ready | self.int_src_temperature_ready
+            if not temperature_only:
+                self.pressure = int(round(pressure * 100))
+                self._status |= self.int_src_pressure_ready
+            self._thresholds(temperature_only)
+            self._ready_at = self._finish_time(msec)
+        else:
+            raise IOError('Unsupported HP206C command 0x{:02x}.'.format(
+                command))
+
+    @validate_unsigned_byte_command
+    def read_byte_data(self, command):
+        self._transfer(2)
+        register = command & 0x3f
+        if command & 0xc0 != 0x80 or register >= len(self.registers):
+            raise IOError('Unsupported HP206C read 0x{:02x}.'.format(command))
+        if register == HP206C.registers.interrupt_status:
+            return self._int_src()
+        return self.registers[register]
+
+    @validate_unsigned_byte_command
+    def write_byte_data(self, command, value):
+        self._transfer(2)
+        register = command & 0x3f
+        if command & 0xc0 != 0xc0 or register >= len(self.registers) or \
+                register == HP206C.registers.interrupt_status:
+            raise IOError('Unsupported HP206C write 0x{:02x}.'.format(
+                command))
+        self.registers[register] = value & 0xff
+
+    @staticmethod
+    def _int24(value):
+        value &= 0xffffff
+        return [value >> 16, (value >> 8) & 0xff, value & 0xff]
+
+    @validate_unsigned_byte_command
+    def read_block_data(self, command, length):
+        self._transfer(length + 1)
+        commands = HP206C.commands
+        if command == commands.read_temp_pressure and length == 6:
+            return self._int24(self.temperature) + self._int24(self.pressure)
+        if command == commands.read_temp and length == 3:
+            return self._int24(self.temperature)
+        if command == commands.read_pressure and length == 3:
+            return self._int24(self.pressure)
+        raise IOError('Unsupported HP206C read 0x{:02x}.'.format(command))
+
+
+class SimulatedBus(object):
+    """Stands in for :class:`I2CReadWrite` as the `bus` of a driver,
+    connecting it to the simulated device attached at its port and address.
+    """
+
+    def __init__(self):
+        self.devices = {}
+
+    def attach(self, device, address, port=1):
+        """
+        :param device: Simulated device.
+        :param int address: I2C address to answer on.
+        :param int port: I2C port.
+        :return: :attr:`device`
+        """
+        self.devices[port, address] = device
+        return device
+
+    def __call__(self, address, port):
+        try:
+            return self.devices[port, address]
+        except KeyError:
+            msg = 'No simulated device at 0x{:02x} on port {}.'
+            raise IOError(msg.format(address, port))
@@ -1 +1,8 @@
-from .ms5803smoother import SmoothedMS5803_01BA  # noqa: F401
+from ..helpers.lazyimport import lazy_attributes
+
+_LAZY_NAMES = {
+    'SmoothedMS5803_01BA': '.ms5803smoother',
+    'load_kalman_parameters': '.kalmantable'
+}
+__all__ = sorted(_LAZY_NAMES)
+__getattr__, __dir__ = lazy_attributes(__name__, _LAZY_NAMES)
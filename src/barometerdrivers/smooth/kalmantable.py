@@ -0,0 +1,26 @@
+import json
+
+# Hand tuned for MS5803-01BA at OSR 4096.
+DEFAULT_KALMAN_PARAMETERS = (4, 0.0625, 4)
+
+
+def load_kalman_parameters(path, sensor, oversampling_rate, quantity):
+    """Look up tuned :class:`OneDKalman` parameters in a table written by
+    `sample_data/kalman_sweep.py`.
+
+    :param str path: JSON parameter table.
+    :param str sensor: Driver class name, e.g. 'MS5803_01BA'.
+    :param int oversampling_rate: OSR the sensor is read at.
+    :param str quantity: 'temperature' or 'pressure'.
+    :return tuple: p estimation error, q process noise, r measure noise.
+    """
+    with open(path, 'r') as table_file:
+        table = json.load(table_file)
+    try:
+        entry = table['parameters'][sensor][str(oversampling_rate)][quantity]
+    except KeyError:
+        msg = "No Kalman parameters for {} {} at OSR {} in '{}'."
+        raise ValueError(msg.format(sensor, quantity, oversampling_rate,
+                                    path))
+    return (entry['p_estimation_error'], entry['q_process_noise'],
+            entry['r_measure_noise'])
@@ -1,6 +1,7 @@
 import time
 
 from ..ms5803_01ba import MS5803_01BA
+from .kalmantable import DEFAULT_KALMAN_PARAMETERS, load_kalman_parameters
 from .smoothalgorithms import OneDKalman
 
 
@@ -9,15 +10,37 @@ class SmoothedMS5803_01BA(object):
     obtained from proccessing readings with :class:`OneDKalman`. Ignores data
     from the first 100 ms, as my experiments show these readings can be noisy.
     Readings from 100 - 250 ms are processed with the Kalman filter, and the
-    adjusted values are returned.
+    adjusted values are returned. Use :meth:`stream` to get a smoothed value
+    for every reading instead, from a filter that stays warm.
     """
     ignore_sec = 0.1
     poll_sec = 0.25
+    oversampling_rate = 1024
 
-    def __init__(self, is_high_address, port=1):
-        self.ms5803 = MS5803_01BA(oversampling_rate=1024,
+    def __init__(self, is_high_address, port=1, kalman_table=None):
+        """
+        :param bool is_high_address: Sensor is at I2C address 0x77.
+        :param int port: I2C port of sensor.
+        :param str kalman_table: JSON table of Kalman filter parameters \
+         from `sample_data/kalman_sweep.py`. Hand tuned defaults are used \
+         without one.
+        """
+        self.ms5803 = MS5803_01BA(oversampling_rate=self.oversampling_rate,
                                   is_high_address=is_high_address,
                                   port=port)
+        self.kalman_parameters = {'temperature': DEFAULT_KALMAN_PARAMETERS,
+                                  'pressure': DEFAULT_KALMAN_PARAMETERS}
+        if kalman_table is not None:
+            for quantity in self.kalman_parameters:
+                self.kalman_parameters[quantity] = load_kalman_parameters(
+                    kalman_table, 'MS5803_01BA', self.oversampling_rate,
+                    quantity)
+
+    def _kalman(self, init_value, quantity):
+        p_estimation_error, q_process_noise, r_measure_noise = \
+            self.kalman_parameters[quantity]
+        return OneDKalman(init_value, p_estimation_error, q_process_noise,
+                          r_measure_noise, 2)
 
     def _discard_first_100_msec(self, start):
         temperature = pressure = None
@@ -32,7 +55,7 @@ class SmoothedMS5803_01BA(object):
         """
         start = time.time()
         init_temp, _ = self._discard_first_100_msec(start)
-        smooth_temp = OneDKalman(init_temp, 4, 0.0625, 4, 2)
+        smooth_temp = self._kalman(init_temp, 'temperature')
         while time.time() < start + self.poll_sec:
             smooth_temp.update(self.ms5803.read_temperature())
         return smooth_temp.value
@@ -44,7 +67,7 @@ class SmoothedMS5803_01BA(object):
         """
         start = time.time()
         _, init_pressure = self._discard_first_100_msec(start)
-        smooth_pressure = OneDKalman(init_pressure, 4, 0.0625, 4, 2)
+        smooth_pressure = self._kalman(init_pressure, 'pressure')
         while time.time() < start + self.poll_sec:
             smooth_pressure.update(self.ms5803.read_pressure())
         return smooth_pressure.value
@@ -57,10 +80,29 @@ class SmoothedMS5803_01BA(object):
         """
         start = time.time()
         init_temp, init_pressure = self._discard_first_100_msec(start)
-        smooth_temp = OneDKalman(init_temp, 4, 0.0625, 4, 2)
-        smooth_pressure = OneDKalman(init_pressure, 4, 0.0625, 4, 2)
+        smooth_temp = self._kalman(init_temp, 'temperature')
+        smooth_pressure = self._kalman(init_pressure, 'pressure')
         while time.time() < start + self.poll_sec:
             temperature, pressure = self.ms5803.read_temperature_and_pressure()
             smooth_temp.update(temperature)
             smooth_pressure.update(pressure)
         return smooth_temp.value, smooth_pressure.value
+
+    def stream(self):
+        """Discard the first 100 ms of readings once, then smooth every
+        subsequent reading, keeping the Kalman filter state between samples.
+
+        :return generator: Tuples of temperature in degrees C and pressure
+         in mbar processed via Kalman filter, at the full sensor rate.
+        """
+        init_temp, init_pressure = self._discard_first_100_msec(time.time())
+        smooth_temp = self._kalman(init_temp, 'temperature')
+        smooth_pressure = self._kalman(init_pressure, 'pressure')
+        while True:
+            temperature, pressure = self.ms5803.read_temperature_and_pressure()
+            smooth_temp.update(temperature)
+            smooth_pressure.update(pressure)
+            yield smooth_temp.value, smooth_pressure.value
+
+    def __iter__(self):
+        return self.stream()
@@ -1,10 +1,93 @@
+from __future__ import division
+
+import heapq
 import math
+import random
 from abc import ABCMeta, abstractmethod
+from array import array
+
+# numpy is imported by the batch paths only, so streaming smoothers load
+# without it.
+_LIMB_BITS = 26
+_MAD_TO_SIGMA = 1.4826  # standard deviation per MAD of normal noise
+
+
+def _window_int_sums(values, length):
+    """
+    :param numpy.ndarray values: int64 values.
+    :param int length: Window length.
+    :return numpy.ndarray: Sum of the up to :attr:`length` values ending \
+     at each value. Exact if every sum fits in int64, because the \
+     wrapped-around cumulative sums are still exact modulo 2**64.
+    """
+    import numpy
+    cumulative = numpy.concatenate([[0], numpy.cumsum(values)])
+    ends = numpy.arange(1, len(values) + 1)
+    return cumulative[ends] - cumulative[numpy.maximum(ends - length, 0)]
+
+
+def _window_sums(terms, length):
+    """Correctly rounded rolling sums, using integer arithmetic. Every \
+    term is an integer multiple of 2**low, the ulp of the smallest term. \
+    Those integers are split into two int64 limbs of 26 low bits and the \
+    rest, summed exactly, and recombined with a single rounding.
+
+    :param numpy.ndarray terms: float64 terms, oldest first.
+    :param int length: Window length.
+    :return numpy.ndarray: Sum of the up to :attr:`length` terms ending at \
+     each term, or None if the terms span too many orders of magnitude.
+    """
+    import numpy
+    nonzero = terms != 0
+    if not nonzero.any():
+        return numpy.zeros(len(terms))
+    if not numpy.isfinite(terms).all():
+        return None
+    _, exponents = numpy.frexp(terms)
+    low = int(exponents[nonzero].min()) - 53
+    high = int(exponents.max())
+    # Window sums of each limb must be exactly representable as floats.
+    if high - low + length.bit_length() > 53 + _LIMB_BITS or \
+            length.bit_length() > 53 - _LIMB_BITS or low < -1022:
+        return None
+    scaled = numpy.ldexp(terms, -low)
+    high_limbs = numpy.floor(numpy.ldexp(scaled, -_LIMB_BITS))
+    low_limbs = scaled - numpy.ldexp(high_limbs, _LIMB_BITS)
+    high_sums = _window_int_sums(high_limbs.astype(numpy.int64), length)
+    low_sums = _window_int_sums(low_limbs.astype(numpy.int64), length)
+    sums = numpy.ldexp(high_sums.astype(float), _LIMB_BITS)
+    sums += low_sums.astype(float)
+    return numpy.ldexp(sums, low)
+
+
+def _round(values, decimal_places):
+    """Round like :func:`round`, which rounds the exact binary value. \
+    Scaling by a power of 10 is inexact, so elements close enough to a \
+    tie for that to matter, or too large to scale, use :func:`round`.
+
+    :param numpy.ndarray values: float64 values.
+    :param int decimal_places: Decimal places to round to.
+    :return numpy.ndarray: Rounded values.
+    """
+    import numpy
+    if not 0 <= decimal_places <= 22:
+        return numpy.array([round(v, decimal_places) for v in values.tolist()])
+    power = 10.0 ** decimal_places
+    scaled = values * power
+    rounded = numpy.rint(scaled) / power
+    with numpy.errstate(invalid='ignore'):
+        fraction = scaled - numpy.floor(scaled)
+        inexact = ~(numpy.abs(scaled) < 2.0**52)
+        inexact |= numpy.abs(fraction - 0.5) <= numpy.abs(scaled) * 2.0**-52
+    for i in numpy.flatnonzero(inexact).tolist():
+        rounded[i] = round(float(values[i]), decimal_places)
+    return rounded
 
 
 class AbstractSmoother(object):
     """Interface for data smoothing classes."""
     __metaclass__ = ABCMeta
+    __slots__ = ('decimal_places',)
 
     def __init__(self, decimal_places):
         assert isinstance(decimal_places, int)
@@ -17,6 +100,29 @@ class AbstractSmoother(object):
         """
         pass  # pragma: no cover
 
+    def update_many(self, measurements):
+        """
+        :param measurements: Iterable of measurements to add, oldest first.
+        """
+        update = self.update
+        for measurement in measurements:
+            update(measurement)
+
+    def smooth(self, series):
+        """Smooth a whole series at once, with the same result as passing \
+        each measurement to :meth:`update` and reading :attr:`value`, and \
+        leaving the same state.
+
+        :param series: Sequence of measurements, oldest first.
+        :return numpy.ndarray: :attr:`value` after each measurement.
+        """
+        import numpy
+        values = numpy.empty(len(series))
+        for i, measurement in enumerate(series):
+            self.update(measurement)
+            values[i] = self.value
+        return values
+
     @abstractmethod
     def value(self):
         """
@@ -26,59 +132,742 @@ class AbstractSmoother(object):
 
 
 class AbstractRollingSmoother(AbstractSmoother):
-    """Base class for using rolling algorithms to smooth data."""
+    """Base class for using rolling algorithms to smooth data. Measurements
+    are kept in a fixed size ring, with a running sum of :meth:`_term` of
+    each one, so updates and values cost the same for any window length.
+    The sum is kept as an exact integer multiple of a power of 2, so
+    rounding errors from adding and removing terms don't accumulate, and
+    :attr:`total` is the correctly rounded sum of the window. This is also
+    what lets :meth:`smooth` match :meth:`update` exactly. The power is the
+    finest any term needs, lowered again each time the ring wraps, so a
+    tiny measurement only widens the sum while it is in the window.
+    Infinite and NaN terms are counted instead, and make :attr:`total`
+    what summing the window would give until they leave it.
+    """
     __metaclass__ = ABCMeta
+    __slots__ = ('length', 'count', 'index', '_ring', '_numerators',
+                 '_shifts', '_exact', '_scale', '_special')
 
     def __init__(self, init_value, length, decimal_places):
         super(AbstractRollingSmoother, self).__init__(decimal_places)
-        self.values = [init_value]
         assert isinstance(length, int) and length > 0
         self.length = length
+        self._ring = array('d', [0.0]) * length
+        # Each term is numerator / 2**shift; None for non-finite terms.
+        self._numerators = [0] * length
+        self._shifts = array('h', [0]) * length
+        self._exact = self._scale = 0
+        self._special = [0, 0, 0]  # NaN, inf and -inf terms
+        self.count = 0
         self.index = 0
-        self.full = False if length > 1 else True
+        self.update(init_value)
+
+    @property
+    def full(self):
+        return self.count == self.length
+
+    @property
+    def values(self):
+        """
+        :return list: Measurements in the window, in ring order.
+        """
+        return self._ring[:self.count].tolist()
+
+    @abstractmethod
+    def _term(self, measurement):
+        """
+        :param measurement: Measurement in the window, or NumPy array of \
+         them.
+        :return: Its contribution to the running sum.
+        """
+        pass  # pragma: no cover
+
+    def _count_special(self, term, step):
+        """
+        :param float term: Infinite or NaN term.
+        :param int step: 1 as it enters the window, -1 as it leaves.
+        """
+        self._special[0 if term != term else 1 if term > 0 else 2] += step
+
+    def _add(self, index):
+        """Add the term of the measurement at :attr:`index` of the ring to \
+        the sum, raising :attr:`_scale` if it needs a finer power of 2.
+        """
+        term = self._term(self._ring[index])
+        try:
+            numerator, denominator = term.as_integer_ratio()
+        except (OverflowError, ValueError):
+            self._count_special(term, 1)
+            self._numerators[index] = None
+            self._shifts[index] = 0
+            return
+        shift = denominator.bit_length() - 1
+        scale = self._scale
+        if shift > scale:
+            self._exact <<= shift - scale
+            self._scale = scale = shift
+        self._exact += numerator << (scale - shift)
+        self._numerators[index] = numerator
+        self._shifts[index] = shift
+
+    def _normalize(self):
+        """Lower :attr:`_scale` to the finest power of 2 the terms in the \
+        window need. Every term is a multiple of it, so the sum stays exact.
+        """
+        scale = max(self._shifts[:self.count])
+        self._exact >>= self._scale - scale
+        self._scale = scale
 
     def update(self, measurement):
+        index = self.index
+        if self.count == self.length:
+            numerator = self._numerators[index]
+            if numerator is None:
+                self._count_special(self._term(self._ring[index]), -1)
+            else:
+                shift = self._scale - self._shifts[index]
+                self._exact -= numerator << shift
+        else:
+            self.count += 1
+        self._ring[index] = measurement
+        self._add(index)
+        index += 1
+        if index == self.length:
+            index = 0
+            self._normalize()
+        self.index = index
+
+    @property
+    def total(self):
+        """
+        :return float: Correctly rounded sum of :meth:`_term` over the \
+         window.
+        """
+        nans, infs, negative_infs = self._special
+        if nans or infs and negative_infs:
+            return float('nan')
+        if infs or negative_infs:
+            return float('inf') if infs else float('-inf')
+        # int / int true division is correctly rounded.
+        return self._exact / (1 << self._scale)
+
+    @abstractmethod
+    def _estimates(self, totals, counts):
+        """
+        :param numpy.ndarray totals: :attr:`total` after each measurement.
+        :param numpy.ndarray counts: :attr:`count` after each measurement.
+        :return numpy.ndarray: Unrounded :attr:`value` after each one.
+        """
+        pass  # pragma: no cover
+
+    def smooth(self, series):
+        import numpy
+        series = numpy.asarray(series, dtype=float)
         if self.full:
-            self.values[self.index] = measurement
-            self.index += 1
-            if self.index == self.length:
-                self.index = 0
+            history = self._ring[self.index:] + self._ring[:self.index]
         else:
-            self.values.append(measurement)
-            if len(self.values) == self.length:
-                self.full = True
+            history = self._ring[:self.count]
+        terms = self._term(numpy.concatenate([history, series]))
+        totals = _window_sums(terms, self.length)
+        if totals is None:
+            return super(AbstractRollingSmoother, self).smooth(series)
+        counts = numpy.minimum(
+            numpy.arange(len(history) + 1, len(terms) + 1), self.length)
+        self._advance(series)
+        estimates = self._estimates(totals[len(history):], counts)
+        return _round(estimates, self.decimal_places)
+
+    def _advance(self, series):
+        """Leave the state :meth:`update` would after :attr:`series`.
+
+        :param numpy.ndarray series: Measurements, oldest first.
+        """
+        self.index = (self.index + len(series)) % self.length
+        self.count = min(self.count + len(series), self.length)
+        latest = series[-self.length:].tolist()
+        for offset, measurement in enumerate(reversed(latest)):
+            self._ring[(self.index - 1 - offset) % self.length] = measurement
+        self._exact = self._scale = 0
+        self._special = [0, 0, 0]
+        for index in range(self.count):
+            self._add(index)
+        self._normalize()
 
 
 class RollingMean(AbstractRollingSmoother):
     """Use the mean of measurements to estimate true value."""
+    __slots__ = ()
 
     def __init__(self, init_value, length, decimal_places):
         super(RollingMean, self).__init__(init_value, length, decimal_places)
 
+    def _term(self, measurement):
+        return measurement
+
+    def _estimates(self, totals, counts):
+        return totals / counts
+
     @property
     def value(self):
-        return round(sum(self.values) / len(self.values), self.decimal_places)
+        return round(self.total / self.count, self.decimal_places)
 
 
 class RollingRootMeanSquared(AbstractRollingSmoother):
     """Use the root mean squared of measurements to estimate true value."""
+    __slots__ = ()
 
     def __init__(self, init_value, length, decimal_places):
         super(RollingRootMeanSquared, self).__init__(init_value,
                                                      length,
                                                      decimal_places)
 
+    def _term(self, measurement):
+        return measurement * measurement
+
+    def _estimates(self, totals, counts):
+        import numpy
+        return numpy.sqrt(totals / counts)
+
+    @property
+    def value(self):
+        return round(math.sqrt(self.total / self.count), self.decimal_places)
+
+
+class RollingMedian(AbstractSmoother):
+    """Use the median of measurements to estimate true value, so single
+    sample spikes are rejected rather than smeared. The lower half of the
+    window is kept in a max heap and the upper half in a min heap, each
+    entry tagged with its sequence number. Measurements leaving the window
+    are only counted out of their half, and popped once they reach the top
+    of a heap, so each update costs O(log n) for any window length.
+    """
+    __slots__ = ('length', 'count', 'index', '_ring', '_sequence', '_low',
+                 '_high', '_low_count', '_high_count')
+
+    def __init__(self, init_value, length, decimal_places):
+        super(RollingMedian, self).__init__(decimal_places)
+        assert isinstance(length, int) and length > 0
+        self.length = length
+        self._ring = array('d', [0.0]) * length
+        self._sequence = 0
+        self._low = []  # (-measurement, -sequence)
+        self._high = []  # (measurement, sequence)
+        self._low_count = self._high_count = 0
+        self.count = 0
+        self.index = 0
+        self.update(init_value)
+
+    @property
+    def full(self):
+        return self.count == self.length
+
+    @property
+    def values(self):
+        """
+        :return list: Measurements in the window, in ring order.
+        """
+        return self._ring[:self.count].tolist()
+
+    def _prune(self, oldest):
+        """Pop measurements older than sequence :attr:`oldest` from the top
+        of each heap.
+        """
+        low, high = self._low, self._high
+        while low and -low[0][1] < oldest:
+            heapq.heappop(low)
+        while high and high[0][1] < oldest:
+            heapq.heappop(high)
+
+    def update(self, measurement):
+        measurement = float(measurement)
+        sequence = self._sequence
+        oldest = sequence - self.count + 1
+        if self.count == self.length:
+            self._prune(oldest - 1)
+            low_measurement, low_sequence = self._low[0]
+            removed = self._ring[self.index], sequence - self.length
+            if removed <= (-low_measurement, -low_sequence):
+                self._low_count -= 1
+            else:
+                self._high_count -= 1
+        else:
+            self.count += 1
+            oldest -= 1
+        self._prune(oldest)
+        if self._low_count and measurement < -self._low[0][0]:
+            heapq.heappush(self._low, (-measurement, -sequence))
+            self._low_count += 1
+        else:
+            heapq.heappush(self._high, (measurement, sequence))
+            self._high_count += 1
+        self._balance(oldest)
+        self._ring[self.index] = measurement
+        self._sequence = sequence + 1
+        index = self.index + 1
+        self.index = 0 if index == self.length else index
+
+    def _balance(self, oldest):
+        """Keep the lower half the same size as the upper half, or one
+        larger, with valid measurements on top of both heaps.
+        """
+        low, high = self._low, self._high
+        while self._low_count > self._high_count + 1:
+            self._prune(oldest)
+            measurement, sequence = heapq.heappop(low)
+            heapq.heappush(high, (-measurement, -sequence))
+            self._low_count -= 1
+            self._high_count += 1
+        while self._high_count > self._low_count:
+            self._prune(oldest)
+            measurement, sequence = heapq.heappop(high)
+            heapq.heappush(low, (-measurement, -sequence))
+            self._high_count -= 1
+            self._low_count += 1
+        self._prune(oldest)
+        # Drop expired measurements buried in the heaps now and then, so
+        # they never hold more than twice the window.
+        if len(low) + len(high) > 2 * self.length:
+            low[:] = [entry for entry in low if -entry[1] >= oldest]
+            high[:] = [entry for entry in high if entry[1] >= oldest]
+            heapq.heapify(low)
+            heapq.heapify(high)
+
+    @property
+    def median(self):
+        """
+        :return float: Unrounded median of the window.
+        """
+        if self._low_count > self._high_count:
+            return -self._low[0][0]
+        return (self._high[0][0] - self._low[0][0]) / 2.0
+
+    @property
+    def value(self):
+        return round(self.median, self.decimal_places)
+
+
+class _Node(object):
+    """Treap node: ordered by value, heap ordered by a random priority, so
+    the tree is O(log n) deep whatever order values arrive in. Also holds
+    the size of its subtree, so values can be selected by rank.
+    """
+    __slots__ = ('value', 'priority', 'size', 'left', 'right')
+
+    def __init__(self, value, priority):
+        self.value = value
+        self.priority = priority
+        self.size = 1
+        self.left = self.right = None
+
+
+def _size(node):
+    return node.size if node is not None else 0
+
+
+def _split(node, value):
+    """
+    :return tuple: Treaps of the values below :attr:`value`, and of the rest.
+    """
+    if node is None:
+        return None, None
+    if node.value < value:
+        node.right, right = _split(node.right, value)
+        node.size = _size(node.left) + _size(node.right) + 1
+        return node, right
+    left, node.left = _split(node.left, value)
+    node.size = _size(node.left) + _size(node.right) + 1
+    return left, node
+
+
+def _merge(left, right):
+    """
+    :param _Node left: Treap of values no greater than those in \
+     :attr:`right`.
+    :return _Node: Treap of the values in both.
+    """
+    if left is None:
+        return right
+    if right is None:
+        return left
+    size = left.size + right.size
+    if left.priority > right.priority:
+        left.right = _merge(left.right, right)
+        left.size = size
+        return left
+    right.left = _merge(left, right.left)
+    right.size = size
+    return right
+
+
+def _insert(node, new):
+    """
+    :return _Node: Root of :attr:`node` with :attr:`new` inserted.
+    """
+    if node is None:
+        return new
+    if new.priority > node.priority:
+        new.size = node.size + 1
+        new.left, new.right = _split(node, new.value)
+        return new
+    if new.value < node.value:
+        node.left = _insert(node.left, new)
+    else:
+        node.right = _insert(node.right, new)
+    node.size += 1
+    return node
+
+
+def _delete(node, value):
+    """
+    :return _Node: Root of :attr:`node` with one :attr:`value` removed.
+    """
+    if value < node.value:
+        node.left = _delete(node.left, value)
+    elif value > node.value:
+        node.right = _delete(node.right, value)
+    else:
+        return _merge(node.left, node.right)
+    node.size -= 1
+    return node
+
+
+def _first(node):
+    while node.left is not None:
+        node = node.left
+    return node.value
+
+
+def _last(node):
+    while node.right is not None:
+        node = node.right
+    return node.value
+
+
+def _select(node, k):
+    """
+    :return float: k-th smallest value in the treap, counting from 0.
+    """
+    while True:
+        left = _size(node.left)
+        if k < left:
+            node = node.left
+        elif k == left:
+            return node.value
+        else:
+            k -= left + 1
+            node = node.right
+
+
+def _height(node):
+    if node is None:
+        return 0
+    return 1 + max(_height(node.left), _height(node.right))
+
+
+def _kth_deviation(low, high, center, k):
+    """Select from the absolute deviations of two treaps, without computing
+    them, by descending both together. Each step drops one node and the
+    subtree on one side of it, from the treap where they can't hold the
+    result, so selection is O(log n).
+
+    :param _Node low: Treap of values no greater than :attr:`center`.
+    :param _Node high: Treap of values no less than :attr:`center`.
+    :param float center: Value to measure deviations from.
+    :param int k: 0 based rank of the deviation.
+    :return float: k-th smallest absolute deviation from :attr:`center`.
+    """
+    while low is not None and high is not None:
+        # Deviations nearer the center than each node.
+        nearer = _size(low.right) + _size(high.left)
+        if center - low.value <= high.value - center:
+            if k <= nearer:
+                high = high.left
+            else:
+                k -= _size(low.right) + 1
+                low = low.left
+        elif k <= nearer:
+            low = low.right
+        else:
+            k -= _size(high.left) + 1
+            high = high.right
+    if low is None:
+        return _select(high, k) - center
+    return center - _select(low, low.size - 1 - k)
+
+
+class HampelFilter(AbstractSmoother):
+    """Reject outliers: a measurement more than :attr:`n_sigmas` scaled
+    median absolute deviations (MAD) from the median of the last
+    :attr:`length` measurements is replaced by that median. Others pass
+    through unchanged, so another smoother can follow it:
+
+        hampel.update(measurement)
+        kalman.update(hampel.value)
+
+    Like :class:`RollingMedian`, the window is split into a lower and an
+    upper half, here kept in treaps that count their subtrees. Inserting,
+    deleting and moving measurements between the halves, the median, and
+    the MAD, selected from both halves at once, each cost O(log n). If more
+    than half the window is equal, the MAD is 0, and any other measurement
+    is rejected.
+    """
+    __slots__ = ('length', 'n_sigmas', 'count', 'index', 'outlier',
+                 'outliers', '_ring', '_low', '_high', '_random', '_value')
+
+    def __init__(self, init_value, length, n_sigmas, decimal_places):
+        """
+        :param float init_value: First measurement.
+        :param int length: Measurements in the window.
+        :param float n_sigmas: Rejection threshold, in standard deviations \
+         of normal noise estimated from the MAD.
+        :param int decimal_places: Decimal places of :attr:`value`.
+        """
+        super(HampelFilter, self).__init__(decimal_places)
+        assert isinstance(length, int) and length > 0
+        assert n_sigmas >= 0
+        self.length = length
+        self.n_sigmas = float(n_sigmas)
+        self._ring = array('d', [0.0]) * length
+        self._low = self._high = None
+        # Priorities only shape the treaps, so any seed gives the same
+        # results.
+        self._random = random.Random(0).random
+        self.count = 0
+        self.index = 0
+        self.outliers = 0
+        self.update(init_value)
+
+    @property
+    def values(self):
+        """
+        :return list: Measurements in the window, in ring order.
+        """
+        return self._ring[:self.count].tolist()
+
+    def update(self, measurement):
+        """
+        :param float measurement: Latest measurement.
+        :return bool: The measurement was rejected as an outlier.
+        """
+        measurement = float(measurement)
+        if self.count == self.length:
+            self._remove(self._ring[self.index])
+        else:
+            self.count += 1
+        self._add(measurement)
+        self._ring[self.index] = measurement
+        index = self.index + 1
+        self.index = 0 if index == self.length else index
+
+        median = self._median()
+        deviation = abs(measurement - median)
+        self.outlier = deviation > 0 and \
+            deviation > self.n_sigmas * _MAD_TO_SIGMA * self._mad(median)
+        if self.outlier:
+            self.outliers += 1
+            self._value = median
+        else:
+            self._value = measurement
+        return self.outlier
+
+    def _remove(self, measurement):
+        low = self._low
+        if low is not None and measurement <= _last(low):
+            self._low = _delete(low, measurement)
+        else:
+            self._high = _delete(self._high, measurement)
+
+    def _add(self, measurement):
+        """Insert :attr:`measurement` into its half, then move one
+        measurement across if needed to keep the lower half the same size
+        as the upper half, or one larger.
+        """
+        node = _Node(measurement, self._random())
+        if self._low is not None and measurement <= _last(self._low):
+            self._low = _insert(self._low, node)
+        else:
+            self._high = _insert(self._high, node)
+        if _size(self._low) > _size(self._high) + 1:
+            moved = _last(self._low)
+            self._low = _delete(self._low, moved)
+            self._high = _insert(self._high, _Node(moved, self._random()))
+        elif _size(self._high) > _size(self._low):
+            moved = _first(self._high)
+            self._high = _delete(self._high, moved)
+            self._low = _insert(self._low, _Node(moved, self._random()))
+
+    def _median(self):
+        if self.count % 2:
+            return _last(self._low)
+        return (_last(self._low) + _first(self._high)) / 2.0
+
+    def _mad(self, median):
+        """
+        :param float median: Median of the window.
+        :return float: Median absolute deviation from :attr:`median`.
+        """
+        low, high, middle = self._low, self._high, self.count // 2
+        if self.count % 2:
+            return _kth_deviation(low, high, median, middle)
+        lower = _kth_deviation(low, high, median, middle - 1)
+        return (lower + _kth_deviation(low, high, median, middle)) / 2.0
+
     @property
     def value(self):
-        squares = [x ** 2 for x in self.values]
-        return round(math.sqrt(sum(squares) / len(self.values)),
-                     self.decimal_places)
+        """
+        :return float: Latest measurement, or the window median if it was \
+         an outlier.
+        """
+        return round(self._value, self.decimal_places)
+
+
+def _check_cutoff(cutoff_hz, sample_rate_hz, nyquist_limit):
+    """
+    :param float cutoff_hz: Low pass cutoff frequency.
+    :param float sample_rate_hz: Rate measurements are taken at.
+    :param bool nyquist_limit: Cutoff must be below half the sample rate.
+    """
+    if not sample_rate_hz > 0:
+        raise ValueError("'{}' Hz is not a valid sample rate.".format(
+            sample_rate_hz))
+    limit = sample_rate_hz / 2.0 if nyquist_limit else float('inf')
+    if not 0 < cutoff_hz < limit:
+        msg = "'{}' Hz is not a valid cutoff for a sample rate of {} Hz."
+        raise ValueError(msg.format(cutoff_hz, sample_rate_hz))
+
+
+class ExponentialMovingAverage(AbstractSmoother):
+    """Single pole low pass filter: each measurement moves the estimate
+    :attr:`alpha` of the way towards it. Only the estimate is kept, so
+    state and updates cost the same for any cutoff.
+    """
+    __slots__ = ('alpha', 'x_value')
+
+    def __init__(self, init_value, cutoff_hz, sample_rate_hz,
+                 decimal_places):
+        """
+        :param float init_value: Initial estimate.
+        :param float cutoff_hz: -3 dB frequency.
+        :param float sample_rate_hz: Rate measurements are taken at, e.g. \
+         :meth:`AbsI2CBarometer.sample_rate_hz` for the OSR.
+        :param int decimal_places: Decimal places of :attr:`value`.
+        """
+        super(ExponentialMovingAverage, self).__init__(decimal_places)
+        _check_cutoff(cutoff_hz, sample_rate_hz, nyquist_limit=False)
+        omega = 2.0 * math.pi * cutoff_hz / sample_rate_hz
+        self.alpha = 1.0 - math.exp(-omega)
+        self.x_value = float(init_value)
+
+    def update(self, measurement):
+        self.x_value += self.alpha * (measurement - self.x_value)
+
+    def smooth(self, series):
+        import numpy
+        x_value = self.x_value
+        alpha = self.alpha
+        estimates = array('d', [0.0]) * len(series)
+        for i, measurement in enumerate(numpy.asarray(series).tolist()):
+            x_value += alpha * (measurement - x_value)
+            estimates[i] = x_value
+        self.x_value = x_value
+        return _round(numpy.frombuffer(estimates), self.decimal_places)
+
+    @property
+    def value(self):
+        return round(self.x_value, self.decimal_places)
+
+
+def butterworth_sections(cutoff_hz, sample_rate_hz, sections):
+    """Design a Butterworth low pass filter as a cascade of biquads, using \
+    the bilinear transform with the cutoff prewarped.
+
+    :param float cutoff_hz: -3 dB frequency.
+    :param float sample_rate_hz: Sample rate. Must be over twice the cutoff.
+    :param int sections: Biquads in the cascade; the filter order is twice \
+     this.
+    :return list: b0, b1, b2, a1, a2 of each biquad, normalized so a0 is 1.
+    """
+    _check_cutoff(cutoff_hz, sample_rate_hz, nyquist_limit=True)
+    omega = 2.0 * math.pi * cutoff_hz / sample_rate_hz
+    cos_omega, sin_omega = math.cos(omega), math.sin(omega)
+    coefficients = []
+    for k in range(sections):
+        q = 1.0 / (2.0 * math.cos(math.pi * (2 * k + 1) / (4.0 * sections)))
+        alpha = sin_omega / (2.0 * q)
+        a0 = 1.0 + alpha
+        b0 = (1.0 - cos_omega) / 2.0 / a0
+        coefficients.append((b0, 2.0 * b0, b0, -2.0 * cos_omega / a0,
+                             (1.0 - alpha) / a0))
+    return coefficients
+
+
+class LowPassBiquad(AbstractSmoother):
+    """Butterworth low pass filter of order 2 * :attr:`sections`, run as
+    cascaded biquads in transposed direct form II. Above the cutoff, each
+    biquad attenuates 12 dB more per octave, for two values of state. The
+    state starts as if :attr:`init_value` had always been measured.
+    """
+    __slots__ = ('coefficients', 'state', 'y_value')
+
+    def __init__(self, init_value, cutoff_hz, sample_rate_hz,
+                 decimal_places, sections=1):
+        """
+        :param float init_value: Initial estimate.
+        :param float cutoff_hz: -3 dB frequency. Must be below half the \
+         sample rate.
+        :param float sample_rate_hz: Rate measurements are taken at, e.g. \
+         :meth:`AbsI2CBarometer.sample_rate_hz` for the OSR.
+        :param int decimal_places: Decimal places of :attr:`value`.
+        :param int sections: Biquads in the cascade.
+        """
+        super(LowPassBiquad, self).__init__(decimal_places)
+        assert isinstance(sections, int) and sections > 0
+        self.coefficients = butterworth_sections(cutoff_hz, sample_rate_hz,
+                                                 sections)
+        init_value = float(init_value)
+        self.state = [[init_value * (1.0 - b0), init_value * (b2 - a2)]
+                      for b0, _, b2, _, a2 in self.coefficients]
+        self.y_value = init_value
+
+    def update(self, measurement):
+        for (b0, b1, b2, a1, a2), state in zip(self.coefficients,
+                                               self.state):
+            output = b0 * measurement + state[0]
+            state[0] = b1 * measurement - a1 * output + state[1]
+            state[1] = b2 * measurement - a2 * output
+            measurement = output
+        self.y_value = measurement
+
+    def smooth(self, series):
+        import numpy
+        # Filter the whole series through each biquad in turn; every
+        # operation is the same as in update(), so the output is too.
+        signal = numpy.asarray(series, dtype=float).tolist()
+        for (b0, b1, b2, a1, a2), state in zip(self.coefficients,
+                                               self.state):
+            z1, z2 = state
+            for i, measurement in enumerate(signal):
+                output = b0 * measurement + z1
+                z1 = b1 * measurement - a1 * output + z2
+                z2 = b2 * measurement - a2 * output
+                signal[i] = output
+            state[:] = z1, z2
+        if signal:
+            self.y_value = signal[-1]
+        return _round(numpy.array(signal), self.decimal_places)
+
+    @property
+    def value(self):
+        return round(self.y_value, self.decimal_places)
 
 
 class OneDKalman(AbstractSmoother):
     """Use for smoothing out noisy sensor outputs. Adapted from:
     http://interactive-matter.eu/blog/2009/12/18/filtering-sensor-data-with-a-kalman-filter/
     """
+    __slots__ = ('x_value', 'p_estimation_error', 'q_process_noise',
+                 'r_measure_noise', 'kalman_gain')
+
     def __init__(self, x_init_value,
                  p_estimation_error,
                  q_process_noise,
@@ -100,6 +889,26 @@ class OneDKalman(AbstractSmoother):
         self.x_value += self.kalman_gain * (measurement - self.x_value)
         self.p_estimation_error *= (1 - self.kalman_gain)
 
+    def smooth(self, series):
+        import numpy
+        x_value = self.x_value
+        p_estimation_error = self.p_estimation_error
+        q_process_noise = self.q_process_noise
+        r_measure_noise = self.r_measure_noise
+        estimates = array('d', [0.0]) * len(series)
+        for i, measurement in enumerate(numpy.asarray(series).tolist()):
+            p_estimation_error += q_process_noise
+            kalman_gain = p_estimation_error / (
+                p_estimation_error + r_measure_noise)
+            x_value += kalman_gain * (measurement - x_value)
+            p_estimation_error *= (1 - kalman_gain)
+            estimates[i] = x_value
+        if len(estimates):
+            self.x_value = x_value
+            self.p_estimation_error = p_estimation_error
+            self.kalman_gain = kalman_gain
+        return _round(numpy.frombuffer(estimates), self.decimal_places)
+
     @property
     def value(self):
         return round(self.x_value, self.decimal_places)
@@ -0,0 +1,237 @@
+import time
+
+import pytest
+
+from barometerdrivers.promcache import PromCache
+from barometerdrivers.rawcapture import RawCaptureReader, RawCaptureWriter
+from barometerdrivers.simulation import SimulatedBus, SimulatedHP206C
+from test_ms5803_01ba import read_prom_side_effect
+from test_promcache import PROM_WORDS, read_full_prom_side_effect
+from test_simulation import RampSource
+
+asyncio = pytest.importorskip('asyncio')
+aio = pytest.importorskip('barometerdrivers.aio')
+
+try:
+    from unittest.mock import call
+except ImportError:
+    from mock import call
+
+READY = 0x40
+NOT_READY = 0
+
+
+def run(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+@pytest.fixture
+def ms5803_01ba(i2c_mock):
+    i2c_mock.read_block_data.side_effect = read_prom_side_effect
+    barometer = run(aio.AsyncMS5803_01BA.create())
+    i2c_mock.write_byte.reset_mock()
+    i2c_mock.read_block_data.reset_mock()
+    return barometer
+
+
+@pytest.fixture
+def hp206c(i2c_mock):
+    i2c_mock.read_byte_data.side_effect = [READY]
+    barometer = run(aio.AsyncHP206C.create())
+    i2c_mock.write_byte.reset_mock()
+    i2c_mock.read_byte_data.reset_mock()
+    return barometer
+
+
+def test_async_ms5803_01ba_init_does_not_reset(i2c_mock_init, i2c_mock):
+    aio.AsyncMS5803_01BA()
+    i2c_mock_init.assert_called_once_with(0x77, 1)
+    assert not i2c_mock.write_byte.called
+
+
+def test_async_ms5803_01ba_create(i2c_mock_init, i2c_mock):
+    i2c_mock.read_block_data.side_effect = read_prom_side_effect
+    barometer = run(aio.AsyncMS5803_01BA.create(is_high_address=False))
+
+    i2c_mock_init.assert_called_once_with(0x76, 1)
+    i2c_mock.write_byte.assert_called_once_with(aio.AsyncMS5803_01BA.reset)
+    assert len(i2c_mock.read_block_data.mock_calls) == 6
+    assert barometer.sens_t1 == 40127
+    assert barometer.tempsens == 28312
+
+
+def test_async_ms5803_01ba_warm_start(i2c_mock, tmpdir):
+    cache = PromCache(str(tmpdir.join('prom.json')))
+    cache.put(1, 0x77, PROM_WORDS)
+    i2c_mock.read_block_data.side_effect = read_full_prom_side_effect
+    barometer = run(aio.AsyncMS5803_01BA.create(prom_cache=cache))
+
+    assert not i2c_mock.write_byte.called
+    i2c_mock.read_block_data.assert_called_once_with(0xae, 2)
+    assert barometer.sens_t1 == 40127
+
+
+def test_async_ms5803_01ba_force_prom_read(i2c_mock, tmpdir):
+    cache = PromCache(str(tmpdir.join('prom.json')))
+    cache.put(1, 0x77, PROM_WORDS)
+    i2c_mock.read_block_data.side_effect = read_full_prom_side_effect
+    barometer = run(aio.AsyncMS5803_01BA.create(prom_cache=cache,
+                                                force_prom_read=True))
+
+    i2c_mock.write_byte.assert_called_once_with(aio.AsyncMS5803_01BA.reset)
+    assert len(i2c_mock.read_block_data.mock_calls) == 8
+    assert barometer.sens_t1 == 40127
+
+
+def test_async_ms5803_01ba_read_temp_pressure(i2c_mock, ms5803_01ba):
+    i2c_mock.read_block_data.side_effect = [[0x82, 0xc1, 0x3e],
+                                            [0x8a, 0xa2, 0x1a]]
+
+    result = run(ms5803_01ba.read_temperature_and_pressure())
+    assert result == (20.07, 1000.09)
+    osr_value = aio.AsyncMS5803_01BA.osr_conversion[1024]
+    assert i2c_mock.write_byte.mock_calls == [
+        call(osr_value.command(is_pressure=False)),
+        call(osr_value.command(is_pressure=True))
+    ]
+
+
+def test_async_ms5803_01ba_read_temperature(i2c_mock, ms5803_01ba):
+    i2c_mock.read_block_data.side_effect = [[0x82, 0xc1, 0x3e]]
+    assert run(ms5803_01ba.read_temperature()) == 20.07
+
+
+def test_async_ms5803_01ba_read_pressure(i2c_mock, ms5803_01ba):
+    i2c_mock.read_block_data.side_effect = [[0x82, 0xc1, 0x3e],
+                                            [0x8a, 0xa2, 0x1a]]
+    assert run(ms5803_01ba.read_pressure()) == 1000.09
+
+
+def test_async_ms5803_01ba_concurrent_reads(i2c_mock, ms5803_01ba):
+    ms5803_01ba.oversampling_rate = 4096
+    i2c_mock.read_block_data.side_effect = [[0x82, 0xc1, 0x3e]] * 3
+
+    async def read_three():
+        return await asyncio.gather(*[ms5803_01ba.read_temperature()
+                                      for _ in range(3)])
+
+    start = time.time()
+    assert run(read_three()) == [20.07] * 3
+    # conversions on one device are serialized, never overlapped
+    assert time.time() - start >= 3 * 0.00904
+
+
+def test_async_hp206c_create(i2c_mock_init, i2c_mock):
+    i2c_mock.read_byte_data.side_effect = [NOT_READY, READY]
+    run(aio.AsyncHP206C.create())
+
+    i2c_mock_init.assert_called_once_with(0x76, 1)
+    i2c_mock.write_byte.assert_called_once_with(0x06)
+    assert i2c_mock.read_byte_data.mock_calls == [call(0x80 | 0x0d)] * 2
+
+
+def test_async_hp206c_read_temperature(i2c_mock, hp206c):
+    i2c_mock.read_byte_data.side_effect = [NOT_READY, READY]
+    i2c_mock.read_block_data.side_effect = [[0xff, 0xfc, 0x02]]
+
+    assert run(hp206c.read_temperature()) == -10.22
+    i2c_mock.write_byte.assert_called_once_with(0x40 | 0x02)
+    i2c_mock.read_block_data.assert_called_once_with(0x32, 3)
+
+
+def test_async_hp206c_read_pressure(i2c_mock, hp206c):
+    i2c_mock.read_byte_data.side_effect = [READY]
+    i2c_mock.read_block_data.side_effect = [[0x01, 0x8a, 0x9e]]
+
+    assert run(hp206c.read_pressure()) == 1010.22
+    i2c_mock.write_byte.assert_called_once_with(0x40)
+    i2c_mock.read_block_data.assert_called_once_with(0x30, 3)
+
+
+def test_async_hp206c_read_temperature_and_pressure(i2c_mock, hp206c):
+    i2c_mock.read_byte_data.side_effect = [READY]
+    i2c_mock.read_block_data.side_effect = [
+        [0x00, 0x0a, 0x5c, 0x01, 0x8a, 0x9e]
+    ]
+
+    assert run(hp206c.read_temperature_and_pressure()) == (26.52, 1010.22)
+    i2c_mock.read_block_data.assert_called_once_with(0x10, 6)
+
+
+def test_async_hp206c_monitor():
+    bus = SimulatedBus()
+    bus.attach(SimulatedHP206C(RampSource(20.0, 1000.0, 0.5),
+                               time_scale=0.01), 0x76)
+
+    async def monitor():
+        barometer = await aio.AsyncHP206C.create(oversampling_rate=128,
+                                                 bus=bus)
+        interrupts = barometer.interrupts
+        barometer.set_pressure_thresholds(low=990, mid=1002, high=1004)
+        barometer.enable_interrupts(
+            interrupts.pressure_traverse | interrupts.pressure_window)
+        events = []
+        async for event in barometer.monitor():
+            events.append(event)
+            if len(events) == 2:
+                break
+        return interrupts, events
+
+    interrupts, (rising, above) = run(monitor())
+    assert rising.events == rising.directions == interrupts.pressure_traverse
+    assert rising.pressure == 1002.0
+    assert above.events == above.directions == interrupts.pressure_window
+    assert above.pressure == 1004.5
+
+
+def test_async_hp206c_monitor_duration():
+    bus = SimulatedBus()
+    bus.attach(SimulatedHP206C(RampSource(20.0, 1000.0, 0),
+                               time_scale=0), 0x76)
+
+    async def monitor():
+        barometer = await aio.AsyncHP206C.create(bus=bus)
+        barometer.enable_interrupts(0)
+        events = []
+        async for event in barometer.monitor(interval=0.001, duration=0.01):
+            events.append(event)
+        return events
+
+    assert run(monitor()) == []
+
+
+def test_async_ms5803_01ba_temperature_reuse(i2c_mock, ms5803_01ba):
+    i2c_mock.read_block_data.side_effect = [[0x82, 0xc1, 0x3e],
+                                            [0x8a, 0xa2, 0x1a],
+                                            [0x8a, 0xa2, 0x1a]]
+    ms5803_01ba.set_temperature_reuse(max_samples=2)
+
+    assert run(ms5803_01ba.read_temperature_and_pressure()) == (20.07,
+                                                                1000.09)
+    sample = run(ms5803_01ba.read_sample())
+    assert sample[:2] == (20.07, 1000.09)
+    assert sample.temperature_reused
+    assert len(i2c_mock.write_byte.mock_calls) == 3
+
+
+def test_async_raw_capture(i2c_mock, ms5803_01ba, hp206c, tmpdir):
+    path = str(tmpdir.join('capture.braw'))
+    hp206c.oversampling_rate = 128
+    i2c_mock.read_byte_data.side_effect = lambda command: READY
+    i2c_mock.read_block_data.side_effect = [
+        [0x82, 0xc1, 0x3e], [0x8a, 0xa2, 0x1a],
+        [0xff, 0xfc, 0x02, 0x01, 0x8a, 0x9e]
+    ]
+    with RawCaptureWriter(path, [ms5803_01ba, hp206c]) as writer:
+        with pytest.raises(ValueError):
+            writer.capture()
+        run(aio.capture_raw(writer))
+
+    records = list(RawCaptureReader(path))
+    assert [(r.sensor_id, r.raw_temperature, r.raw_pressure)
+            for r in records] == [(0, 0x82c13e, 0x8aa21a),
+                                  (1, -1022, 101022)]
@@ -0,0 +1,139 @@
+import time
+
+import pytest
+
+from barometerdrivers.background import BackgroundSampler
+
+
+class FakeClock(object):
+    now = 100.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, sec):
+        self.now += sec
+
+
+class FakeBarometer(object):
+
+    def __init__(self, read_sec=0.0, fail_every=0, clock=None, error=None):
+        self.read_sec = read_sec
+        self.fail_every = fail_every
+        self.clock = clock
+        self.error = error
+        self.reads = 0
+
+    def read_temperature_and_pressure(self):
+        self.reads += 1
+        if self.clock is None:
+            time.sleep(self.read_sec)
+        else:
+            self.clock.sleep(self.read_sec)
+        if self.fail_every and self.reads % self.fail_every == 0:
+            if self.error is not None:
+                raise self.error
+            raise IOError(121, 'Remote I/O error')
+        return 20.0 + self.reads, 1000.0 + self.reads
+
+
+def wait_for(sampler, count):
+    deadline = time.time() + 2
+    while sampler.count < count and time.time() < deadline:
+        time.sleep(0.001)
+
+
+def wait_until_stopped(sampler):
+    deadline = time.time() + 2
+    while sampler.is_running and time.time() < deadline:
+        time.sleep(0.001)
+
+
+def test_latest_before_start():
+    sampler = BackgroundSampler(FakeBarometer(), capacity=4)
+    assert sampler.latest() is None
+    assert sampler.window(4) == []
+    assert sampler.since(0) == []
+
+
+def test_latest_and_window():
+    barometer = FakeBarometer(read_sec=0.001)
+    with BackgroundSampler(barometer, capacity=8) as sampler:
+        wait_for(sampler, 20)
+    assert not sampler.is_running
+
+    latest = sampler.latest()
+    assert latest.temperature == 20.0 + sampler.count
+    assert latest.pressure == 1000.0 + sampler.count
+    window = sampler.window(5)
+    assert [r.temperature for r in window] == \
+        [20.0 + i for i in range(sampler.count - 4, sampler.count + 1)]
+    assert window[-1] == latest
+    # ring buffer only holds capacity readings
+    assert len(sampler.window(100)) == 8
+
+
+def test_since():
+    with BackgroundSampler(FakeBarometer(read_sec=0.001)) as sampler:
+        wait_for(sampler, 10)
+        middle = sampler.latest().timestamp
+        wait_for(sampler, sampler.count + 10)
+    readings = sampler.since(middle)
+    assert readings
+    assert all(r.timestamp > middle for r in readings)
+    assert readings[-1] == sampler.latest()
+    timestamps = [r.timestamp for r in readings]
+    assert timestamps == sorted(timestamps)
+
+
+def test_dropped_readings():
+    barometer = FakeBarometer(fail_every=3)
+    with BackgroundSampler(barometer) as sampler:
+        wait_for(sampler, 30)
+    assert sampler.dropped == barometer.reads // 3
+    assert sampler.count == barometer.reads - sampler.dropped
+
+
+def test_interval_and_overruns():
+    clock = FakeClock()
+    barometer = FakeBarometer(read_sec=0.0078125, clock=clock)
+    with BackgroundSampler(barometer, capacity=8, interval=0.03125,
+                           clock=clock, sleep=clock.sleep) as sampler:
+        wait_for(sampler, 5)
+    # Each reading takes 1/128 sec, then waits for the next 1/32 sec.
+    first = sampler.count - 8
+    assert [r.timestamp for r in sampler.window(8)] == [
+        100.0078125 + 0.03125 * i for i in range(first, sampler.count)]
+    assert sampler.overruns == 0
+
+    clock = FakeClock()
+    slow = FakeBarometer(read_sec=0.0078125, clock=clock)  # over interval
+    with BackgroundSampler(slow, interval=0.00390625, clock=clock,
+                           sleep=clock.sleep) as sampler:
+        wait_for(sampler, 5)
+    assert sampler.overruns == sampler.count
+
+
+def test_error_stops_sampling():
+    barometer = FakeBarometer(fail_every=3, error=ValueError('bad reading'))
+    sampler = BackgroundSampler(barometer).start()
+    wait_until_stopped(sampler)
+    assert not sampler.is_running
+    assert sampler.count == 2
+    assert isinstance(sampler.error, ValueError)
+    with pytest.raises(ValueError):
+        sampler.latest()
+    with pytest.raises(ValueError):
+        sampler.stop()
+
+    with pytest.raises(ValueError):
+        with BackgroundSampler(FakeBarometer(fail_every=1,
+                                             error=ValueError())) as sampler:
+            wait_until_stopped(sampler)
+
+
+def test_start_twice():
+    sampler = BackgroundSampler(FakeBarometer(read_sec=0.001)).start()
+    with pytest.raises(RuntimeError):
+        sampler.start()
+    sampler.stop()
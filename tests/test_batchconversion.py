@@ -0,0 +1,55 @@
+import random
+
+import numpy
+import pytest
+
+from barometerdrivers import MS5803_01BA
+from barometerdrivers.batchconversion import convert_ms5803_01ba
+from test_ms5803_01ba import read_prom_side_effect
+
+
+@pytest.fixture
+def ms5803_01ba(i2c_mock):
+    i2c_mock.read_block_data.side_effect = read_prom_side_effect
+    return MS5803_01BA()
+
+
+def test_coefficients(ms5803_01ba):
+    assert ms5803_01ba.coefficients == {
+        'sens_t1': 40127, 'off_t1': 36924, 'tcs': 23317,
+        'tco': 23282, 't_ref': 33464, 'tempsens': 28312
+    }
+
+
+def test_convert_datasheet_example(ms5803_01ba):
+    temperature, pressure = convert_ms5803_01ba(
+        [0x82c13e, 0x82c13e], [0x8aa21a, 0x8aa21a], ms5803_01ba.coefficients)
+    assert isinstance(temperature, numpy.ndarray)
+    assert temperature.tolist() == [20.07, 20.07]
+    assert pressure.tolist() == [1000.09, 1000.09]
+
+
+def test_convert_matches_scalar_bit_for_bit(ms5803_01ba):
+    rng = random.Random(1378)
+    # spans < -15 C, < 20 C, 20 - 45 C and > 45 C compensation branches
+    raw_temperatures = [rng.randint(0x600000, 0x980000)
+                        for _ in range(5000)]
+    raw_pressures = [rng.randint(0x600000, 0xa00000) for _ in range(5000)]
+
+    expected = []
+    for raw_t, raw_p in zip(raw_temperatures, raw_pressures):
+        temperature = ms5803_01ba._convert_raw_temperature(raw_t)
+        expected.append((temperature,
+                         ms5803_01ba._convert_raw_pressure(raw_p)))
+    temperature, pressure = convert_ms5803_01ba(
+        raw_temperatures, raw_pressures, ms5803_01ba.coefficients)
+
+    assert temperature.min() < -15 and temperature.max() > 45
+    assert list(zip(temperature.tolist(), pressure.tolist())) == expected
+
+
+def test_convert_shape_mismatch(ms5803_01ba):
+    with pytest.raises(ValueError) as e:
+        convert_ms5803_01ba([1, 2], [1], ms5803_01ba.coefficients)
+    assert e.value.args[0] == \
+        'Temperature and pressure arrays differ in shape.'
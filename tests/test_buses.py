@@ -0,0 +1,55 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from barometerdrivers import HP206C
+from barometerdrivers.buses import BUS_ENVIRONMENT_VARIABLE, load_bus
+from barometerdrivers.i2cdev import I2CDevReadWrite
+from barometerdrivers.i2creadwrite import I2CReadWrite
+from barometerdrivers.simulation import (NoiseSource, SimulatedBus,
+                                         SimulatedHP206C)
+
+BUS = SimulatedBus()
+BUS.attach(SimulatedHP206C(NoiseSource(22.83, 1003.7, 0, 0), time_scale=0),
+           0x76)
+
+
+def test_load_bus_names():
+    assert load_bus('smbus') is I2CReadWrite
+    assert load_bus('i2cdev') is I2CDevReadWrite
+    assert load_bus('test_buses:BUS') is BUS
+
+
+@pytest.mark.parametrize('name', ['spi', 'test_buses:', 'test_buses:SPI'])
+def test_load_bus_unknown(name):
+    with pytest.raises(ValueError):
+        load_bus(name)
+
+
+def test_bus_by_name():
+    barometer = HP206C(bus='test_buses:BUS')
+    assert barometer.read_temperature_and_pressure() == (22.83, 1003.7)
+
+
+def test_bus_from_environment(monkeypatch):
+    monkeypatch.setenv(BUS_ENVIRONMENT_VARIABLE, 'test_buses:BUS')
+    barometer = HP206C()
+    assert barometer.read_temperature_and_pressure() == (22.83, 1003.7)
+
+
+def test_lazy_imports():
+    code = ('import sys\n'
+            'from barometerdrivers.smooth import smoothalgorithms\n'
+            'assert "numpy" not in sys.modules\n'
+            'smoothalgorithms.RollingMean(1.0, 4, 2).update(2.0)\n'
+            'assert "numpy" not in sys.modules\n')
+    # Before Python 3.7, the package imports its drivers eagerly.
+    if sys.version_info >= (3, 7):
+        code += 'assert "barometerdrivers.hp206c" not in sys.modules\n'
+    code += ('from barometerdrivers import HP206C, MS5803_01BA\n'
+             'from barometerdrivers.smooth import SmoothedMS5803_01BA\n'
+             'assert "smbus" not in sys.modules\n')
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    subprocess.check_call([sys.executable, '-c', code], env=env)
@@ -0,0 +1,114 @@
+import argparse
+import os
+
+import numpy
+import pytest
+
+from barometerdrivers.cli import SAMPLE_RECORD, main, parse_sensor
+from barometerdrivers.samplestore import SampleStore, convert_tsv
+
+SAMPLE_DATA = os.path.join(os.path.dirname(__file__), os.pardir,
+                           'sample_data', 'osr_4096_5_second_samples.tsv')
+SIMULATED = ['--bus', 'simulated', '--duration', '0.3', '--osr', '256']
+
+
+def test_parse_sensor():
+    assert parse_sensor('HP206C') == ('HP206C', 0x76)
+    assert parse_sensor('MS5803_01BA') == ('MS5803_01BA', 0x77)
+    assert parse_sensor('MS5803_01BA@0x76') == ('MS5803_01BA', 0x76)
+    for text in ('BMP180', 'HP206C@seventy'):
+        with pytest.raises(argparse.ArgumentTypeError):
+            parse_sensor(text)
+
+
+def test_tsv(tmpdir, capsys):
+    path = str(tmpdir.join('samples.tsv'))
+    argv = SIMULATED + ['-s', 'HP206C', '-s', 'MS5803_01BA', '-o', path,
+                        '--stats', '0.1']
+    assert main(argv) == 0
+
+    store_path = str(tmpdir.join('samples.bcol'))
+    convert_tsv([path], store_path)
+    store = SampleStore(store_path)
+    assert store.keys() == [(256, 'HP206C'), (256, 'MS5803_01BA')]
+    for key in store.keys():
+        seconds = store.table(*key).sec
+        assert len(seconds) > 10
+        assert (numpy.diff(seconds) >= 0).all()
+    reports = capsys.readouterr().err.splitlines()
+    assert len(reports) >= 3
+    assert 'total' in reports[-1] and 'dropped 0' in reports[-1]
+
+
+def test_binary_smoothed(tmpdir):
+    path = str(tmpdir.join('samples.bin'))
+    argv = SIMULATED + ['--trace', SAMPLE_DATA, '-s', 'HP206C', '-o', path,
+                        '-f', 'binary', '--smooth', 'kalman', '--stats', '0']
+    assert main(argv) == 0
+
+    with open(path, 'rb') as binary_file:
+        data = binary_file.read()
+    assert data and len(data) % SAMPLE_RECORD.size == 0
+    records = [SAMPLE_RECORD.unpack_from(data, offset)
+               for offset in range(0, len(data), SAMPLE_RECORD.size)]
+    # Smoothed readings of the trace, which starts at 22.83 C, 1003.7 mbar.
+    assert records[0][1:] == (0, 22.83, 1003.7)
+    assert all(abs(pressure - 1003.7) < 0.5 for _, _, _, pressure in records)
+
+
+def test_two_of_a_model(tmpdir):
+    path = str(tmpdir.join('samples.tsv'))
+    argv = SIMULATED + ['-s', 'MS5803_01BA@0x76', '-s', 'MS5803_01BA',
+                        '-o', path, '--smooth', 'mean', '--stats', '0']
+    assert main(argv) == 0
+    with open(path, 'r') as tsv_file:
+        sensors = set(line.split('\t')[0] for line in tsv_file)
+    assert sensors == {'sensor', 'MS5803_01BA@0x76', 'MS5803_01BA@0x77'}
+
+
+def test_bad_address(capsys):
+    argv = SIMULATED + ['-s', 'HP206C@0x77', '--stats', '0']
+    assert main(argv) == 1
+    assert 'HP206C' in capsys.readouterr().err
+
+
+def test_temperature_reuse(tmpdir, capsys):
+    path = str(tmpdir.join('samples.tsv'))
+    argv = SIMULATED + ['-s', 'MS5803_01BA', '-o', path]
+
+    def rate(extra_argv):
+        assert main(argv + extra_argv) == 0
+        summary = capsys.readouterr().err.splitlines()[-1]
+        return float(summary.split('MS5803_01BA ')[1].split('/s')[0])
+    assert rate(['--temperature-samples', '8']) > 1.5 * rate([])
+
+
+def test_hampel_before_median(tmpdir):
+    path = str(tmpdir.join('samples.tsv'))
+    argv = SIMULATED + ['--trace', SAMPLE_DATA, '-s', 'HP206C', '-o', path,
+                        '--hampel', '3', '--smooth', 'median', '--window',
+                        '5', '--stats', '0']
+    assert main(argv) == 0
+    with open(path, 'r') as tsv_file:
+        rows = [line.split('\t') for line in tsv_file][1:]
+    assert len(rows) > 10
+    assert all(abs(float(row[4]) - 1003.7) < 0.5 for row in rows)
+
+
+def test_low_pass(tmpdir):
+    path = str(tmpdir.join('samples.tsv'))
+    argv = SIMULATED + ['--trace', SAMPLE_DATA, '-s', 'HP206C', '-o', path,
+                        '--smooth', 'lowpass', '--cutoff', '5', '--stats',
+                        '0']
+    assert main(argv) == 0
+    with open(path, 'r') as tsv_file:
+        rows = [line.split('\t') for line in tsv_file][1:]
+    assert rows[0][3:] == ['22.83', '1003.7\n']
+    assert all(abs(float(row[4]) - 1003.7) < 0.5 for row in rows)
+
+
+def test_cutoff_above_nyquist(capsys):
+    argv = SIMULATED + ['-s', 'HP206C', '--smooth', 'lowpass', '--cutoff',
+                        '1000', '--stats', '0', '-o', os.devnull]
+    assert main(argv) == 1
+    assert 'cutoff' in capsys.readouterr().err
@@ -1,11 +1,13 @@
+import time
+
 import pytest
 
 from barometerdrivers import HP206C
 
 try:
-    from unittest.mock import call
+    from unittest.mock import call, patch
 except ImportError:
-    from mock import call
+    from mock import call, patch
 
 READY = 0x40
 NOT_READY = 0
@@ -29,6 +31,11 @@ def hp206c(i2c_mock):
     return barometer
 
 
+def test_sample_rate_hz():
+    assert HP206C.sample_rate_hz(4096) == pytest.approx(7.62, abs=0.01)
+    assert HP206C.sample_rate_hz(128) == pytest.approx(238.1, abs=0.1)
+
+
 def test_set_oversampling_rate_error(hp206c):
     with pytest.raises(ValueError) as e:
         hp206c.oversampling_rate = 555
@@ -37,6 +44,21 @@ def test_set_oversampling_rate_error(hp206c):
     assert msg.endswith('Choose 128, 256, 512, 1024, 2048, 4096.')
 
 
+def test_plan_compiled_on_set_oversampling_rate(i2c_mock, hp206c):
+    assert hp206c.plan.pressure.command == 0x40
+    assert hp206c.plan.temperature.datasheet_sec == pytest.approx(0.0656)
+    hp206c.oversampling_rate = 256
+    assert hp206c.plan.temperature.command == 0x52
+    assert hp206c.plan.pressure.command == 0x50
+    assert hp206c.plan.pressure.datasheet_sec == pytest.approx(0.0082)
+    assert hp206c.plan.ready_command == 0x8d
+
+    i2c_mock.read_byte_data.side_effect = [READY]
+    i2c_mock.read_block_data.side_effect = [[0x00, 0x0a, 0x28]]
+    assert hp206c.read_temperature() == 26.0
+    i2c_mock.write_byte.assert_called_once_with(0x52)
+
+
 def test_read_temperature_26C(i2c_mock, hp206c):
     i2c_mock.read_byte_data.side_effect = [READY]
     i2c_mock.read_block_data.side_effect = [[0x00, 0x0a, 0x5c]]
@@ -77,3 +99,112 @@ def test_read_temperature_and_pressure_26C_1010mbar(i2c_mock, hp206c):
     i2c_mock.write_byte.assert_called_once_with(0x40)
     i2c_mock.read_byte_data.assert_called_once_with(0x80 | 0x0d)
     i2c_mock.read_block_data.assert_called_once_with(0x10, 6)
+
+
+def test_start_and_step_measurement(i2c_mock, hp206c):
+    i2c_mock.read_byte_data.side_effect = [NOT_READY, READY]
+    i2c_mock.read_block_data.side_effect = [
+        [0x00, 0x0a, 0x5c, 0x01, 0x8a, 0x9e]
+    ]
+
+    ready_at = hp206c.start_measurement()
+    assert ready_at > time.time()
+    i2c_mock.write_byte.assert_called_once_with(0x40)
+    step = hp206c.step_measurement()
+    assert step.result is None
+    assert not i2c_mock.read_block_data.called
+    step = hp206c.step_measurement()
+    assert step == (None, (26.52, 1010.22))
+    i2c_mock.read_block_data.assert_called_once_with(0x10, 6)
+
+
+class FakeClock(object):
+    now = 100.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, sec):
+        self.now += sec
+
+
+def test_conversion_time_is_learned(i2c_mock, hp206c):
+    hp206c.oversampling_rate = 128  # 4.1 ms for temperature and pressure
+    conversion_sec = 0.002
+    clock = FakeClock()
+    hp206c._sleep = clock.sleep
+    started = []
+
+    def int_src_side_effect(_):
+        if clock() - started[-1] >= conversion_sec:
+            return READY
+        return NOT_READY
+
+    i2c_mock.write_byte.side_effect = lambda _: started.append(clock())
+    i2c_mock.read_byte_data.side_effect = int_src_side_effect
+    i2c_mock.read_block_data.side_effect = \
+        lambda *_: [0x00, 0x0a, 0x5c, 0x01, 0x8a, 0x9e]
+
+    with patch('barometerdrivers.hp206c.time.time', clock):
+        for _ in range(40):
+            assert hp206c.read_temperature_and_pressure() == (26.52, 1010.22)
+
+    # Learned to within a poll of the real conversion time.
+    expected = hp206c.latency_model.expected((128, False), None)
+    assert conversion_sec <= expected < conversion_sec + hp206c.ready_poll_sec
+    assert hp206c.conversions == 40
+    assert 1 <= hp206c.polls_per_sample < 2
+    assert hp206c.wasted_wait_sec >= 0
+
+
+def test_set_pressure_thresholds(i2c_mock, hp206c):
+    i2c_mock.read_byte_data.side_effect = [0x01]
+    hp206c.set_pressure_thresholds(low=990.0, high=1010.5)
+
+    assert i2c_mock.write_byte_data.call_args_list == [
+        call(0xc0 | 0x06, 0x5c), call(0xc0 | 0x07, 0xc1),  # 49500
+        call(0xc0 | 0x02, 0x5d), call(0xc0 | 0x03, 0xc5),  # 50525
+        call(0xc0 | 0x0c, 0x41)]
+    i2c_mock.read_byte_data.assert_called_once_with(0x80 | 0x0c)
+
+
+def test_set_temperature_thresholds(i2c_mock, hp206c):
+    hp206c.set_temperature_thresholds(low=-5, mid=20.4)
+
+    assert i2c_mock.write_byte_data.call_args_list == [
+        call(0xc0 | 0x0a, 0xfb), call(0xc0 | 0x09, 0x14)]
+
+
+@pytest.mark.parametrize('method,value', [
+    ('set_pressure_thresholds', -1),
+    ('set_pressure_thresholds', 1311),
+    ('set_temperature_thresholds', 128),
+    ('set_temperature_thresholds', -129)
+])
+def test_threshold_out_of_range(i2c_mock, hp206c, method, value):
+    with pytest.raises(ValueError):
+        getattr(hp206c, method)(mid=value)
+    i2c_mock.write_byte_data.assert_not_called()
+
+
+def test_enable_interrupts(i2c_mock, hp206c):
+    interrupts = hp206c.interrupts
+    hp206c.enable_interrupts(
+        interrupts.pressure_window | interrupts.temperature_traverse)
+    i2c_mock.write_byte_data.assert_called_once_with(0xc0 | 0x0b, 0x06)
+
+
+def test_monitor_reads_data_only_on_events(i2c_mock, hp206c):
+    hp206c.oversampling_rate = 128
+    quiet, window_high = READY | 0x30, READY | 0x30 | 0x02
+    i2c_mock.read_byte_data.side_effect = [quiet, quiet, window_high, 0x02]
+    i2c_mock.read_block_data.side_effect = [
+        [0x00, 0x0a, 0x5c, 0x01, 0x8a, 0x9e]
+    ]
+
+    event = next(hp206c.monitor())
+    assert event.events == event.directions == 0x02
+    assert (event.temperature, event.pressure) == (26.52, 1010.22)
+    assert i2c_mock.write_byte.call_count == 3
+    assert i2c_mock.read_byte_data.call_args_list[-1] == call(0x80 | 0x0e)
+    i2c_mock.read_block_data.assert_called_once_with(0x10, 6)
@@ -0,0 +1,107 @@
+import pytest
+
+from barometerdrivers import MS5803_01BA
+from barometerdrivers.i2cdev import I2C_M_RD, I2C_RDWR, I2CDevReadWrite
+
+
+class FakeI2CDev(object):
+    """Decodes I2C_RDWR ioctl arguments, and answers reads from a table of
+    responses to the preceding command byte.
+    """
+
+    def __init__(self, responses=None):
+        self.responses = responses or {}
+        self.transfers = []
+        self.last_command = None
+
+    def ioctl(self, fd, request, data):
+        assert fd == 42
+        assert request == I2C_RDWR
+        messages = []
+        for i in range(data.nmsgs):
+            msg = data.msgs[i]
+            if msg.flags & I2C_M_RD:
+                response = self.responses[self.last_command]
+                assert len(response) == msg.len
+                for j, value in enumerate(response):
+                    msg.buf[j] = value
+                messages.append(('read', msg.addr, msg.len))
+            else:
+                written = [msg.buf[j] for j in range(msg.len)]
+                self.last_command = written[0]
+                messages.append(('write', msg.addr, written))
+        self.transfers.append(messages)
+
+    def bus(self, address, port):
+        return I2CDevReadWrite(address, port, fd=42, ioctl=self.ioctl)
+
+
+def test_read_byte_data_single_transfer():
+    device = FakeI2CDev({0x8d: [0x40]})
+    i2c = device.bus(0x76, 1)
+
+    assert i2c.read_byte_data(0x8d) == 0x40
+    assert device.transfers == [[('write', 0x76, [0x8d]),
+                                 ('read', 0x76, 1)]]
+
+
+def test_read_block_data_reuses_buffer():
+    device = FakeI2CDev({0x00: [1, 2, 3], 0x01: [4, 5, 6]})
+    i2c = device.bus(0x77, 1)
+
+    first = i2c.read_block_data(0x00, 3)
+    assert list(first) == [1, 2, 3]
+    second = i2c.read_block_data(0x01, 3)
+    assert second is first
+    assert list(second) == [4, 5, 6]
+    assert device.transfers[1] == [('write', 0x77, [0x01]),
+                                   ('read', 0x77, 3)]
+
+
+def test_write_byte():
+    device = FakeI2CDev()
+    i2c = device.bus(0x76, 1)
+
+    i2c.write_byte(0x06)
+    assert device.transfers == [[('write', 0x76, [0x06])]]
+
+
+def test_write_byte_data():
+    device = FakeI2CDev()
+    i2c = device.bus(0x76, 1)
+
+    i2c.write_byte_data(0xcb, 0x0a)
+    assert device.transfers == [[('write', 0x76, [0xcb, 0x0a])]]
+    with pytest.raises(ValueError):
+        i2c.write_byte_data(0xcb, 0x100)
+
+
+@pytest.mark.parametrize('command', [-1, 256, 'a'])
+def test_invalid_command(command):
+    i2c = FakeI2CDev().bus(0x76, 1)
+
+    with pytest.raises((ValueError, TypeError)):
+        i2c.write_byte(command)
+
+
+def test_ms5803_01ba_bus():
+    device = FakeI2CDev({
+        0xa2: [0x9c, 0xbf],
+        0xa4: [0x90, 0x3c],
+        0xa6: [0x5b, 0x15],
+        0xa8: [0x5a, 0xf2],
+        0xaa: [0x82, 0xb8],
+        0xac: [0x6e, 0x98]
+    })
+    barometer = MS5803_01BA(bus=device.bus)
+    assert barometer.tempsens == 28312
+
+    adc = iter([[0x82, 0xc1, 0x3e], [0x8a, 0xa2, 0x1a]])
+
+    def next_adc(fd, request, data):
+        if data.nmsgs == 2:
+            device.responses[MS5803_01BA.read_adc] = next(adc)
+        device.ioctl(fd, request, data)
+
+    barometer.i2c._ioctl = next_adc
+    assert barometer.read_temperature_and_pressure() == (20.07, 1000.09)
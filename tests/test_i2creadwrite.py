@@ -40,6 +40,19 @@ def test_read_block_data(read_mock, i2c_driver):
     assert byte_array == [1, 2, 3]
 
 
+@patch.object(smbus.SMBus, 'write_byte_data')
+def test_write_byte_data(write_mock, i2c_driver):
+    i2c_driver.write_byte_data(0xcb, 0x0a)
+    write_mock.assert_called_once_with(ADDRESS, 0xcb, 0x0a)
+
+
+def test_write_byte_data_bad_value(i2c_driver):
+    with pytest.raises(ValueError) as e:
+        i2c_driver.write_byte_data(0xcb, -1)
+    msg = e.value.args[0]
+    assert msg == "'-1' is not an unsigned byte."
+
+
 def test_write_byte_bad_command(i2c_driver):
     with pytest.raises(ValueError) as e:
         i2c_driver.write_byte(-1)
@@ -0,0 +1,99 @@
+import json
+
+import pytest
+
+from barometerdrivers import HP206C, MS5803_01BA
+from barometerdrivers.instrumentation import Instrumentation, LatencyHistogram
+from barometerdrivers.simulation import (NoiseSource, SimulatedBus,
+                                         SimulatedHP206C,
+                                         SimulatedMS5803_01BA)
+
+
+@pytest.fixture
+def bus():
+    bus = SimulatedBus()
+    bus.attach(SimulatedMS5803_01BA(NoiseSource(seed=0), time_scale=0.1),
+               0x77)
+    bus.attach(SimulatedHP206C(NoiseSource(seed=0), time_scale=0.1), 0x76)
+    return bus
+
+
+def test_histogram():
+    histogram = LatencyHistogram()
+    for seconds in (0.0, -1.0, 0.0000015, 0.003, 0.0035, 100.0):
+        histogram.record(seconds)
+    snapshot = histogram.snapshot()
+
+    assert snapshot['count'] == 6
+    assert snapshot['min_sec'] == 0.0
+    assert snapshot['max_sec'] == 100.0
+    assert snapshot['mean_sec'] == pytest.approx(100.0065 / 6)
+    assert snapshot['buckets'] == [(1e-6, 2), (2e-6, 1),
+                                   (pytest.approx(0.004096), 2), (None, 1)]
+
+
+def test_empty_histogram():
+    snapshot = LatencyHistogram().snapshot()
+    assert snapshot['count'] == 0
+    assert snapshot['mean_sec'] is None
+    assert snapshot['buckets'] == []
+
+
+def test_ms5803_01ba(bus):
+    barometer = MS5803_01BA(oversampling_rate=4096, bus=bus)
+    instrumentation = Instrumentation().attach(barometer)
+    for _ in range(3):
+        barometer.read_temperature_and_pressure()
+    snapshot = instrumentation.snapshot()
+
+    assert sorted(snapshot['bus']) == ['read_block_data', 'write_byte']
+    read = snapshot['bus']['read_block_data']
+    assert (read['calls'], read['bytes_written'], read['bytes_read']) == (
+        6, 6, 18)
+    assert snapshot['bus']['write_byte']['calls'] == 6
+    assert snapshot['sleep']['count'] == snapshot['oversleep']['count'] == 6
+    assert snapshot['conversion']['count'] == 6
+    assert snapshot['conversion']['min_sec'] >= 0.000904
+    assert snapshot['convert']['count'] == 6
+    assert snapshot['ready_poll']['count'] == 0
+    json.dumps(snapshot)
+
+
+def test_hp206c_ready_polls(bus):
+    barometer = HP206C(oversampling_rate=1024, bus=bus)
+    instrumentation = Instrumentation().attach(barometer)
+    barometer.read_temperature_and_pressure()
+    snapshot = instrumentation.snapshot()
+
+    polls = snapshot['ready_poll']['count']
+    assert polls >= 1
+    assert snapshot['bus']['read_byte_data']['calls'] == polls
+    assert snapshot['conversion']['count'] == 1
+
+
+def test_snapshot_reset(bus):
+    barometer = HP206C(oversampling_rate=128, bus=bus)
+    instrumentation = Instrumentation().attach(barometer)
+    barometer.read_temperature()
+    assert instrumentation.snapshot(reset=True)['conversion']['count'] == 1
+
+    snapshot = instrumentation.snapshot()
+    assert snapshot['bus'] == {}
+    assert all(snapshot[name]['count'] == 0
+               for name in Instrumentation.histogram_names)
+
+
+def test_detach(bus):
+    barometer = MS5803_01BA(bus=bus)
+    i2c = barometer.i2c
+    instrumentation = Instrumentation().attach(barometer)
+    with pytest.raises(ValueError):
+        Instrumentation().attach(barometer)
+    instrumentation.detach()
+
+    assert barometer.i2c is i2c
+    assert barometer.instrumentation is None
+    assert 'instrumentation' not in vars(barometer)
+    assert '_convert_raw_pressure' not in vars(barometer)
+    barometer.read_temperature_and_pressure()
+    assert instrumentation.snapshot()['bus'] == {}
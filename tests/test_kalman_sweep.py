@@ -0,0 +1,81 @@
+import json
+import os
+import sys
+
+import numpy
+import pytest
+
+from barometerdrivers.smooth.kalmantable import load_kalman_parameters
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir,
+                                'sample_data'))
+import kalman_sweep  # noqa: E402
+
+# Gain of almost 1, so the filter output is the previous measurement.
+PASS_THROUGH = (1.0, 1e6, 1e-9)
+HEAVY = (1.0, 1e-3, 64.0)
+KEY = ('HP206C', 256, 'pressure')
+
+
+def test_parse_range():
+    assert kalman_sweep.parse_range('0.5') == [0.5]
+    assert kalman_sweep.parse_range('1:100:3') == pytest.approx([1, 10, 100])
+
+
+def test_candidates_grid():
+    assert kalman_sweep.candidates([1, 2], [3], [4, 5]) == [
+        (1, 3, 4), (1, 3, 5), (2, 3, 4), (2, 3, 5)]
+
+
+def test_candidates_random():
+    ranges = [0.25, 64], [0.001, 4], [0.01, 64]
+    jobs = kalman_sweep.candidates(*ranges, random_count=50, seed=3)
+
+    assert len(jobs) == 50
+    assert jobs == kalman_sweep.candidates(*ranges, random_count=50, seed=3)
+    for candidate in jobs:
+        for value, values in zip(candidate, ranges):
+            assert min(values) <= value <= max(values)
+
+
+def test_score_trace_alignment():
+    # A centered moving average of a ramp is the ramp, so a filter that
+    # passes readings through only scores zero if it's compared with the
+    # reference sample it's centered on.
+    ramp = numpy.arange(50.0)
+    rms_error, lag_sec, score = kalman_sweep.score_trace(
+        PASS_THROUGH, 0.01, ramp, 5, 0.1)
+
+    assert rms_error == pytest.approx(0, abs=1e-6)
+    assert lag_sec == pytest.approx(0, abs=1e-6)
+    assert score == pytest.approx(rms_error + 0.1 * lag_sec)
+
+    rms_error, lag_sec, _ = kalman_sweep.score_trace(HEAVY, 0.01, ramp, 5, 0)
+    assert rms_error > 1
+    assert lag_sec > 0.1
+
+
+def test_parameter_table_round_trip(tmpdir):
+    best = {KEY: (HEAVY, (0.5, 0.2, 0.52))}
+    table = kalman_sweep.parameter_table(best, 15, 0.1)
+    path = tmpdir.join('kalman.json')
+    path.write(json.dumps(table))
+
+    assert load_kalman_parameters(str(path), *KEY) == HEAVY
+    entry = table['parameters']['HP206C']['256']['pressure']
+    assert (entry['rms_error'], entry['lag_sec'], entry['score']) == \
+        (0.5, 0.2, 0.52)
+
+
+def test_sweep():
+    rng = numpy.random.RandomState(0)
+    ramp = numpy.linspace(1000, 1010, 200) + rng.normal(0, 0.01, 200)
+    traces = {KEY: [(0.01, ramp)]}
+
+    best = kalman_sweep.sweep(traces, [HEAVY, PASS_THROUGH], 15, 1.0,
+                              processes=1)
+    assert list(best) == [KEY]
+    candidate, score = best[KEY]
+    assert candidate == PASS_THROUGH
+    assert score == pytest.approx(kalman_sweep.score_trace(
+        PASS_THROUGH, 0.01, ramp, 15, 1.0))
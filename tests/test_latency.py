@@ -0,0 +1,43 @@
+import pytest
+
+from barometerdrivers.helpers.latency import ConversionLatencyModel
+
+
+def test_expected_default():
+    model = ConversionLatencyModel()
+    assert model.expected('key', 0.004) == 0.004
+    assert model.minimum('key', None) is None
+
+
+def test_first_poll_ready_decays_estimate():
+    model = ConversionLatencyModel(decay=0.1)
+    model.observe('key', 0.0035, True, 0.004)
+    assert model.expected('key', 0.004) == pytest.approx(0.0036)
+    model.observe('key', 0.003, True, 0.004)
+    assert model.expected('key', 0.004) == pytest.approx(0.00324)
+    assert model.expected('other', 0.004) == 0.004
+
+
+def test_measured_conversion_raises_estimate():
+    model = ConversionLatencyModel(decay=0.1)
+    for _ in range(10):
+        model.observe('key', 0.001, True, 0.004)
+    assert model.expected('key', 0.004) < 0.002
+    model.observe('key', 0.0021, False, 0.004)
+    assert model.expected('key', 0.004) == 0.0021
+    # a conversion measured faster than the estimate doesn't lower it
+    model.observe('key', 0.002, False, 0.004)
+    assert model.expected('key', 0.004) == 0.0021
+
+
+def test_minimum():
+    model = ConversionLatencyModel()
+    for seconds in (0.003, 0.002, 0.0025):
+        model.observe('key', seconds, False, 0.004)
+    assert model.minimum('key', None) == 0.002
+
+
+@pytest.mark.parametrize('decay', [0, 1, -0.1])
+def test_invalid_decay(decay):
+    with pytest.raises(AssertionError):
+        ConversionLatencyModel(decay)
@@ -1,11 +1,13 @@
+import time
+
 import pytest
 
 from barometerdrivers import MS5803_01BA
 
 try:
-    from unittest.mock import call
+    from unittest.mock import call, patch
 except ImportError:
-    from mock import call
+    from mock import call, patch
 
 
 def read_prom_side_effect(cmd, _):
@@ -48,6 +50,13 @@ def ms5803_01ba(i2c_mock):
     return barometer
 
 
+def test_sample_rate_hz():
+    assert MS5803_01BA.sample_rate_hz(4096) == pytest.approx(55.31, abs=0.01)
+    assert MS5803_01BA.sample_rate_hz(256) == pytest.approx(833.33, abs=0.01)
+    with pytest.raises(ValueError):
+        MS5803_01BA.sample_rate_hz(128)
+
+
 def test_set_oversampling_rate_error(ms5803_01ba):
     with pytest.raises(ValueError) as e:
         ms5803_01ba.oversampling_rate = 555
@@ -86,6 +95,17 @@ def test_read_temperature(i2c_mock, ms5803_01ba, temp_bytes, expected_temp):
     i2c_mock.read_block_data.assert_called_once_with(MS5803_01BA.read_adc, 3)
 
 
+def test_plan_compiled_on_set_oversampling_rate(i2c_mock, ms5803_01ba):
+    assert ms5803_01ba.plan == (0x54, 0x44, 0.00228)
+    ms5803_01ba.oversampling_rate = 4096
+    assert ms5803_01ba.plan == (0x58, 0x48, 0.00904)
+
+    i2c_mock.read_block_data.side_effect = [[0x82, 0xc1, 0x3e],
+                                            [0x8a, 0xa2, 0x1a]]
+    assert ms5803_01ba.read_temperature_and_pressure() == (20.07, 1000.09)
+    assert i2c_mock.write_byte.mock_calls == [call(0x58), call(0x48)]
+
+
 def test_read_temp_pressure_20C_1000mbar(i2c_mock, ms5803_01ba):
     i2c_mock.read_block_data.side_effect = [[0x82, 0xc1, 0x3e],
                                             [0x8a, 0xa2, 0x1a]]
@@ -114,3 +134,154 @@ def test_read_pressure_1000mbar(i2c_mock, ms5803_01ba):
     assert i2c_mock.read_block_data.mock_calls == [
         call(MS5803_01BA.read_adc, 3)
     ] * 2
+
+
+def test_start_and_collect_conversion(i2c_mock, ms5803_01ba):
+    i2c_mock.read_block_data.side_effect = [[0x8a, 0xa2, 0x1a]]
+
+    start = time.time()
+    pending = ms5803_01ba.start_conversion(is_pressure=True)
+    assert pending.is_pressure
+    assert start + 0.00228 <= pending.ready_at <= time.time() + 0.00228
+    i2c_mock.write_byte.assert_called_once_with(
+        MS5803_01BA.osr_conversion[1024].command(is_pressure=True)
+    )
+    assert not i2c_mock.read_block_data.called
+
+    assert ms5803_01ba.collect_conversion(pending) == 0x8aa21a
+    assert time.time() >= pending.ready_at
+    i2c_mock.read_block_data.assert_called_once_with(MS5803_01BA.read_adc, 3)
+
+
+def test_conversion_timed_from_write(i2c_mock, ms5803_01ba):
+    now = [100.0]
+
+    def write_byte(command):
+        now[0] += 0.001  # slow bus
+
+    i2c_mock.write_byte.side_effect = write_byte
+    with patch('barometerdrivers.absms5803.time.time', lambda: now[0]):
+        pending = ms5803_01ba.start_conversion(is_pressure=True)
+    assert pending.ready_at == 100.0 + 0.001 + 0.00228
+
+
+def test_collect_conversion_not_in_progress(i2c_mock, ms5803_01ba):
+    i2c_mock.read_block_data.side_effect = [[0x82, 0xc1, 0x3e]]
+    stale = ms5803_01ba.start_conversion(is_pressure=False)
+    ms5803_01ba.collect_conversion(stale)
+
+    with pytest.raises(ValueError) as e:
+        ms5803_01ba.collect_conversion(stale)
+    assert e.value.args[0] == 'Conversion is not in progress on device.'
+    assert len(i2c_mock.read_block_data.mock_calls) == 1
+
+
+def test_start_and_step_measurement(i2c_mock, ms5803_01ba):
+    i2c_mock.read_block_data.side_effect = [[0x82, 0xc1, 0x3e],
+                                            [0x8a, 0xa2, 0x1a]]
+
+    ready_at = ms5803_01ba.start_measurement()
+    assert ready_at > time.time()
+    step = ms5803_01ba.step_measurement()
+    assert step.result is None
+    assert step.ready_at > ready_at
+    step = ms5803_01ba.step_measurement()
+    assert step == (None, (20.07, 1000.09))
+    assert i2c_mock.write_byte.mock_calls == [
+        call(i)
+        for i in (MS5803_01BA.osr_conversion[1024].command(is_pressure=False),
+                  MS5803_01BA.osr_conversion[1024].command(is_pressure=True))
+    ]
+
+
+TEMPERATURE_ADC = [0x82, 0xc1, 0x3e]
+PRESSURE_ADC = [0x8a, 0xa2, 0x1a]
+
+
+def conversion_kinds(i2c_mock):
+    """
+    :return str: 'T' or 'P' for each ADC command sent, in order.
+    """
+    temperature_command = MS5803_01BA.osr_conversion[1024].command(
+        is_pressure=False)
+    return ''.join('T' if c == call(temperature_command) else 'P'
+                   for c in i2c_mock.write_byte.mock_calls)
+
+
+def adc_side_effect(i2c_mock):
+    """Return temperature or pressure ADC data for the last command."""
+    temperature_command = MS5803_01BA.osr_conversion[1024].command(
+        is_pressure=False)
+
+    def read_adc(command, length):
+        if i2c_mock.write_byte.call_args == call(temperature_command):
+            return TEMPERATURE_ADC
+        return PRESSURE_ADC
+    return read_adc
+
+
+def test_temperature_reuse_max_samples(i2c_mock, ms5803_01ba):
+    i2c_mock.read_block_data.side_effect = adc_side_effect(i2c_mock)
+    ms5803_01ba.set_temperature_reuse(max_samples=3)
+
+    samples = [ms5803_01ba.read_sample() for _ in range(7)]
+    assert conversion_kinds(i2c_mock) == 'TPPPTPPPTP'
+    assert [s.temperature_reused for s in samples] == [
+        False, True, True, False, True, True, False]
+    assert all((s.temperature, s.pressure) == (20.07, 1000.09)
+               for s in samples)
+    ages = [s.temperature_age_sec for s in samples[:3]]
+    assert 0 <= ages[0] < ages[1] < ages[2]
+
+
+def test_temperature_reuse_max_sec(i2c_mock, ms5803_01ba):
+    i2c_mock.read_block_data.side_effect = adc_side_effect(i2c_mock)
+    ms5803_01ba.set_temperature_reuse(max_sec=0.05)
+
+    assert ms5803_01ba.read_temperature_and_pressure() == (20.07, 1000.09)
+    assert ms5803_01ba.read_pressure() == 1000.09
+    time.sleep(0.05)
+    assert ms5803_01ba.read_pressure() == 1000.09
+    assert conversion_kinds(i2c_mock) == 'TPPTP'
+
+
+def test_temperature_reuse_max_drift(i2c_mock, ms5803_01ba):
+    i2c_mock.read_block_data.side_effect = adc_side_effect(i2c_mock)
+    ms5803_01ba.set_temperature_reuse(max_drift=0.5)
+
+    ms5803_01ba.read_sample()
+    ms5803_01ba.read_sample()
+    assert conversion_kinds(i2c_mock) == 'TPP'
+    # 1 degree C per sec
+    ms5803_01ba._temperature_rate = 1.0
+    ms5803_01ba._temperature_time = time.time() - 0.6
+    assert not ms5803_01ba.read_sample().temperature_reused
+    assert ms5803_01ba._temperature_rate == 0.0
+
+
+def test_temperature_reuse_disabled(i2c_mock, ms5803_01ba):
+    i2c_mock.read_block_data.side_effect = adc_side_effect(i2c_mock)
+    ms5803_01ba.set_temperature_reuse(max_samples=10)
+    ms5803_01ba.set_temperature_reuse()
+
+    assert ms5803_01ba.temperature_reuse is None
+    assert ms5803_01ba.temperature_age_sec is None
+    for _ in range(2):
+        assert not ms5803_01ba.read_sample().temperature_reused
+    assert conversion_kinds(i2c_mock) == 'TPTP'
+    assert ms5803_01ba.temperature_age_sec >= 0
+
+
+def test_temperature_reuse_step_measurement(i2c_mock, ms5803_01ba):
+    i2c_mock.read_block_data.side_effect = adc_side_effect(i2c_mock)
+    ms5803_01ba.set_temperature_reuse(max_samples=2)
+
+    results = []
+    for _ in range(3):
+        ms5803_01ba.start_measurement()
+        step = ms5803_01ba.step_measurement()
+        while step.result is None:
+            step = ms5803_01ba.step_measurement()
+        results.append(step.result)
+    assert results == [(20.07, 1000.09)] * 3
+    assert conversion_kinds(i2c_mock) == 'TPPTP'
@@ -0,0 +1,120 @@
+import json
+
+import pytest
+
+from barometerdrivers import MS5803_01BA
+from barometerdrivers.promcache import PromCache, crc4, is_valid_prom
+from test_ms5803_01ba import read_prom_side_effect
+
+AN520_EXAMPLE = [0x3132, 0x3334, 0x3536, 0x3738,
+                 0x3940, 0x4142, 0x4344, 0x4546]
+FACTORY = 0x1c0d
+PROM_WORDS = [FACTORY, 40127, 36924, 23317, 23282, 33464, 28312, 0x0300]
+PROM_WORDS[7] |= crc4(PROM_WORDS)
+
+
+def read_full_prom_side_effect(cmd, length):
+    if cmd == 0xa0 or cmd == 0xae:
+        word = PROM_WORDS[(cmd - 0xa0) // 2]
+        return [word >> 8, word & 0xff]
+    return read_prom_side_effect(cmd, length)
+
+
+def test_crc4_application_note_example():
+    assert crc4(AN520_EXAMPLE) == 0xb
+    assert is_valid_prom(AN520_EXAMPLE[:7] + [0x450b])
+    assert not is_valid_prom(AN520_EXAMPLE)
+    assert not is_valid_prom(AN520_EXAMPLE[:7])
+
+
+@pytest.fixture
+def cache(tmpdir):
+    return PromCache(str(tmpdir.join('prom.json')))
+
+
+def test_cache_get_missing(cache):
+    assert cache.get(1, 0x77) is None
+
+
+def test_cache_put_get(cache):
+    cache.put(1, 0x77, PROM_WORDS)
+    cache.put(1, 0x76, AN520_EXAMPLE[:7] + [0x450b])
+    assert cache.get(1, 0x77) == PROM_WORDS
+    assert cache.get(1, 0x76)[0] == 0x3132
+    assert cache.get(0, 0x77) is None
+
+
+def test_cache_rejects_bad_crc(cache):
+    cache.put(1, 0x77, PROM_WORDS[:6] + [PROM_WORDS[6] + 1, PROM_WORDS[7]])
+    assert cache.get(1, 0x77) is None
+
+
+def test_cache_rejects_corrupt_file(cache):
+    with open(cache.path, 'w') as cache_file:
+        cache_file.write('{"1:0x77": [1, 2')
+    assert cache.get(1, 0x77) is None
+
+
+def test_cold_start_fills_cache(i2c_mock, cache):
+    i2c_mock.read_block_data.side_effect = read_full_prom_side_effect
+    barometer = MS5803_01BA(prom_cache=cache)
+
+    i2c_mock.write_byte.assert_called_once_with(MS5803_01BA.reset)
+    assert len(i2c_mock.read_block_data.mock_calls) == 8
+    assert barometer.sens_t1 == 40127
+    with open(cache.path) as cache_file:
+        assert json.load(cache_file) == {'1:0x77': PROM_WORDS}
+
+
+def test_warm_start_skips_reset_and_prom(i2c_mock, cache):
+    cache.put(1, 0x77, PROM_WORDS)
+    i2c_mock.read_block_data.side_effect = read_full_prom_side_effect
+    barometer = MS5803_01BA(prom_cache=cache)
+
+    assert not i2c_mock.write_byte.called
+    # Only word 7 is read, to check it's the same sensor.
+    i2c_mock.read_block_data.assert_called_once_with(0xae, 2)
+    assert barometer.coefficients == {
+        'sens_t1': 40127, 'off_t1': 36924, 'tcs': 23317,
+        'tco': 23282, 't_ref': 33464, 'tempsens': 28312
+    }
+
+
+def test_force_prom_read(i2c_mock, cache):
+    stale_words = list(PROM_WORDS)
+    stale_words[1] = 1
+    stale_words[7] = (stale_words[7] & 0xfff0) | crc4(stale_words)
+    cache.put(1, 0x77, stale_words)
+    i2c_mock.read_block_data.side_effect = read_full_prom_side_effect
+    barometer = MS5803_01BA(prom_cache=cache, force_prom_read=True)
+
+    i2c_mock.write_byte.assert_called_once_with(MS5803_01BA.reset)
+    assert barometer.sens_t1 == 40127
+    assert cache.get(1, 0x77) == PROM_WORDS
+
+
+def test_warm_start_different_sensor(i2c_mock, cache):
+    other_words = list(PROM_WORDS)
+    other_words[1] = 1
+    other_words[7] = (other_words[7] & 0xfff0) | crc4(other_words)
+    cache.put(1, 0x77, other_words)
+    i2c_mock.read_block_data.side_effect = read_full_prom_side_effect
+    barometer = MS5803_01BA(prom_cache=cache)
+
+    i2c_mock.write_byte.assert_called_once_with(MS5803_01BA.reset)
+    assert len(i2c_mock.read_block_data.mock_calls) == 1 + 8
+    assert barometer.sens_t1 == 40127
+    assert cache.get(1, 0x77) == PROM_WORDS
+
+
+def test_device_prom_bad_crc(i2c_mock, cache):
+    def bad_crc_side_effect(cmd, length):
+        if cmd == 0xa0 or cmd == 0xae:
+            return [0x00, 0x0f]
+        return read_prom_side_effect(cmd, length)
+
+    i2c_mock.read_block_data.side_effect = bad_crc_side_effect
+    with pytest.raises(ValueError) as e:
+        MS5803_01BA(prom_cache=cache)
+    assert e.value.args[0] == 'PROM CRC check failed.'
+    assert cache.get(1, 0x77) is None
@@ -0,0 +1,100 @@
+import os
+
+import pytest
+
+from barometerdrivers import HP206C, MS5803_01BA
+from barometerdrivers.rawcapture import (RECORD, RawCaptureReader,
+                                         RawCaptureWriter)
+from test_ms5803_01ba import read_prom_side_effect
+
+READY = 0x40
+
+
+@pytest.fixture
+def barometers(i2c_mock):
+    i2c_mock.read_block_data.side_effect = read_prom_side_effect
+    i2c_mock.read_byte_data.side_effect = lambda _: READY
+    ms5803_01ba = MS5803_01BA(oversampling_rate=4096)
+    hp206c = HP206C(oversampling_rate=128)
+    hp206c.port = 2
+    return ms5803_01ba, hp206c
+
+
+@pytest.fixture
+def capture_path(tmpdir):
+    return str(tmpdir.join('capture.braw'))
+
+
+def capture_twice(i2c_mock, barometers, path):
+    ms5803_frames = [[0x82, 0xc1, 0x3e], [0x8a, 0xa2, 0x1a]]
+    hp206c_frames = [[0xff, 0xfc, 0x02, 0x01, 0x8a, 0x9e]]
+    frames = ms5803_frames + hp206c_frames
+    i2c_mock.read_block_data.side_effect = frames * 2
+    with RawCaptureWriter(path, barometers) as writer:
+        writer.capture()
+        writer.capture()
+
+
+def test_capture_and_convert(i2c_mock, barometers, capture_path):
+    capture_twice(i2c_mock, barometers, capture_path)
+
+    reader = RawCaptureReader(capture_path)
+    assert [s.model for s in reader.sensors] == ['MS5803_01BA', 'HP206C']
+    assert reader.sensors[0].oversampling_rate == 4096
+    assert reader.sensors[0].address == 0x77
+    assert reader.sensors[0].coefficients == barometers[0].coefficients
+    assert reader.sensors[1].oversampling_rate == 128
+    assert reader.sensors[1].port == 2
+    assert reader.sensors[1].coefficients == {}
+
+    records = list(reader)
+    assert [(r.sensor_id, r.raw_temperature, r.raw_pressure)
+            for r in records] == [(0, 0x82c13e, 0x8aa21a),
+                                  (1, -1022, 101022)] * 2
+    timestamps = [r.timestamp for r in records]
+    assert timestamps == sorted(timestamps)
+
+    _, temperature, pressure = reader.convert(0)
+    assert temperature.tolist() == [20.07] * 2
+    assert pressure.tolist() == [1000.09] * 2
+    _, temperature, pressure = reader.convert(1)
+    assert temperature.tolist() == [-10.22] * 2
+    assert pressure.tolist() == [1010.22] * 2
+
+
+def test_capture_appends(i2c_mock, barometers, capture_path):
+    capture_twice(i2c_mock, barometers, capture_path)
+    size = os.path.getsize(capture_path)
+    capture_twice(i2c_mock, barometers, capture_path)
+
+    assert len(RawCaptureReader(capture_path).records) == 8
+    # header is only written once
+    assert os.path.getsize(capture_path) - size == 4 * RECORD.size
+
+
+def test_capture_header_mismatch(i2c_mock, barometers, capture_path):
+    capture_twice(i2c_mock, barometers, capture_path)
+    with pytest.raises(ValueError) as e:
+        RawCaptureWriter(capture_path, barometers[::-1])
+    assert e.value.args[0].endswith("doesn't match barometers.")
+
+
+def test_reader_ignores_partial_record(i2c_mock, barometers, capture_path):
+    capture_twice(i2c_mock, barometers, capture_path)
+    with open(capture_path, 'ab') as capture_file:
+        capture_file.write(b'\x00' * (RECORD.size - 1))
+    assert len(RawCaptureReader(capture_path).records) == 4
+
+
+def test_reader_not_capture_file(capture_path):
+    with open(capture_path, 'wb') as capture_file:
+        capture_file.write(b'sensor\toversampling\n')
+    with pytest.raises(ValueError) as e:
+        RawCaptureReader(capture_path)
+    assert e.value.args[0] == 'Not a raw capture file.'
+
+
+def test_capture_unsupported_barometer(capture_path):
+    with pytest.raises(ValueError) as e:
+        RawCaptureWriter(capture_path, [object()])
+    assert e.value.args[0] == "Can't capture raw data from 'object'."
@@ -0,0 +1,96 @@
+import csv
+import os
+import sys
+
+import numpy
+import pytest
+
+from barometerdrivers.samplestore import (SampleStore, SampleTable,
+                                          convert_tsv, write_sample_store)
+
+SAMPLE_DATA = os.path.join(os.path.dirname(__file__), os.pardir,
+                           'sample_data', 'osr_4096_5_second_samples.tsv')
+
+
+@pytest.fixture
+def store_path(tmpdir):
+    return str(tmpdir.join('samples.bcol'))
+
+
+def test_round_trip(store_path):
+    tables = {
+        (4096, 'MS5803_01BA'): SampleTable([0.0, 0.02], [20.5, 20.51],
+                                           [1000.1, 1000.2]),
+        (256, 'HP206C'): SampleTable([0.0], [22.61], [1003.65]),
+        (512, 'HP206C'): SampleTable([], [], [])
+    }
+    write_sample_store(store_path, tables)
+
+    with SampleStore(store_path) as store:
+        assert store.keys() == [(256, 'HP206C'), (512, 'HP206C'),
+                                (4096, 'MS5803_01BA')]
+        for key, expected in tables.items():
+            table = store.table(*key)
+            assert [column.tolist() for column in table] == list(expected)
+            del table
+
+
+def test_zero_copy(store_path):
+    write_sample_store(store_path, {(1024, 'HP206C'): ([1.0], [2.0], [3.0])})
+    store = SampleStore(store_path)
+    table = store.table(1024, 'HP206C')
+
+    assert store.table(1024, 'HP206C') is table
+    assert not table.pressure.flags.writeable
+    assert not table.pressure.flags.owndata
+    if sys.version_info < (3,):
+        store.close()
+        assert table.pressure.tolist() == [3.0]
+    else:
+        with pytest.raises(BufferError):
+            store.close()
+
+
+def test_convert_tsv(store_path):
+    convert_tsv([SAMPLE_DATA], store_path)
+    with open(SAMPLE_DATA, 'r') as tsv_file:
+        rows = list(csv.reader(tsv_file, delimiter='\t'))[1:]
+
+    store = SampleStore(store_path)
+    assert store.keys() == [(4096, 'HP206C'), (4096, 'MS5803_01BA')]
+    for sensor in ('HP206C', 'MS5803_01BA'):
+        expected = numpy.array([row[2:] for row in rows if row[0] == sensor],
+                               dtype=float)
+        assert numpy.array_equal(numpy.column_stack(
+            store.table(4096, sensor)), expected)
+
+
+def test_missing_table(store_path):
+    write_sample_store(store_path, {(1024, 'HP206C'): ([1.0], [2.0], [3.0])})
+    store = SampleStore(store_path)
+
+    assert (1024, 'HP206C') in store
+    with pytest.raises(ValueError):
+        store.table(4096, 'HP206C')
+
+
+def test_unequal_columns(store_path):
+    with pytest.raises(ValueError):
+        write_sample_store(store_path, {(256, 'HP206C'): ([0.0], [], [])})
+
+
+@pytest.mark.parametrize('data', [b'', b'BRAW' + b'\0' * 8,
+                                  b'BCOL\x02' + b'\0' * 7])
+def test_not_a_store(store_path, data):
+    with open(store_path, 'wb') as store_file:
+        store_file.write(data)
+    with pytest.raises(ValueError):
+        SampleStore(store_path)
+
+
+def test_truncated(store_path):
+    write_sample_store(store_path, {(256, 'HP206C'): ([0.0], [1.0], [2.0])})
+    with open(store_path, 'r+b') as store_file:
+        store_file.truncate(os.path.getsize(store_path) - 1)
+    with pytest.raises(ValueError):
+        SampleStore(store_path)
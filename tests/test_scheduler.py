@@ -0,0 +1,149 @@
+from barometerdrivers.absi2cbarometer import MeasurementStep
+from barometerdrivers.scheduler import I2CBusScheduler
+
+# Powers of 2, so fake times add up exactly.
+CONVERSION_SEC = 0.0078125
+BUS_SEC = 0.0009765625
+
+
+class FakeClock(object):
+    """Fake :func:`time.time`, advanced only by sleeping, which takes
+    :attr:`oversleep` sec longer than asked.
+    """
+
+    def __init__(self, oversleep=0.0):
+        self.now = 100.0
+        self.oversleep = oversleep
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, sec):
+        self.now += sec + self.oversleep
+
+
+class FakeBarometer(object):
+    """Two conversions per measurement, like MS5803."""
+
+    def __init__(self, name, clock, bus_sec=0.0):
+        self.name = name
+        self.clock = clock
+        self.bus_sec = bus_sec
+        self.busy_until = None
+        self.steps = 0
+        self.transfers = 0
+
+    def _transfer(self):
+        self.transfers += 1
+        self.clock.now += self.bus_sec
+
+    def start_measurement(self):
+        assert self.busy_until is None
+        self._transfer()
+        self.busy_until = self.clock() + CONVERSION_SEC
+        self.steps = 0
+        return self.busy_until
+
+    def step_measurement(self):
+        assert self.clock() >= self.busy_until
+        self._transfer()
+        self.steps += 1
+        if self.steps == 1:
+            self.busy_until = self.clock() + CONVERSION_SEC
+            return MeasurementStep(self.busy_until, None)
+        self.busy_until = None
+        return MeasurementStep(None, (20.0, 1000.0))
+
+
+def scheduler_for(clock, rates):
+    return I2CBusScheduler(rates, clock=clock, sleep=clock.sleep)
+
+
+def test_samples_in_completion_order():
+    clock = FakeClock()
+    barometers = [FakeBarometer(i, clock, BUS_SEC) for i in range(3)]
+    scheduler = scheduler_for(clock, {barometer: None
+                                      for barometer in barometers})
+    samples = scheduler.run(0.125)
+
+    assert samples
+    timestamps = [s.timestamp for s in samples]
+    assert timestamps == sorted(timestamps)
+    assert set(s.barometer for s in samples) == set(barometers)
+    assert all((s.temperature, s.pressure) == (20.0, 1000.0)
+               for s in samples)
+
+
+def test_throughput_scales_with_sensor_count():
+    clock = FakeClock()
+    single = scheduler_for(clock, {FakeBarometer(0, clock): None})
+    single.run(0.25)
+    # A measurement every 2 conversions, started until 0.25 sec.
+    assert list(single.achieved_rates().values()) == [64.0]
+
+    clock = FakeClock()
+    many = scheduler_for(clock, {FakeBarometer(i, clock): None
+                                 for i in range(4)})
+    many.run(0.25)
+    # Each sensor keeps its own rate, so the aggregate rate scales.
+    assert list(many.achieved_rates().values()) == [64.0] * 4
+
+
+def test_target_rate_limits_sampling():
+    clock = FakeClock()
+    slow = FakeBarometer('slow', clock)
+    fast = FakeBarometer('fast', clock)
+    scheduler = scheduler_for(clock, {slow: 8, fast: None})
+    samples = scheduler.run(0.375)
+
+    assert sum(1 for s in samples if s.barometer is slow) == 3
+    assert scheduler.achieved_rates() == {slow: 8.0, fast: 64.0}
+
+
+def test_wait_fraction_counts_oversleep():
+    clock = FakeClock(oversleep=BUS_SEC)
+    barometer = FakeBarometer(0, clock, BUS_SEC)
+    scheduler = scheduler_for(clock, {barometer: None})
+    scheduler.run(0.25)
+
+    # Every moment not spent on the bus is spent asleep.
+    elapsed = scheduler.elapsed_sec()
+    assert scheduler.sleep_sec == elapsed - barometer.transfers * BUS_SEC
+    assert 0 < scheduler.wait_fraction() < 1
+
+
+def test_achieved_rates_before_sampling():
+    clock = FakeClock()
+    barometer = FakeBarometer(0, clock)
+    scheduler = scheduler_for(clock, {barometer: 5})
+    assert scheduler.achieved_rates() == {barometer: 0.0}
+    assert scheduler.wait_fraction() == 0.0
+
+
+class FlakyBarometer(FakeBarometer):
+    """Fails the first conversion of every other measurement."""
+
+    def __init__(self, name, clock):
+        super(FlakyBarometer, self).__init__(name, clock)
+        self.measurements = 0
+
+    def start_measurement(self):
+        self.measurements += 1
+        return super(FlakyBarometer, self).start_measurement()
+
+    def step_measurement(self):
+        if self.steps == 0 and self.measurements % 2:
+            self.busy_until = None
+            raise IOError('Remote I/O error')
+        return super(FlakyBarometer, self).step_measurement()
+
+
+def test_io_errors_drop_measurements():
+    clock = FakeClock()
+    barometer = FlakyBarometer(0, clock)
+    scheduler = scheduler_for(clock, {barometer: None})
+    samples = scheduler.run(0.25)
+
+    assert samples
+    assert scheduler.counts[barometer] == len(samples)
+    assert scheduler.dropped[barometer] in (len(samples), len(samples) + 1)
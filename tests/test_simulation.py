@@ -0,0 +1,221 @@
+import os
+import time
+
+import pytest
+
+from barometerdrivers import HP206C, MS5803_01BA
+from barometerdrivers.instrumentation import Instrumentation
+from barometerdrivers.promcache import is_valid_prom
+from barometerdrivers.simulation import (NoiseSource, SimulatedBus,
+                                         SimulatedHP206C,
+                                         SimulatedMS5803_01BA, TraceSource)
+
+SAMPLE_DATA = os.path.join(os.path.dirname(__file__), os.pardir,
+                           'sample_data', 'osr_4096_5_second_samples.tsv')
+
+
+class FakeClock(object):
+    now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def constant(temperature, pressure):
+    return NoiseSource(temperature, pressure, 0, 0)
+
+
+@pytest.mark.parametrize('temperature,pressure', [
+    (20.07, 1000.09),
+    (-5.55, 1013.25),
+    (-39.99, 10.0),
+    (84.99, 1300.0),
+    (0.0, 500.5)
+])
+def test_ms5803_01ba_round_trip(temperature, pressure):
+    bus = SimulatedBus()
+    bus.attach(SimulatedMS5803_01BA(constant(temperature, pressure),
+                                    time_scale=0), 0x77)
+    barometer = MS5803_01BA(bus=bus)
+
+    assert barometer.read_temperature_and_pressure() == (temperature,
+                                                         pressure)
+
+
+def test_ms5803_01ba_prom():
+    device = SimulatedMS5803_01BA(constant(20, 1000), time_scale=0)
+    bus = SimulatedBus()
+    bus.attach(device, 0x76)
+    barometer = MS5803_01BA(is_high_address=False, bus=bus)
+
+    assert barometer.coefficients == device.coefficients
+    assert is_valid_prom([device.prom[word] for word in sorted(device.prom)])
+
+
+def test_ms5803_01ba_adc_not_ready():
+    clock = FakeClock()
+    device = SimulatedMS5803_01BA(constant(20, 1000), clock=clock)
+    command = MS5803_01BA.osr_conversion[4096].command(is_pressure=False)
+
+    device.write_byte(command)
+    clock.now += 0.009
+    assert device.read_block_data(0x00, 3) == [0, 0, 0]
+
+    device.write_byte(command)
+    clock.now += 0.00904
+    assert device.read_block_data(0x00, 3) != [0, 0, 0]
+    assert device.read_block_data(0x00, 3) == [0, 0, 0]
+
+
+def test_ms5803_01ba_conversion_time():
+    bus = SimulatedBus()
+    bus.attach(SimulatedMS5803_01BA(constant(20, 1000)), 0x77)
+    barometer = MS5803_01BA(oversampling_rate=4096, bus=bus)
+
+    start = time.time()
+    barometer.read_temperature_and_pressure()
+    assert time.time() - start >= 2 * 0.00904
+
+
+def test_hp206c_ready():
+    clock = FakeClock()
+    device = SimulatedHP206C(constant(20, 1000), clock=clock)
+    int_src = HP206C.commands.read_register(0x0d)
+    assert device.read_byte_data(int_src) == 0x40
+
+    device.write_byte(HP206C.commands.adc_pressure_temp(0x08))  # OSR 1024
+    assert device.read_byte_data(int_src) == 0x00
+    clock.now += 0.0327
+    assert device.read_byte_data(int_src) == 0x00
+    clock.now += 0.0002
+    assert device.read_byte_data(int_src) == 0x70
+
+    device.write_byte(HP206C.commands.adc_temp(0x08))
+    clock.now += 0.0165
+    assert device.read_byte_data(int_src) == 0x50
+
+
+@pytest.mark.parametrize('temperature,pressure', [
+    (22.83, 1003.7),
+    (-12.34, 300.01)
+])
+def test_hp206c_round_trip(temperature, pressure):
+    bus = SimulatedBus()
+    bus.attach(SimulatedHP206C(constant(temperature, pressure),
+                               time_scale=0.01), 0x76)
+    barometer = HP206C(bus=bus)
+
+    assert barometer.read_temperature_and_pressure() == (temperature,
+                                                         pressure)
+    assert barometer.read_temperature() == temperature
+
+
+def test_trace_source():
+    source = TraceSource(SAMPLE_DATA, 'HP206C')
+
+    assert source.sample() == (22.83, 1003.7)
+    assert source.sample() == (22.92, 1003.86)
+    for _ in range(len(source.readings) - 2):
+        source.sample()
+    assert source.sample() == (22.83, 1003.7)
+
+
+def test_trace_source_unknown_sensor():
+    with pytest.raises(ValueError):
+        TraceSource(SAMPLE_DATA, 'BMP180')
+
+
+def test_noise_source_seed():
+    assert NoiseSource(seed=3).sample() == NoiseSource(seed=3).sample()
+
+
+def test_bus_missing_device():
+    with pytest.raises(IOError):
+        HP206C(bus=SimulatedBus())
+
+
+def test_unsupported_command():
+    device = SimulatedMS5803_01BA(constant(20, 1000))
+    with pytest.raises(IOError):
+        device.write_byte(0x99)
+
+
+class RampSource(object):
+
+    def __init__(self, temperature, pressure, step, temperature_step=0.0):
+        self.temperature = temperature
+        self.pressure = pressure
+        self.step = step
+        self.temperature_step = temperature_step
+
+    def sample(self):
+        self.temperature += self.temperature_step
+        self.pressure += self.step
+        return self.temperature, self.pressure
+
+
+def test_ms5803_01ba_temperature_reuse_pressures():
+    bus = SimulatedBus()
+    bus.attach(SimulatedMS5803_01BA(RampSource(20.0, 1000.0, 0.25, 0.25),
+                                    time_scale=0), 0x77)
+    barometer = MS5803_01BA(bus=bus)
+    barometer.set_temperature_reuse(max_samples=3)
+
+    samples = [barometer.read_sample() for _ in range(5)]
+    # Each conversion ramps the source; D1 keeps the temperature of D2.
+    assert [s.temperature for s in samples] == [20.25, 20.25, 20.25, 21.25,
+                                                21.25]
+    assert [s.pressure for s in samples] == [1000.5, 1000.75, 1001.0,
+                                             1001.5, 1001.75]
+
+
+def test_hp206c_monitor_pressure_thresholds():
+    bus = SimulatedBus()
+    device = SimulatedHP206C(RampSource(20.0, 1000.0, 0.5), time_scale=0.01)
+    bus.attach(device, 0x76)
+    barometer = HP206C(oversampling_rate=128, bus=bus)
+    interrupts = barometer.interrupts
+    barometer.set_pressure_thresholds(low=990, mid=1002, high=1004)
+    barometer.enable_interrupts(
+        interrupts.pressure_traverse | interrupts.pressure_window)
+    instrumentation = Instrumentation().attach(barometer)
+
+    events = barometer.monitor()
+    rising = next(events)
+    assert rising.events == rising.directions == interrupts.pressure_traverse
+    assert rising.pressure == 1002.0
+    above = next(events)
+    assert above.events == above.directions == interrupts.pressure_window
+    assert above.pressure == 1004.5
+    assert instrumentation.bus['read_block_data'].calls == 2
+    assert instrumentation.bus['write_byte'].calls == 9
+
+
+def test_hp206c_monitor_temperature_only():
+    bus = SimulatedBus()
+    bus.attach(SimulatedHP206C(constant(-3.5, 1000), time_scale=0.01), 0x76)
+    barometer = HP206C(oversampling_rate=128, bus=bus)
+    barometer.set_temperature_thresholds(low=-2, high=30)
+    barometer.enable_interrupts(barometer.interrupts.temperature_window)
+
+    event = next(barometer.monitor(temperature_only=True))
+    assert event.events == barometer.interrupts.temperature_window
+    assert event.directions == 0
+    assert (event.temperature, event.pressure) == (-3.5, None)
+
+
+def test_hp206c_monitor_duration():
+    bus = SimulatedBus()
+    bus.attach(SimulatedHP206C(constant(20, 1000), time_scale=0), 0x76)
+    barometer = HP206C(bus=bus)
+    barometer.enable_interrupts(0)
+
+    assert list(barometer.monitor(interval=0.001, duration=0.01)) == []
+
+
+def test_hp206c_write_register_error():
+    device = SimulatedHP206C(constant(20, 1000))
+    with pytest.raises(IOError):
+        device.write_byte_data(0x8c, 0x0f)
+    with pytest.raises(IOError):
+        device.write_byte_data(HP206C.commands.write_register(0x0d), 0)
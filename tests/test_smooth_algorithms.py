@@ -1,3 +1,7 @@
+import math
+import random
+
+import numpy
 import pytest
 
 import barometerdrivers.smooth.smoothalgorithms as smooth
@@ -21,7 +25,12 @@ measured_values = [2.0, 3.0, 4.0, 5.0, 1.0, 2.0, 3.0, 4.0, 5.0]
     (smooth.RollingRootMeanSquared, 3, 3,
         [1.581, 2.16, 3.109, 4.082, 3.742, 3.162, 2.16, 3.109, 4.082]),
     (smooth.RollingRootMeanSquared, 10, 3,
-        [1.581, 2.16, 2.739, 3.317, 3.055, 2.928, 2.937, 3.073, 3.317])
+        [1.581, 2.16, 2.739, 3.317, 3.055, 2.928, 2.937, 3.073, 3.317]),
+    (smooth.RollingMedian, 1, 0, measured_values),
+    (smooth.RollingMedian, 3, 3,
+        [1.5, 2.0, 3.0, 4.0, 4.0, 2.0, 2.0, 3.0, 4.0]),
+    (smooth.RollingMedian, 10, 3,
+        [1.5, 2.0, 2.5, 3.0, 2.5, 2.0, 2.5, 3.0, 3.0])
 ])
 def test_rolling_smoothers(smoother_class, length, decimal_places, expected):
     smoother = smoother_class(initial_value, length, decimal_places)
@@ -60,3 +69,262 @@ def test_one_d_kalman(q_process_noise, r_measure_noise, expected):
     for measure, expect in zip(measured_values, expected):
         smoother.update(measure)
         assert smoother.value == expect
+
+
+@pytest.mark.parametrize('smoother_class', [smooth.RollingMean,
+                                            smooth.RollingRootMeanSquared])
+def test_rolling_smoother_window(smoother_class):
+    smoother = smoother_class(initial_value, 3, 3)
+    assert smoother.values == [initial_value]
+    assert not smoother.full
+    smoother.update_many(measured_values[:4])
+    assert smoother.values == [4.0, 5.0, 3.0]
+    assert smoother.full
+    assert smoother.index == 2
+
+
+@pytest.mark.parametrize('smoother_class', [smooth.RollingMean,
+                                            smooth.RollingRootMeanSquared])
+def test_rolling_smoother_update_many(smoother_class):
+    batch = smoother_class(initial_value, 4, 3)
+    batch.update_many(iter(measured_values))
+    single = smoother_class(initial_value, 4, 3)
+    for measure in measured_values:
+        single.update(measure)
+    assert batch.values == single.values
+    assert batch.value == single.value
+
+
+def test_one_d_kalman_update_many():
+    batch = smooth.OneDKalman(initial_value, 3, 1, 1, 2)
+    batch.update_many(measured_values)
+    assert batch.value == 4.42
+
+
+def test_rolling_mean_does_not_drift():
+    smoother = smooth.RollingMean(0.1, 1000, 10)
+    for i in range(100000):
+        smoother.update(1e6 if i % 2 else 0.1)
+    smoother.update_many([0.1] * 1000)
+    assert smoother.total == 100.0
+    assert smoother.value == 0.1
+
+
+def test_rolling_smoothers_non_integer_sums():
+    # The exact sum is divided by a power of 2, which must not floor.
+    mean = smooth.RollingMean(1000.25, 2, 3)
+    mean.update(1000.5)
+    assert mean.total == 2000.75
+    assert mean.value == 1000.375
+    rms = smooth.RollingRootMeanSquared(0.5, 1, 3)
+    assert rms.total == 0.25
+    assert rms.value == 0.5
+
+
+def test_rolling_smoothers_non_finite():
+    nan, inf = float('nan'), float('inf')
+    mean = smooth.RollingMean(1.0, 2, 3)
+    values = []
+    for measurement in [nan, 2.0, 3.0, inf, -inf, 4.0, 5.0]:
+        mean.update(measurement)
+        values.append(mean.value)
+    assert [repr(value) for value in values] == [
+        'nan', 'nan', '2.5', 'inf', 'nan', '-inf', '4.5']
+    smoother = smooth.RollingMean(1.0, 2, 3)
+    smoothed = smoother.smooth([nan, 2.0, 3.0]).tolist()
+    assert [repr(value) for value in smoothed] == ['nan', 'nan', '2.5']
+    rms = smooth.RollingRootMeanSquared(1.0, 1, 3)
+    rms.update(1e200)  # the square overflows
+    assert rms.value == inf
+    rms.update(2.0)
+    assert rms.value == 2.0
+
+
+def test_rolling_sum_scale_shrinks():
+    mean = smooth.RollingMean(1000.0, 4, 3)
+    mean.update(1e-300)
+    assert mean._scale > 1000
+    # Lowered once the ring wraps after the tiny measurement leaves.
+    mean.update_many([1000.5] * 8)
+    assert mean._scale == 1
+    assert mean.total == 4002.0
+
+
+def test_rolling_rms_zero_window():
+    smoother = smooth.RollingRootMeanSquared(0.3, 2, 3)
+    smoother.update_many([0.0, 0.0])
+    assert smoother.value == 0.0
+
+
+def test_smoothers_have_slots():
+    smoother = smooth.RollingMean(initial_value, 3, 3)
+    with pytest.raises(AttributeError):
+        smoother.unknown = 1
+
+
+def _streamed(smoother, series):
+    values = []
+    for measure in series:
+        smoother.update(measure)
+        values.append(smoother.value)
+    return values
+
+
+@pytest.mark.parametrize('smoother_class, length, decimal_places, expected', [
+    (smooth.RollingMean, 3, 3,
+        [1.5, 2.0, 3.0, 4.0, 3.333, 2.667, 2.0, 3.0, 4.0]),
+    (smooth.RollingRootMeanSquared, 10, 3,
+        [1.581, 2.16, 2.739, 3.317, 3.055, 2.928, 2.937, 3.073, 3.317])
+])
+def test_rolling_smoothers_smooth(smoother_class, length, decimal_places,
+                                  expected):
+    smoother = smoother_class(initial_value, length, decimal_places)
+    smoothed = smoother.smooth(measured_values)
+    assert isinstance(smoothed, numpy.ndarray)
+    assert smoothed.tolist() == expected
+
+
+def test_one_d_kalman_smooth():
+    smoother = smooth.OneDKalman(initial_value, 3, 1, 1, 2)
+    assert smoother.smooth(measured_values).tolist() == [
+        1.8, 2.57, 3.46, 4.41, 2.3, 2.12, 2.66, 3.49, 4.42]
+    assert smoother.value == 4.42
+
+
+@pytest.mark.parametrize('make_smoother', [
+    lambda: smooth.RollingMean(1000.0, 4, 2),
+    lambda: smooth.RollingMean(1000.0, 1, 1),
+    lambda: smooth.RollingMean(1000.0, 700, 3),
+    lambda: smooth.RollingRootMeanSquared(1000.0, 16, 2),
+    lambda: smooth.OneDKalman(1000.0, 4, 0.0625, 4, 2),
+    lambda: smooth.ExponentialMovingAverage(1000.0, 1, 50, 2),
+    lambda: smooth.LowPassBiquad(1000.0, 1, 50, 3, sections=3)
+])
+@pytest.mark.parametrize('scale', [1, 1e-9])
+def test_smooth_matches_streaming(make_smoother, scale):
+    rng = random.Random(0)
+    history = [rng.gauss(1000, 0.5) * scale for _ in range(3)]
+    series = [round(rng.gauss(1000, 0.5), 2) for _ in range(2000)]
+    series[1000] *= scale  # too wide a range for exact int64 window sums
+    batch, streaming = make_smoother(), make_smoother()
+    batch.update_many(history)
+    streaming.update_many(history)
+
+    assert batch.smooth(series[:1200]).tolist() == _streamed(streaming,
+                                                             series[:1200])
+    assert batch.smooth(series[1200:]).tolist() == _streamed(streaming,
+                                                             series[1200:])
+    assert batch.value == streaming.value
+    assert batch.smooth([]).tolist() == []
+    if isinstance(batch, smooth.AbstractRollingSmoother):
+        assert batch.values == streaming.values
+        assert batch.index == streaming.index
+        assert batch.total == streaming.total
+
+
+def test_rolling_mean_rounds_ties_like_round():
+    # 2.675 is stored as 2.67499999999999982236431605997495353221893310546875
+    smoother = smooth.RollingMean(2.675, 1, 2)
+    assert smoother.smooth([2.675, 0.125, 0.375]).tolist() == [
+        round(2.675, 2), round(0.125, 2), round(0.375, 2)]
+
+
+@pytest.mark.parametrize('length', [1, 2, 5, 16, 101])
+def test_rolling_median_matches_sorted_window(length):
+    rng = random.Random(length)
+    smoother = smooth.RollingMedian(0.0, length, 6)
+    window = [0.0]
+    for _ in range(2000):
+        # Repeated values exercise ties between the heaps.
+        measurement = rng.choice([rng.randint(-3, 3), rng.gauss(0, 1)])
+        smoother.update(measurement)
+        window = (window + [measurement])[-length:]
+        assert smoother.median == numpy.median(window)
+    assert sorted(smoother.values) == sorted(window)
+    assert len(smoother._low) + len(smoother._high) <= 2 * length + 1
+
+
+def _hampel(window, n_sigmas):
+    median = numpy.median(window)
+    mad = numpy.median(numpy.abs(numpy.array(window) - median))
+    deviation = abs(window[-1] - median)
+    if deviation > 0 and deviation > n_sigmas * 1.4826 * mad:
+        return True, median
+    return False, window[-1]
+
+
+@pytest.mark.parametrize('length', [1, 2, 7, 16, 64])
+def test_hampel_filter_matches_definition(length):
+    rng = random.Random(length)
+    hampel = smooth.HampelFilter(1000.0, length, 3, 4)
+    window = [1000.0]
+    for _ in range(2000):
+        measurement = round(rng.gauss(1000, 0.1), 2)
+        if rng.random() < 0.02:
+            measurement += 5
+        assert hampel.update(measurement) == hampel.outlier
+        window = (window + [measurement])[-length:]
+        outlier, value = _hampel(window, 3)
+        assert hampel.outlier == outlier
+        assert hampel.value == round(value, 4)
+
+
+@pytest.mark.parametrize('length', [256, 4096])
+def test_hampel_filter_scales_logarithmically(length):
+    # A rising ramp would degenerate an unbalanced tree into a list.
+    hampel = smooth.HampelFilter(0.0, length, 3, 4)
+    hampel.update_many(range(3 * length))
+    bound = 4 * math.log(length, 2)
+    assert smooth._size(hampel._low) + smooth._size(hampel._high) == length
+    assert smooth._height(hampel._low) <= bound
+    assert smooth._height(hampel._high) <= bound
+
+
+def test_hampel_filter_rejects_spike():
+    hampel = smooth.HampelFilter(1000.0, 5, 3, 2)
+    kalman = smooth.OneDKalman(1000.0, 4, 0.0625, 4, 2)
+    for measurement in [1000.01, 999.99, 1000.0, 1012.5, 1000.02, 1000.01]:
+        hampel.update(measurement)
+        kalman.update(hampel.value)
+    assert hampel.outliers == 1
+    assert abs(kalman.value - 1000.0) < 0.05
+
+
+def test_exponential_moving_average():
+    smoother = smooth.ExponentialMovingAverage(initial_value, 1, 2 * numpy.pi,
+                                               3)
+    assert smoother.alpha == pytest.approx(1 - numpy.exp(-1))
+    smoother.update_many(measured_values[:3])
+    assert smoother.value == 3.447
+
+
+@pytest.mark.parametrize('sections', [1, 2, 4])
+def test_low_pass_biquad_response(sections):
+    sample_rate, cutoff = 50.0, 2.0
+    ticks = numpy.arange(4000)
+
+    def amplitude(frequency):
+        smoother = smooth.LowPassBiquad(0.0, cutoff, sample_rate, 9, sections)
+        wave = numpy.sin(2 * numpy.pi * frequency / sample_rate * ticks)
+        settled = smoother.smooth(wave)[-1000:]  # whole cycles
+        return numpy.sqrt(2 * numpy.mean(settled ** 2))
+
+    assert amplitude(0.1) == pytest.approx(1, abs=1e-3)
+    assert amplitude(cutoff) == pytest.approx(2 ** -0.5, abs=1e-3)
+    # 12 dB per octave per biquad above the cutoff.
+    assert amplitude(4 * cutoff) < 1.3 * 16.0 ** -sections
+
+
+def test_low_pass_biquad_starts_settled():
+    smoother = smooth.LowPassBiquad(1013.25, 0.5, 25, 6, sections=2)
+    assert smoother.value == 1013.25
+    smoother.update_many([1013.25] * 100)
+    assert smoother.value == 1013.25
+
+
+@pytest.mark.parametrize('cutoff_hz, sample_rate_hz', [
+    (0, 50), (-1, 50), (25, 50), (1, 0)
+])
+def test_low_pass_biquad_bad_cutoff(cutoff_hz, sample_rate_hz):
+    with pytest.raises(ValueError):
+        smooth.LowPassBiquad(1000.0, cutoff_hz, sample_rate_hz, 2)
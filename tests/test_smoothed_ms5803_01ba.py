@@ -1,5 +1,7 @@
+import json
 import time
 
+import pytest
 from pytest import fixture
 
 from barometerdrivers.smooth import SmoothedMS5803_01BA
@@ -74,3 +76,89 @@ def test_smoothed_ms5803_01ba_temp_pressure(mock_ms5803_01ba, mock_smooth):
     assert mock_ms5803_01ba.read_temperature_and_pressure.called
     assert not mock_ms5803_01ba.read_temperature.called
     assert not mock_ms5803_01ba.read_pressure.called
+
+
+class FakeClock(object):
+    now = 100.0
+    calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.now
+
+
+@fixture
+def clock(mock_ms5803_01ba):
+    """Fake :func:`time.time`, advanced 1/32 sec by each reading, which is
+    exact in binary: 4 readings in the first 100 ms.
+    """
+    clock = FakeClock()
+
+    def read():
+        clock.now += 0.03125
+        return 20.0, 1000.0
+    mock_ms5803_01ba.read_temperature_and_pressure.side_effect = read
+    with patch('barometerdrivers.smooth.ms5803smoother.time.time', clock):
+        yield clock
+
+
+def test_smoothed_ms5803_01ba_stream(mock_ms5803_01ba, mock_smooth, clock):
+    stream = mock_smooth.stream()
+    first = next(stream)
+    clock_reads = clock.calls
+    samples = [next(stream) for _ in range(100)]
+
+    assert first == (20.0, 1000.0)
+    assert samples == [(20.0, 1000.0)] * 100
+    # 4 readings discarded in the first 100 ms, then 1 per sample
+    assert mock_ms5803_01ba.read_temperature_and_pressure.call_count == \
+        4 + 1 + 100
+    assert clock.calls == clock_reads  # first 100 ms discarded only once
+    assert not mock_ms5803_01ba.read_temperature.called
+    assert not mock_ms5803_01ba.read_pressure.called
+
+
+def test_smoothed_ms5803_01ba_stream_tracks_readings(mock_ms5803_01ba,
+                                                     mock_smooth, clock):
+    pressure = [1000.0]
+
+    def read():
+        clock.now += 0.03125
+        return 20.0, pressure[0]
+    mock_ms5803_01ba.read_temperature_and_pressure.side_effect = read
+    stream = iter(mock_smooth)
+    assert next(stream) == (20.0, 1000.0)
+    pressure[0] = 1010.0
+    pressures = [next(stream)[1] for _ in range(200)]
+
+    # filter state is kept, so the step is approached gradually
+    assert 1000.0 < pressures[0] < 1010.0
+    assert pressures == sorted(pressures)
+    assert pressures[-1] == 1010.0
+
+
+def test_smoothed_ms5803_01ba_kalman_table(tmpdir, mock_ms5803_01ba):
+    entry = {'p_estimation_error': 1.0, 'q_process_noise': 0.5,
+             'r_measure_noise': 2.0}
+    table = tmpdir.join('kalman.json')
+    table.write(json.dumps({'parameters': {'MS5803_01BA': {'1024': {
+        'temperature': entry,
+        'pressure': dict(entry, r_measure_noise=8.0)
+    }}}}))
+    smoother = SmoothedMS5803_01BA(True, kalman_table=str(table))
+
+    assert smoother.kalman_parameters == {'temperature': (1.0, 0.5, 2.0),
+                                          'pressure': (1.0, 0.5, 8.0)}
+    kalman = smoother._kalman(1000.0, 'pressure')
+    assert kalman.r_measure_noise == 8.0
+
+
+def test_smoothed_ms5803_01ba_kalman_table_missing_osr(tmpdir,
+                                                       mock_ms5803_01ba):
+    table = tmpdir.join('kalman.json')
+    table.write(json.dumps({'parameters': {'MS5803_01BA': {'4096': {}}}}))
+
+    with pytest.raises(ValueError) as e:
+        SmoothedMS5803_01BA(True, kalman_table=str(table))
+    assert e.value.args[0].startswith(
+        'No Kalman parameters for MS5803_01BA')
@@ -2,6 +2,7 @@ import pytest
 
 from barometerdrivers.helpers.util import (array_block_to_signed_int,
                                            array_block_to_unsigned_int,
+                                           bytes_to_int, decode_frames,
                                            do_bitwise_or, is_bit_set,
                                            is_unsigned_byte,
                                            twos_compliment_to_signed_int)
@@ -85,3 +86,54 @@ def test_twos_compliment_to_signed_int(twos_compliment, bits, expected):
 ])
 def test_array_block_to_signed_int(byte_array, expected):
     assert array_block_to_signed_int(byte_array) == expected
+
+
+def test_array_block_to_signed_int_memoryview():
+    data = memoryview(bytearray([0x00, 0xff, 0xfc, 0x02, 0x00]))
+    assert array_block_to_signed_int(data[1:4]) == -1022
+
+
+@pytest.mark.parametrize('data, signed, expected', [
+    (b'\x9c\xbf', False, 40127),
+    (b'\xff\xfc\x02', True, -1022),
+    (b'\xff\xfc\x02', False, 16776194),
+    (b'', True, 0)
+])
+def test_bytes_to_int(data, signed, expected):
+    assert bytes_to_int(data, signed) == expected
+
+
+@pytest.mark.parametrize('data, width, signed, expected', [
+    (b'\x9c\xbf\x90\x3c', 2, False, [40127, 36924]),
+    (b'\x80\x00\x7f\xff', 2, True, [-32768, 32767]),
+    (b'\x00\x0a\x5c\xff\xfc\x02', 3, False, [2652, 16776194]),
+    (b'\x00\x0a\x5c\xff\xfc\x02', 3, True, [2652, -1022]),
+    (b'\x80\x01', 1, True, [-128, 1]),
+    (b'\xff\xff\xff\xfe', 4, True, [-2]),
+    (b'\xff\xff\xff\xfe', 4, False, [4294967294]),
+    (b'', 3, True, [])
+])
+def test_decode_frames(data, width, signed, expected):
+    assert list(decode_frames(data, width, signed)) == expected
+
+
+def test_decode_frames_matches_single_frame_decoding():
+    frames = [[0x00, 0x0a, 0x5c], [0xff, 0xfc, 0x02], [0x01, 0x8a, 0x9e],
+              [0x80, 0x00, 0x00], [0x7f, 0xff, 0xff]]
+    data = bytearray(sum(frames, []))
+    assert list(decode_frames(memoryview(data), 3, signed=True)) == [
+        array_block_to_signed_int(frame) for frame in frames]
+    assert list(decode_frames(list(data), 3)) == [
+        array_block_to_unsigned_int(frame) for frame in frames]
+
+
+def test_decode_frames_bad_values():
+    with pytest.raises(ValueError) as e:
+        decode_frames([0x00, 0x100, 0x00], 3)
+    assert e.value.args[0].startswith("Value '256' at index '1'")
+
+
+@pytest.mark.parametrize('data, width', [(b'\x00\x01', 3), (b'\x00', 5)])
+def test_decode_frames_bad_length(data, width):
+    with pytest.raises(ValueError):
+        decode_frames(data, width)